@@ -0,0 +1,72 @@
+import os  # Lectura de variables de entorno
+from typing import Dict, List  # Tipado
+
+from starlette.types import ASGIApp, Receive, Scope, Send  # Tipos ASGI
+
+from database import pool_recent_wait  # Espera reciente del pool de conexiones
+from metrics import registry  # Estado del control de admision en /metrics
+
+# Configuración del control de admision (leer de variables de entorno)
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "100"))  # Peticiones simultaneas por worker (0 = sin limite)
+ADMISSION_MAX_POOL_WAIT_MS = float(os.getenv("ADMISSION_MAX_POOL_WAIT_MS", "100"))  # Espera reciente del pool (0 = sin limite)
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))  # Segundos sugeridos al cliente rechazado
+
+_EXEMPT_PREFIXES = ("/health/", "/metrics")  # Sondas y monitoreo: deben responder aun con el servicio saturado
+_STREAMING_PATHS = ("/tasks/changes",)  # Conexiones de larga duracion: se admiten o no, pero no cuentan como en curso
+_BODY = b'{"detail":"Servicio saturado, intenta mas tarde"}'
+
+
+class AdmissionControlMiddleware:  # Middleware ASGI: rechaza trabajo nuevo cuando el worker esta saturado
+    """Responde 503 con Retry-After si hay demasiadas peticiones en curso o el pool de conexiones tarda en entregar"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.in_flight = 0  # Peticiones en curso (solo se modifica desde el event loop)
+        self.shed: Dict[str, int] = {"in_flight": 0, "pool_wait": 0}  # Peticiones rechazadas por motivo
+        registry.register_collector(self.metrics)
+
+    def _overloaded(self) -> str:  # Motivo del rechazo o "" si se admite
+        if ADMISSION_MAX_IN_FLIGHT and self.in_flight >= ADMISSION_MAX_IN_FLIGHT:
+            return "in_flight"
+        if ADMISSION_MAX_POOL_WAIT_MS and pool_recent_wait() * 1000 > ADMISSION_MAX_POOL_WAIT_MS:
+            return "pool_wait"
+        return ""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(_EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        reason = self._overloaded()
+        if reason:  # Se rechaza antes de tocar la BD o el pool de hashing
+            self.shed[reason] += 1
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(_BODY)).encode()),
+                    (b"retry-after", str(ADMISSION_RETRY_AFTER).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": _BODY})
+            return
+        if scope["path"] in _STREAMING_PATHS:  # Miles de suscriptores inactivos no deben bloquear el resto
+            await self.app(scope, receive, send)
+            return
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    def metrics(self) -> List[str]:  # Lineas Prometheus para /metrics
+        lines = ["# HELP api_in_flight_requests Peticiones en curso en este worker",
+                 "# TYPE api_in_flight_requests gauge",
+                 f"api_in_flight_requests {self.in_flight}",
+                 "# HELP api_db_pool_wait_recent_seconds Espera reciente para obtener una conexion del pool",
+                 "# TYPE api_db_pool_wait_recent_seconds gauge",
+                 f"api_db_pool_wait_recent_seconds {pool_recent_wait():.6f}",
+                 "# HELP api_admission_shed_total Peticiones rechazadas con 503 por el control de admision",
+                 "# TYPE api_admission_shed_total counter"]
+        lines += [f'api_admission_shed_total{{reason="{reason}"}} {count}' for reason, count in self.shed.items()]
+        return lines
@@ -0,0 +1,179 @@
+"""Archivado de tareas: mueve las tareas "done" antiguas de task a task_archive por lotes
+
+Uso:
+    python archive.py                      # Una pasada con ARCHIVE_AFTER_DAYS y ARCHIVE_BATCH_SIZE
+    python archive.py --days 90 --batch-size 1000 --max-batches 50
+
+Cada lote es una transaccion corta (INSERT ... SELECT + DELETE de como mucho batch-size filas), asi que
+el job se puede interrumpir en cualquier momento: lo ya movido queda movido y la siguiente pasada sigue
+con lo que falte. Con ARCHIVE_INTERVAL_SECONDS > 0 la app lo ejecuta periodicamente en segundo plano.
+Al terminar cada pasada tambien poda task_change (registro del feed de cambios, ver changes.py).
+"""
+import argparse  # Argumentos de linea de comandos
+import logging  # Resumen del job periodico
+import os  # Lectura de variables de entorno
+import threading  # Bloqueo de los contadores
+import time  # Pausa entre lotes y duracion de cada pasada
+from datetime import datetime, timedelta, timezone  # Fecha de corte y fin de la pasada
+from typing import Any, Dict, List, Optional, Tuple  # Tipado
+
+from sqlalchemy import delete, func, insert, select  # Sentencias del movimiento
+from sqlalchemy.orm import Session  # Sesion de SQLAlchemy
+
+from cache import task_cache  # Las tareas movidas salen de GET /tasks/{id} y de los listados
+from changes import prune_changes, record_changes  # Evento "archived" y poda de task_change
+from counting import invalidate_task_count  # Los totales cambian
+from database import SessionLocal  # Sesiones contra el primario
+from metrics import registry  # Progreso del job en /metrics
+from model import Task, TaskArchive, TaskStatus  # Tablas de origen y destino
+from periodic import run_periodically  # Un solo worker ejecuta cada pasada periodica
+from task_stats import record_status_change  # Las tareas archivadas salen del conteo por estado
+
+# Configuración del archivado (leer de variables de entorno)
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))  # Dias sin cambios para archivar una tarea "done"
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))  # Filas por transaccion
+ARCHIVE_PAUSE_SECONDS = float(os.getenv("ARCHIVE_PAUSE_SECONDS", "0.05"))  # Pausa entre lotes (deja pasar otras escrituras)
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "0"))  # Pasada periodica en la app (0 = desactivada)
+
+_COLUMNS = ("id", "title", "description", "status", "created_at", "version")  # Columnas copiadas a task_archive
+
+logger = logging.getLogger(__name__)  # Resumen del job periodico
+
+
+class ArchiveStats:  # Progreso acumulado del job en este proceso
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.moved = 0  # Tareas movidas a task_archive
+        self.batches = 0  # Lotes confirmados
+        self.runs = 0  # Pasadas completas
+        self.last_run: Optional[Dict[str, Any]] = None  # Resumen de la ultima pasada
+
+    def batch(self, moved: int) -> None:
+        with self._lock:
+            self.moved += moved
+            self.batches += 1
+
+    def finished(self, summary: Dict[str, Any]) -> None:
+        with self._lock:
+            self.runs += 1
+            self.last_run = summary
+
+    def stats(self) -> Dict[str, Any]:  # Resumen para /admin/archive
+        with self._lock:
+            return {"moved": self.moved, "batches": self.batches, "runs": self.runs, "last_run": self.last_run}
+
+    def metrics(self) -> List[str]:  # Lineas Prometheus para /metrics
+        with self._lock:
+            return [
+                "# HELP api_tasks_archived_total Tareas movidas a task_archive por el job de archivado",
+                "# TYPE api_tasks_archived_total counter",
+                f"api_tasks_archived_total {self.moved}",
+                "# HELP api_archive_batches_total Lotes de archivado confirmados",
+                "# TYPE api_archive_batches_total counter",
+                f"api_archive_batches_total {self.batches}",
+            ]
+
+
+archive_stats = ArchiveStats()  # Progreso del proceso
+registry.register_collector(archive_stats.metrics)
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int) -> Tuple[int, List[int]]:  # Un lote en una transaccion
+    """Mueve a task_archive hasta batch_size tareas "done" sin cambios desde cutoff; retorna (seleccionadas, IDs movidos)"""
+    newest = db.execute(select(func.max(Task.id))).scalar()  # La tarea mas reciente nunca se archiva:
+    if newest is None:  # asi MySQL/SQLite no reutilizan IDs que ya estan en task_archive
+        return 0, []
+    candidates = (Task.status == TaskStatus.done, Task.created_at < cutoff, Task.id < newest)
+    ids = db.execute(
+        select(Task.id)
+        .where(*candidates)
+        .order_by(Task.created_at)  # Recorre ix_task_status_created_at: solo filas que se van a mover
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)  # Bloquea solo el lote y salta las filas que otra peticion esta escribiendo
+    ).scalars().all()
+    if not ids:
+        return 0, []
+    moving = (Task.id.in_(ids), *candidates)  # Se repiten las condiciones: la fila pudo cambiar tras el SELECT (SQLite)
+    db.execute(
+        insert(TaskArchive).from_select(_COLUMNS, select(*(getattr(Task, column) for column in _COLUMNS)).where(*moving))
+    )
+    moved = _delete_moved(db, ids, moving)  # Las que de verdad salieron de task (no las del SELECT)
+    if moved:
+        record_status_change(db, removed=[TaskStatus.done] * len(moved))  # Solo se mueven tareas "done"
+        record_changes(db, "archived", moved)  # GET /tasks/changes: los clientes las quitan del listado
+    db.commit()
+    return len(ids), moved
+
+
+def _delete_moved(db: Session, ids: List[int], moving: Tuple[Any, ...]) -> List[int]:  # DELETE del lote
+    """Borra de task las filas del lote que siguen cumpliendo las condiciones y retorna sus IDs"""
+    stmt = delete(Task).where(*moving)
+    if db.get_bind().dialect.delete_returning:  # SQLite, PostgreSQL, MariaDB 10.5+: los IDs salen del mismo DELETE
+        deleted = set(db.execute(stmt.returning(Task.id)).scalars().all())
+        return [task_id for task_id in ids if task_id in deleted]  # En el orden del lote
+    if db.execute(stmt).rowcount == len(ids):  # MySQL: sin RETURNING; si se borro todo el lote no hace falta releer
+        return list(ids)
+    remaining = set(db.execute(select(Task.id).where(Task.id.in_(ids))).scalars().all())  # Las que cambiaron siguen en task
+    return [task_id for task_id in ids if task_id not in remaining]
+
+
+def run_archive(
+    days: int = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_BATCH_SIZE, max_batches: Optional[int] = None,
+) -> Dict[str, Any]:  # Una pasada completa (o hasta max_batches lotes)
+    """Archiva por lotes hasta que no queden tareas que cumplan la condicion y retorna un resumen"""
+    start = time.perf_counter()
+    moved = batches = 0
+    with SessionLocal() as db:
+        now = db.execute(select(func.current_timestamp())).scalar_one()  # Reloj de la BD: el mismo que llena created_at
+        db.commit()  # Termina la lectura: cada lote abre su propia transaccion
+        cutoff = now - timedelta(days=days)  # created_at se actualiza en cada escritura: "sin cambios desde"
+        while max_batches is None or batches < max_batches:
+            selected, ids = archive_batch(db, cutoff, batch_size)
+            if not selected:
+                break
+            moved += len(ids)
+            batches += 1
+            archive_stats.batch(len(ids))
+            if ids:
+                invalidate_task_count()  # Los totales de este y de los demas workers
+                task_cache.invalidate(ids)  # GET /tasks/{id} ya no las encuentra sin include_archived
+            if selected < batch_size:  # Ultimo lote: no hace falta otra consulta
+                break
+            time.sleep(ARCHIVE_PAUSE_SECONDS)
+        pruned = prune_changes(db)  # Mantenimiento del registro del feed de cambios (CHANGES_RETENTION)
+    summary = {
+        "cutoff": cutoff.isoformat(),
+        "moved": moved,
+        "batches": batches,
+        "changes_pruned": pruned,
+        "seconds": round(time.perf_counter() - start, 3),
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+    }
+    archive_stats.finished(summary)
+    return summary
+
+
+def _archive_job() -> None:  # Una pasada periodica (en el threadpool)
+    summary = run_archive()
+    if summary["moved"]:
+        logger.info("Archivado: %d tareas en %d lotes (%.1f s)", summary["moved"], summary["batches"], summary["seconds"])
+
+
+async def archive_periodically(interval: float = ARCHIVE_INTERVAL_SECONDS) -> None:  # Tarea de fondo de la app
+    """Ejecuta run_archive cada `interval` segundos; con varios workers solo uno ejecuta cada pasada"""
+    await run_periodically("archive", interval, _archive_job)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mueve las tareas done antiguas a task_archive")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help="Dias sin cambios (defecto ARCHIVE_AFTER_DAYS)")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="Filas por transaccion")
+    parser.add_argument("--max-batches", type=int, help="Detiene la pasada tras N lotes (se retoma en la siguiente)")
+    args = parser.parse_args()
+    summary = run_archive(args.days, args.batch_size, args.max_batches)
+    print(f"Archivadas {summary['moved']} tareas en {summary['batches']} lotes ({summary['seconds']} s), "
+          f"corte {summary['cutoff']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+from datetime import datetime  # Filtros por fecha de la exportacion
+from typing import List, Literal, Optional, Tuple, Union  # Tipado de parametros y respuestas
+
+from fastapi import APIRouter, Depends, Header, Query, Request, Response  # Router, peticion y dependencias
+from fastapi.responses import StreamingResponse  # Respuestas transmitidas por bloques
+from fastapi.security import OAuth2PasswordRequestForm  # Para login via formulario x-www-form-urlencoded
+from sqlalchemy.ext.asyncio import AsyncSession  # Sesion asincrona
+
+from bulk import bulk_create_tasks, bulk_update_tasks, bulk_delete_tasks, check_bulk_size  # Operaciones masivas
+from cache import acached_json_response, task_cache  # Cache de respuestas con ETag
+from changes import change_stream  # Feed de cambios (SSE)
+from counting import aprepare_count  # Generacion de los totales fuera del event loop
+from database import get_async_db  # Dependencia para obtener la sesion asincrona
+from export import MEDIA_TYPES, aiter_export  # Exportacion en streaming
+from hashing import hash_password_async, verify_and_update_async  # bcrypt en el pool de hashing
+from ratelimit import acheck_login, acheck_register, rate_limited_user_async  # Limites por IP, username y usuario
+from replicas import get_async_read_db  # Sesion de lectura (replica o primario)
+from schemas import (
+    TaskCreate, TaskRead, TaskUpdate, PaginatedTaskResponse, CursorPaginatedTaskResponse,  # Esquemas de tareas
+    TaskBulkUpdateItem, TaskBulkDelete, BulkTaskResponse, TaskStats,  # Esquemas de operaciones masivas y conteos
+    TaskLookup, TaskLookupResponse,  # Lectura de varias tareas por ID
+    TaskStatus, UserCreate, UserRead, Token  # Estados y esquemas de autenticacion
+)
+from lookup import async_task_loader, lookup_tasks  # Lecturas por lista de IDs y agrupador de GET /tasks/{id}
+from task_queries import TaskFilters  # Filtros de la exportacion
+from serialization import dumps  # JSON rapido
+from task_service import (
+    TaskListQuery, create_task_row, create_user, ensure_username_free, find_login_user, login_token,
+    atasks_changed, task_json, task_list_json, task_list_query, task_stats_json,
+)  # Las mismas consultas y respuestas que main.py, ejecutadas con run_sync
+from versioning import delete_task_row, parse_if_match, task_response, update_task_row  # Concurrencia optimista (If-Match)
+from token_cache import Principal  # Usuario autenticado
+
+router = APIRouter()  # Rutas asincronas, equivalentes a las de main.py (se usan con DB_MODE=async); la logica esta en task_service.py
+
+
+@router.post("/tasks", response_model=TaskRead)  # Ruta POST para crear tareas
+async def create_task(
+    task: TaskCreate,  # Datos validados de la tarea
+    db: AsyncSession = Depends(get_async_db),  # Sesion de BD asincrona
+    current_user: Principal = Depends(rate_limited_user_async)  # Requiere usuario autenticado (con limite de escrituras)
+):  # Crea una nueva tarea
+    db_task = await db.run_sync(create_task_row, task)  # Misma transaccion que en modo sync
+    await atasks_changed()  # Los totales y las paginas cacheadas ya no son validos
+    return db_task  # Devuelve la tarea creada
+
+
+@router.get("/tasks", response_model=Union[PaginatedTaskResponse, CursorPaginatedTaskResponse, TaskLookupResponse])  # Listado paginado
+async def list_tasks(  # Lista tareas con paginacion por offset o por cursor
+    request: Request,  # Peticion (query normalizada para el cache e If-None-Match)
+    query: TaskListQuery = Depends(task_list_query),  # Mismos parametros que en modo sync
+    db: AsyncSession = Depends(get_async_read_db)  # Sesion de lectura (replica o primario)
+):  # Retorna respuesta paginada con metadata
+    async def build() -> bytes:  # Se ejecuta solo si la pagina no esta en el cache
+        if query.counts:
+            await aprepare_count(db)  # La generacion de los totales, fuera del event loop
+        return await db.run_sync(task_list_json, query)
+
+    return await acached_json_response(  # Sirve la pagina desde el cache o la construye (304 si coincide el ETag)
+        request, lambda: task_cache.list_key(request), build,
+    )
+
+
+@router.post("/tasks/bulk", response_model=BulkTaskResponse, status_code=201)  # Ruta POST para crear tareas en lote
+async def create_tasks_bulk(
+    tasks: List[TaskCreate],  # Lista de tareas a crear
+    atomic: bool = True,  # True: una sola transaccion; False: un commit por bloque
+    db: AsyncSession = Depends(get_async_db),  # Sesion de BD asincrona
+    current_user: Principal = Depends(rate_limited_user_async)  # Requiere usuario autenticado (con limite de escrituras)
+):  # Crea varias tareas con INSERT multi-fila
+    check_bulk_size(len(tasks))  # Valida el tamaño del lote
+    results = await db.run_sync(bulk_create_tasks, tasks, atomic)  # Reutiliza la implementacion sincrona
+    await atasks_changed()  # Los totales y las paginas cacheadas ya no son validos
+    return {"results": results}  # Un resultado por tarea
+
+
+@router.patch("/tasks/bulk", response_model=BulkTaskResponse)  # Ruta PATCH para actualizar tareas en lote
+async def update_tasks_bulk(
+    tasks: List[TaskBulkUpdateItem],  # Lista de cambios (id + campos a modificar)
+    atomic: bool = True,  # True: una sola transaccion; False: un commit por bloque
+    db: AsyncSession = Depends(get_async_db),  # Sesion de BD asincrona
+    current_user: Principal = Depends(rate_limited_user_async)  # Requiere usuario autenticado (con limite de escrituras)
+):  # Actualiza varias tareas con UPDATE por clave primaria
+    check_bulk_size(len(tasks))  # Valida el tamaño del lote
+    results = await db.run_sync(bulk_update_tasks, tasks, atomic)  # Actualiza por bloques
+    await atasks_changed(item.id for item in tasks)  # Descarta los totales, las tareas y las paginas cacheadas
+    return {"results": results}  # Un resultado por elemento
+
+
+@router.delete("/tasks/bulk", response_model=BulkTaskResponse)  # Ruta DELETE para eliminar tareas en lote
+async def delete_tasks_bulk(
+    body: TaskBulkDelete,  # IDs de las tareas a eliminar
+    atomic: bool = True,  # True: una sola transaccion; False: un commit por bloque
+    db: AsyncSession = Depends(get_async_db),  # Sesion de BD asincrona
+    current_user: Principal = Depends(rate_limited_user_async)  # Requiere usuario autenticado (con limite de escrituras)
+):  # Elimina varias tareas con DELETE ... WHERE id IN (...)
+    check_bulk_size(len(body.ids))  # Valida el tamaño del lote
+    results = await db.run_sync(bulk_delete_tasks, body.ids, atomic)  # Reutiliza la implementacion sincrona
+    await atasks_changed(body.ids)  # Descarta los totales, las tareas y las paginas cacheadas
+    return {"results": results}  # Un resultado por ID
+
+
+@router.get("/tasks/export")  # Ruta GET para exportar todas las tareas en streaming
+async def export_tasks(
+    format: Literal["ndjson", "csv"] = "ndjson",  # Formato de salida
+    status: Optional[TaskStatus] = None,  # Filtro por estado (igual que en el listado)
+    created_from: Optional[datetime] = None,  # Solo tareas con created_at >= created_from
+    created_to: Optional[datetime] = None,  # Solo tareas con created_at < created_to
+    q: Optional[str] = Query(None, min_length=1, max_length=100),  # Busqueda en titulo y descripcion
+):  # Transmite las filas sin cargar la tabla completa en memoria
+    filters = TaskFilters(status, created_from, created_to, q)  # Mismos filtros que GET /tasks
+    return StreamingResponse(  # Cada bloque sale del cursor del servidor y se envia de inmediato
+        aiter_export(format, filters),  # Generador con su propia sesion de BD
+        media_type=MEDIA_TYPES[format],  # application/x-ndjson o text/csv
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},  # Descarga como archivo
+    )
+
+
+@router.post("/tasks/lookup", response_model=TaskLookupResponse)  # Leer varias tareas por ID
+async def lookup_tasks_by_id(body: TaskLookup, db: AsyncSession = Depends(get_async_read_db)):  # IDs en el cuerpo
+    result = await db.run_sync(lookup_tasks, body.ids, body.include_archived)  # Un IN por bloque
+    return Response(dumps(result), media_type="application/json")
+
+
+@router.get("/tasks/stats", response_model=TaskStats)  # Numero de tareas por estado
+async def task_stats(request: Request, db: AsyncSession = Depends(get_async_read_db)):  # task_status_counts, no GROUP BY
+    return await acached_json_response(request, task_cache.stats_key, lambda: db.run_sync(task_stats_json))  # Cache + ETag
+
+
+@router.get("/tasks/changes")  # Ruta GET con los cambios de tareas en vivo (Server-Sent Events)
+async def task_changes(
+    since: Optional[int] = Query(None, ge=0),  # Reanuda despues de este seq (id del ultimo evento recibido)
+    last_event_id: Optional[str] = Header(None),  # Lo envia el EventSource al reconectar
+):  # Mismo stream que en modo sync (el hub lee con AsyncSession)
+    return change_stream(since, last_event_id)
+
+
+@router.get("/tasks/{task_id}", response_model=TaskRead)  # Ruta GET para obtener una tarea por ID
+async def get_task(  # ID, peticion y sesion de lectura
+    task_id: int, request: Request, include_archived: bool = False, db: AsyncSession = Depends(get_async_read_db),
+):
+    async def build() -> Tuple[bytes, str]:  # Se ejecuta solo si la tarea no esta en el cache
+        row = await async_task_loader.load(db, task_id)  # Busca la tarea por ID (un IN compartido con las lecturas concurrentes)
+        return await db.run_sync(task_json, task_id, include_archived, row)  # 404 si no existe; JSON y ETag
+
+    return await acached_json_response(request, lambda: task_cache.task_key(task_id, include_archived), build)  # Cache + ETag/If-None-Match
+
+
+@router.put("/tasks/{task_id}", response_model=TaskRead)  # Ruta PUT para actualizar una tarea
+async def update_task(
+    task_id: int,  # ID de la tarea a actualizar
+    task_data: TaskUpdate,  # Datos validados con campos opcionales
+    db: AsyncSession = Depends(get_async_db),  # Sesion de BD asincrona
+    if_match: Optional[str] = Header(None),  # ETag "v<version>" esperado (concurrencia optimista)
+    current_user: Principal = Depends(rate_limited_user_async),  # Requiere usuario autenticado (con limite de escrituras)
+):  # Actualiza parcialmente una tarea
+    changes = task_data.dict(exclude_unset=True)  # Solo los campos enviados
+    task = await db.run_sync(update_task_row, task_id, changes, parse_if_match(if_match))  # Un UPDATE; 404/412
+    await atasks_changed([task_id])  # Descarta los totales, la tarea y las paginas cacheadas
+    return task_response(task)  # Devuelve la tarea actualizada con su nuevo ETag
+
+
+@router.delete("/tasks/{task_id}", status_code=204)  # Ruta DELETE para eliminar una tarea
+async def delete_task(
+    task_id: int,  # ID de la tarea a eliminar
+    db: AsyncSession = Depends(get_async_db),  # Sesion de BD asincrona
+    if_match: Optional[str] = Header(None),  # ETag "v<version>" esperado (concurrencia optimista)
+    current_user: Principal = Depends(rate_limited_user_async),  # Requiere usuario autenticado (con limite de escrituras)
+):  # Elimina una tarea existente
+    await db.run_sync(delete_task_row, task_id, parse_if_match(if_match))  # Un solo DELETE; 404/412 si no borro nada
+    await atasks_changed([task_id])  # Descarta los totales, la tarea y las paginas cacheadas
+
+
+# Endpoints de autenticación
+@router.post("/auth/register", response_model=UserRead, status_code=201)  # Ruta POST para registrar nuevo usuario
+async def register_user(user: UserCreate, request: Request, db: AsyncSession = Depends(get_async_db)):  # Datos de usuario, peticion y sesion
+    """Crea un nuevo usuario con contraseña hasheada"""
+    await acheck_register(request)  # 429 si la IP supero el limite de registros
+    await db.run_sync(ensure_username_free, user.username)  # 400 si ya existe un usuario con ese username
+    hashed_pwd = await hash_password_async(user.password)  # Hashea sin bloquear el event loop
+    return await db.run_sync(create_user, user.username, hashed_pwd)  # Retorna el usuario creado (sin contraseña)
+
+
+@router.post("/auth/login", response_model=Token)  # Ruta POST para autenticar usuario
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):  # Credenciales via form
+    """Autentica un usuario y retorna un token JWT"""
+    await acheck_login(request, form_data.username)  # 429 antes de consultar la BD y de ejecutar bcrypt
+    db_user = await db.run_sync(find_login_user, form_data.username)  # 401 si no existe
+    valid, new_hash = await verify_and_update_async(form_data.password, db_user.hashed_password)  # Verifica en el pool
+    return await db.run_sync(login_token, db_user, valid, new_hash)  # 401 si no coincide; guarda el rehash y crea el token
@@ -5,31 +5,26 @@ from typing import Optional  # Tipado opcional
 from fastapi import Depends, HTTPException, status  # Dependencias y errores HTTP
 from fastapi.security import OAuth2PasswordBearer  # Esquema OAuth2 Bearer
 from jose import JWTError, jwt  # Para crear y verificar tokens JWT
-from passlib.context import CryptContext  # Para hashear contraseñas con bcrypt
+from sqlalchemy import select  # Consultas estilo 2.0 para la sesion asincrona
+from sqlalchemy.ext.asyncio import AsyncSession  # Sesion asincrona de SQLAlchemy
 from sqlalchemy.orm import Session  # Sesion de SQLAlchemy
 
-from database import get_db  # Dependencia para obtener la sesion
+from replicas import get_async_read_db, get_read_db  # Sesiones de lectura (replica o primario)
+from hashing import verify_and_update  # bcrypt ejecutado en el pool de hashing
 from model import User  # Modelo de usuario
+from token_cache import AUTH_STATELESS, Principal, token_cache  # Cache de tokens ya resueltos
 
 # Configuración de seguridad (leer de variables de entorno)
 SECRET_KEY = os.getenv("SECRET_KEY", "cambia_esta_clave_en_prod")  # Clave JWT
 ALGORITHM = "HS256"  # Algoritmo de encriptación para JWT
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))  # Expiracion del token
 
-# Contexto de bcrypt para hashear contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")  # Configuracion de bcrypt
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")  # Esquema Bearer para extraer el token
 
 
-def hash_password(password: str) -> str:  # Hashea una contraseña en texto plano
-    """Convierte una contraseña en texto plano a un hash seguro"""
-    return pwd_context.hash(password)  # Retorna el hash bcrypt
-
-
 def verify_password(plain_password: str, hashed_password: str) -> bool:  # Verifica si la contraseña coincide
     """Compara una contraseña en texto plano con un hash"""
-    return pwd_context.verify(plain_password, hashed_password)  # True si coincide, False si no
+    return verify_and_update(plain_password, hashed_password)[0]  # True si coincide, False si no
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:  # Crea un token JWT
@@ -44,24 +39,66 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt  # Retorna el token generado
 
 
-def get_current_user(  # Obtiene el usuario actual a partir del token JWT
-    token: str = Depends(oauth2_scheme),  # Extrae el token del header Authorization
-    db: Session = Depends(get_db)  # Sesion de BD para buscar al usuario
-) -> User:  # Devuelve la instancia de usuario
-    credentials_exception = HTTPException(  # Error 401 en caso de token invalido
+def _credentials_exception() -> HTTPException:  # Error 401 comun a las dependencias de autenticacion
+    return HTTPException(  # Error 401 en caso de token invalido
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Credenciales invalidas o token expirado",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_token(token: str) -> dict:  # Decodifica el token y valida que tenga subject
+    """Valida el token JWT y retorna su payload"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])  # Decodifica el token
         username: Optional[str] = payload.get("sub")  # Obtiene el subject (username)
         if username is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    return payload
+
+
+def _stateless_principal(payload: dict) -> Optional[Principal]:  # Usuario tomado de los claims del token
+    uid = payload.get("uid")  # ID del usuario firmado en el token
+    if AUTH_STATELESS and isinstance(uid, int):  # Solo si se configuro confiar en el token
+        return Principal(id=uid, username=payload["sub"])
+    return None
+
+
+def get_current_user(  # Obtiene el usuario actual a partir del token JWT
+    token: str = Depends(oauth2_scheme),  # Extrae el token del header Authorization
+    db: Session = Depends(get_read_db)  # Sesion de lectura para buscar al usuario
+) -> Principal:  # Devuelve el id y username del usuario
+    principal = token_cache.get(token)  # Token ya validado recientemente
+    if principal is not None:
+        return principal
+
+    payload = _decode_token(token)  # Valida el token
+    principal = _stateless_principal(payload)  # En modo stateless no se consulta la BD
+    if principal is None:
+        user = db.query(User).filter(User.username == payload["sub"]).first()  # Busca el usuario en BD
+        if user is None:
+            raise _credentials_exception()
+        principal = Principal(id=user.id, username=user.username)
+    token_cache.put(token, principal, payload.get("exp"))  # Reutiliza el resultado hasta el TTL o el exp
+    return principal  # Usuario autenticado
+
+
+async def get_current_user_async(  # Version asincrona de get_current_user para el modo async
+    token: str = Depends(oauth2_scheme),  # Extrae el token del header Authorization
+    db: AsyncSession = Depends(get_async_read_db)  # Sesion de lectura asincrona para buscar al usuario
+) -> Principal:  # Devuelve el id y username del usuario
+    principal = token_cache.get(token)  # Token ya validado recientemente
+    if principal is not None:
+        return principal
 
-    user = db.query(User).filter(User.username == username).first()  # Busca el usuario en BD
-    if user is None:
-        raise credentials_exception
-    return user  # Usuario autenticado
+    payload = _decode_token(token)  # Valida el token
+    principal = _stateless_principal(payload)  # En modo stateless no se consulta la BD
+    if principal is None:
+        user = (await db.execute(select(User).where(User.username == payload["sub"]))).scalars().first()  # Busca el usuario
+        if user is None:
+            raise _credentials_exception()
+        principal = Principal(id=user.id, username=user.username)
+    token_cache.put(token, principal, payload.get("exp"))  # Reutiliza el resultado hasta el TTL o el exp
+    return principal  # Usuario autenticado
@@ -0,0 +1,189 @@
+"""Mide rendimiento y latencias (p50/p95/p99) de cada ruta de la API con un cliente ASGI en proceso
+
+Uso:
+    python benchmarks/bench_api.py --requests 500
+    python benchmarks/bench_api.py --seed 1000000 --compare benchmarks/results/<commit>.json
+    DATABASE_URL=mysql+pymysql://root:@localhost/api_bench python benchmarks/bench_api.py
+    DB_MODE=async python benchmarks/bench_api.py
+
+Sin DATABASE_URL usa un archivo SQLite temporal. Las tareas que crea el benchmark se eliminan al final;
+las sembradas con --seed se conservan. Guarda los resultados en JSON (por defecto benchmarks/results/<commit>.json)
+y con --compare termina con codigo 1 si algun p95 empeora mas que --threshold.
+"""
+import argparse  # Argumentos de linea de comandos
+import json  # Resultados en JSON
+import math  # Redondeo de la ultima pagina
+import os  # Variables de entorno
+import platform  # Version de Python del entorno medido
+import subprocess  # Commit actual de git
+import sys  # Ruta del proyecto y codigo de salida
+import tempfile  # Archivo SQLite temporal
+import time  # Medicion de tiempos
+from datetime import datetime, timezone  # Fecha de la ejecucion
+from typing import Callable, Dict, List  # Tipado
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))  # Permite importar main.py
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:  # Percentil por rango mas cercano
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int) -> Dict[str, float]:  # Metricas de un escenario
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+    }
+
+
+def git_commit() -> Dict[str, object]:  # Commit medido (y si habia cambios sin confirmar)
+    def run(*cmd: str) -> str:
+        return subprocess.run(cmd, cwd=BENCH_DIR, capture_output=True, text=True).stdout.strip()
+    try:
+        return {"commit": run("git", "rev-parse", "--short", "HEAD") or "unknown",
+                "dirty": bool(run("git", "status", "--porcelain", "--untracked-files=no"))}
+    except OSError:  # git no instalado
+        return {"commit": "unknown", "dirty": False}
+
+
+def compare(previous_path: str, current: Dict, threshold: float) -> int:  # Imprime diferencias y cuenta regresiones
+    with open(previous_path, encoding="utf-8") as fh:
+        previous = json.load(fh)
+    print(f"\nComparacion con {previous.get('commit', '?')} ({previous_path}):")
+    regressions = 0
+    for name, now in current["results"].items():
+        before = previous.get("results", {}).get(name)
+        if not before or not before.get("p95_ms"):
+            print(f"  {name:<20} sin referencia")
+            continue
+        change = (now["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        regressed = change > threshold
+        regressions += regressed
+        print(f"  {name:<20} p95 {before['p95_ms']:9.2f} -> {now['p95_ms']:9.2f} ms  {change:+7.1f}%"
+              f"{'  REGRESION' if regressed else ''}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones por escenario")
+    parser.add_argument("--login-requests", type=int, default=20, help="Peticiones de login (bcrypt es caro)")
+    parser.add_argument("--warmup", type=int, default=10, help="Peticiones de calentamiento por escenario")
+    parser.add_argument("--page-size", type=int, default=20, help="page_size de los listados")
+    parser.add_argument("--seed", type=int, default=0, help="Siembra tareas hasta tener al menos N filas")
+    parser.add_argument("--cache", action="store_true", help="Mantiene el cache de respuestas (por defecto se desactiva)")
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="JSON de una ejecucion anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Porcentaje de empeoramiento del p95 tolerado")
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:  # Base desechable por defecto
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ.setdefault("DB_CREATE_ALL", "true")  # Sin Alembic: crea las tablas al arrancar la app
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")  # Se reporta en los resultados
+    os.environ.setdefault("RATE_LIMIT_BACKEND", "none")  # Todas las peticiones llegan desde la misma IP y usuario
+    if not args.cache:  # Mide la ruta completa hasta la base de datos
+        os.environ["TASK_CACHE_BACKEND"] = "none"
+
+    from fastapi.testclient import TestClient  # Cliente ASGI en proceso
+    from sqlalchemy import func, select  # Conteo inicial de filas
+
+    import main as api  # Aplicacion FastAPI
+    from database import DB_MODE, engine  # Motor y modo configurados
+    from model import Task  # Modelo de tareas
+    from pagination import encode_cursor  # Cursor para la pagina profunda en modo keyset
+    from seed_tasks import seed_tasks  # Sembrado de datos
+
+    results: Dict[str, Dict[str, float]] = {}
+
+    def run(name: str, count: int, call: Callable[[int], object], ok: int = 200) -> None:  # Ejecuta un escenario
+        for i in range(min(args.warmup, count)):  # Calentamiento sin medir (planes, caches del motor)
+            call(i)
+        latencies: List[float] = []
+        errors = 0
+        start = time.perf_counter()
+        for i in range(count):
+            began = time.perf_counter()
+            response = call(i)
+            latencies.append(time.perf_counter() - began)
+            errors += response.status_code != ok
+        results[name] = summarize(latencies, time.perf_counter() - start, errors)
+        r = results[name]
+        print(f"{name:<20} {r['throughput_rps']:9.1f} req/s  p50 {r['p50_ms']:8.2f}  p95 {r['p95_ms']:8.2f}"
+              f"  p99 {r['p99_ms']:8.2f} ms  errores {r['errors']}")
+
+    with TestClient(api.app) as client:
+        with engine.connect() as conn:
+            existing = conn.execute(select(func.count()).select_from(Task)).scalar_one()
+        if args.seed > existing:
+            print(f"Sembrando {args.seed - existing} tareas...")
+            seed_tasks(engine, args.seed - existing)
+        with engine.connect() as conn:
+            total, max_id = conn.execute(select(func.count(), func.max(Task.id)).select_from(Task)).one()
+
+        client.post("/auth/register", json={"username": "bench", "password": "bench123"})
+        credentials = {"username": "bench", "password": "bench123"}
+        token = client.post("/auth/login", data=credentials).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        n = args.requests
+        size = args.page_size
+        created: List[int] = []  # Tareas propias del benchmark (se eliminan al final)
+        extra = min(args.warmup, n)  # El calentamiento tambien crea tareas
+
+        def create(i: int):
+            response = client.post("/tasks", json={"title": f"bench {i}", "description": "benchmark"}, headers=headers)
+            created.append(response.json()["id"])
+            return response
+
+        last_page = max(1, math.ceil((total + n + extra) / size))  # Incluye las tareas que crea el benchmark
+        deep_cursor = encode_cursor(max(0, (max_id or 0) - size))  # Ultimos ids en modo keyset
+
+        run("login", args.login_requests, lambda i: client.post("/auth/login", data=credentials))
+        run("create", n, create)
+        run("list_shallow", n, lambda i: client.get(f"/tasks?page=1&page_size={size}"))
+        run("list_deep", n, lambda i: client.get(f"/tasks?page={last_page}&page_size={size}"))
+        run("list_deep_cursor", n, lambda i: client.get(f"/tasks?cursor={deep_cursor}&page_size={size}"))
+        run("get", n, lambda i: client.get(f"/tasks/{created[i % len(created)]}"))
+        run("update", n, lambda i: client.put(
+            f"/tasks/{created[i % len(created)]}", json={"status": "done"}, headers=headers))
+        run("delete", len(created) - extra, lambda i: client.delete(f"/tasks/{created.pop()}", headers=headers), ok=204)
+        for task_id in created:  # Restos del calentamiento
+            client.delete(f"/tasks/{task_id}", headers=headers)
+
+    report = {
+        **git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "db_mode": DB_MODE,
+        "rows": total,
+        "config": {
+            "requests": n, "login_requests": args.login_requests, "warmup": args.warmup, "page_size": size,
+            "response_cache": args.cache, "bcrypt_rounds": int(os.environ["BCRYPT_ROUNDS"]),
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(BENCH_DIR, "results", f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Resultados guardados en {output}")
+
+    if args.compare:
+        return 1 if compare(args.compare, report, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Compara la creacion, actualizacion y eliminacion de tareas una a una contra los endpoints /tasks/bulk
+
+Uso:
+    python benchmarks/bench_bulk.py --rows 2000
+    DATABASE_URL=mysql+pymysql://root:@localhost/api_bench python benchmarks/bench_bulk.py
+
+Sin DATABASE_URL usa un archivo SQLite temporal. La base debe estar vacia o ser desechable.
+"""
+import argparse  # Argumentos de linea de comandos
+import os  # Variables de entorno
+import sys  # Ruta del proyecto
+import tempfile  # Archivo SQLite temporal
+import time  # Medicion de tiempos
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Permite importar main.py
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000, help="Tareas por escenario")
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:  # Base desechable por defecto
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ.setdefault("DB_CREATE_ALL", "true")  # Sin Alembic: crea las tablas al arrancar la app
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")  # El login no es lo que se mide
+    os.environ.setdefault("RATE_LIMIT_BACKEND", "none")  # Todas las peticiones llegan desde la misma IP y usuario
+
+    from fastapi.testclient import TestClient  # Cliente ASGI en proceso
+    import bulk  # Limites de las operaciones masivas
+    import main as api  # Aplicacion FastAPI
+
+    with TestClient(api.app) as client:
+        client.post("/auth/register", json={"username": "bench", "password": "bench123"})
+        token = client.post("/auth/login", data={"username": "bench", "password": "bench123"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        payload = [{"title": f"tarea {i}", "description": "benchmark"} for i in range(args.rows)]
+        step = bulk.BULK_MAX_ITEMS  # Respeta el limite de elementos por peticion
+
+        def timed(label, func):  # Ejecuta y reporta un escenario
+            start = time.perf_counter()
+            ids = func()
+            elapsed = time.perf_counter() - start
+            print(f"{label:<22} {elapsed * 1000:10.1f} ms  {args.rows / elapsed:10.0f} filas/s")
+            return ids
+
+        single_ids = timed("POST /tasks", lambda: [
+            client.post("/tasks", json=item, headers=headers).json()["id"] for item in payload
+        ])
+        bulk_ids = timed("POST /tasks/bulk", lambda: [
+            result["id"]
+            for start in range(0, len(payload), step)
+            for result in client.post("/tasks/bulk", json=payload[start:start + step], headers=headers).json()["results"]
+        ])
+        timed("PUT /tasks/{id}", lambda: [
+            client.put(f"/tasks/{task_id}", json={"status": "done"}, headers=headers) for task_id in single_ids
+        ])
+        timed("PATCH /tasks/bulk", lambda: [
+            client.patch("/tasks/bulk", json=[{"id": i, "status": "done"} for i in bulk_ids[start:start + step]], headers=headers)
+            for start in range(0, len(bulk_ids), step)
+        ])
+        timed("DELETE /tasks/{id}", lambda: [
+            client.delete(f"/tasks/{task_id}", headers=headers) for task_id in single_ids
+        ])
+        timed("DELETE /tasks/bulk", lambda: [
+            client.request("DELETE", "/tasks/bulk", json={"ids": bulk_ids[start:start + step]}, headers=headers)
+            for start in range(0, len(bulk_ids), step)
+        ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Compara el coste por fila de serializar paginas de tareas: ORM + Pydantic contra filas Core + JSON directo
+
+Uso:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --sizes 20 100 1000 --repeat 200
+
+Usa un archivo SQLite temporal con tareas sembradas; cada medicion incluye la consulta, la hidratacion y el JSON.
+Al final muestra la memoria retenida por fila con objetos ORM, dicts y el DTO TaskRow.
+"""
+import argparse  # Argumentos de linea de comandos
+import json  # Serializacion de la ruta original de FastAPI
+import os  # Rutas
+import sys  # Ruta del proyecto
+import tempfile  # Archivo SQLite temporal
+import time  # Medicion de tiempos
+import tracemalloc  # Memoria por objeto de cada representacion
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Permite importar los modulos de la API
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Tamaños de pagina")
+    parser.add_argument("--repeat", type=int, default=100, help="Repeticiones por medicion")
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder  # Ruta original: dict -> response_model -> JSONResponse
+    from pydantic_core import to_json  # Serializador alternativo a orjson
+    from sqlalchemy import create_engine, select  # Engine propio del benchmark
+    from sqlalchemy.orm import Session  # Sesion ORM
+
+    import serialization  # Ruta rapida
+    from model import Task  # Modelo de tareas
+    from schemas import PaginatedTaskResponse  # Esquema de respuesta
+    from seed_tasks import seed_tasks  # Datos sinteticos
+
+    engine = create_engine("sqlite:///" + os.path.join(tempfile.mkdtemp(), "serialization.db"))
+    seed_tasks(engine, max(args.sizes), verbose=False)
+
+    def meta(items, size):  # Metadata comun de la pagina
+        return {"items": items, "total": size, "page": 1, "page_size": size, "total_pages": 1, "total_strategy": "exact"}
+
+    def orm_fastapi(db, size):  # Ruta original: FastAPI valida el dict con response_model y lo vuelve a codificar
+        tasks = db.scalars(select(Task).limit(size)).all()
+        return json.dumps(jsonable_encoder(PaginatedTaskResponse.model_validate(meta(tasks, size)))).encode()
+
+    def orm_pydantic(db, size):  # ORM + TaskRead(from_attributes) + model_dump_json
+        tasks = db.scalars(select(Task).limit(size)).all()
+        return PaginatedTaskResponse.model_validate(meta(tasks, size)).model_dump_json().encode()
+
+    def core_pydantic_core(db, size):  # Filas Core + pydantic_core.to_json
+        rows = db.execute(serialization.select_task_rows().limit(size)).all()
+        return to_json(meta(serialization.task_rows(rows), size))
+
+    def core_dumps(db, size):  # Filas Core + serialization.dumps (orjson si esta instalado)
+        rows = db.execute(serialization.select_task_rows().limit(size)).all()
+        return serialization.dumps(meta(serialization.task_rows(rows), size))
+
+    paths = [
+        ("orm + fastapi (original)", orm_fastapi),
+        ("orm + pydantic", orm_pydantic),
+        ("core + pydantic_core", core_pydantic_core),
+        (f"core + {serialization.JSON_BACKEND}", core_dumps),
+    ]
+    print(f"{'ruta':<26}{'filas':>7}{'us/fila':>10}{'ms/pagina':>11}{'vs original':>13}")
+    for size in args.sizes:
+        baseline = None
+        for label, func in paths:
+            with Session(engine) as db:
+                func(db, size)  # Calentamiento
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    func(db, size)
+                    db.expunge_all()  # Cada peticion empieza con el identity map vacio
+                elapsed = (time.perf_counter() - start) / args.repeat
+            baseline = baseline or elapsed
+            print(f"{label:<26}{size:>7}{elapsed / size * 1e6:>10.2f}{elapsed * 1000:>11.3f}{baseline / elapsed:>12.1f}x")
+
+    size = max(args.sizes)  # Memoria retenida por una pagina, segun como se representa cada tarea
+    loaders = [
+        ("objetos ORM", lambda db: db.scalars(select(Task).limit(size)).all()),
+        ("dicts", lambda db: [dict(zip(serialization.TASK_READ_FIELDS, row))
+                              for row in db.execute(serialization.select_task_rows().limit(size)).all()]),
+        ("TaskRow (__slots__)", lambda db: serialization.task_rows(
+            db.execute(serialization.select_task_rows().limit(size)).all())),
+    ]
+    print(f"\n{'representacion':<26}{'filas':>7}{'bytes/fila':>12}")
+    for label, load in loaders:
+        with Session(engine) as db:
+            load(db)  # Calentamiento (compilacion de la consulta)
+            db.expunge_all()
+            tracemalloc.start()
+            page = load(db)
+            retained = tracemalloc.get_traced_memory()[0]  # Incluye el identity map en el caso ORM
+            tracemalloc.stop()
+            print(f"{label:<26}{len(page):>7}{retained / len(page):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
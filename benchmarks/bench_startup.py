@@ -0,0 +1,77 @@
+"""Mide el arranque en frio de la API en procesos nuevos: imports, startup, /health/live y /health/ready
+
+Uso:
+    python benchmarks/bench_startup.py --runs 10
+    DATABASE_URL=mysql+pymysql://root:@localhost/api_database python benchmarks/bench_startup.py
+
+Cada ejecucion es un interprete nuevo (como un worker recien reciclado). Se reporta la mediana de cada fase en ms.
+"""
+import argparse  # Argumentos de linea de comandos
+import json  # Resultados del proceso hijo
+import os  # Variables de entorno
+import statistics  # Medianas
+import subprocess  # Procesos hijos
+import sys  # Interprete actual
+import tempfile  # Archivo SQLite temporal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Raiz del proyecto
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+import model
+after_model = time.perf_counter()
+import main
+after_main = time.perf_counter()
+from fastapi.testclient import TestClient
+begin = time.perf_counter()
+with TestClient(main.app) as client:
+    started = time.perf_counter()
+    live = client.get("/health/live").status_code
+    after_live = time.perf_counter()
+    ready = client.get("/health/ready").status_code
+    after_ready = time.perf_counter()
+print(json.dumps({
+    "import_model": after_model - start, "import_main": after_main - after_model, "startup": started - begin,
+    "live": after_live - started, "ready": after_ready - after_live, "live_status": live, "ready_status": ready,
+}))
+"""
+
+PHASES = ("import_model", "import_main", "startup", "live", "ready")
+
+
+def run(env: dict, runs: int) -> dict:  # Ejecuta el hijo varias veces y retorna medianas
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD], cwd=ROOT, env={**os.environ, **env}, capture_output=True, text=True, check=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    summary = {phase: statistics.median(sample[phase] for sample in samples) * 1000 for phase in PHASES}
+    summary.update(live_status=samples[-1]["live_status"], ready_status=samples[-1]["ready_status"])
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Procesos por escenario")
+    args = parser.parse_args()
+
+    url = os.environ.get("DATABASE_URL") or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "startup.db")
+    scenarios = [
+        ("DB_CREATE_ALL=true", {"DATABASE_URL": url, "DB_CREATE_ALL": "true"}),  # Comportamiento anterior
+        ("perezoso (Alembic)", {"DATABASE_URL": url, "DB_CREATE_ALL": "false"}),
+        ("BD inalcanzable", {"DATABASE_URL": "mysql+pymysql://root:@127.0.0.1:1/api_database", "DB_CREATE_ALL": "false"}),
+    ]
+    print(f"{'escenario':<22}" + "".join(f"{phase:>14}" for phase in PHASES) + "   live/ready")
+    for label, env in scenarios:
+        result = run(env, args.runs)
+        if label == "DB_CREATE_ALL=true" and "DATABASE_URL" not in os.environ:  # La base temporal no tiene alembic_version
+            subprocess.run([sys.executable, "-m", "alembic", "stamp", "head"], cwd=ROOT, env={**os.environ, **env},
+                           capture_output=True, check=True)  # Marca las tablas creadas como migradas
+        print(f"{label:<22}" + "".join(f"{result[phase]:>12.1f}ms" for phase in PHASES)
+              + f"   {result['live_status']}/{result['ready_status']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Ejecuta el mismo flujo de la API con DB_MODE=sync y DB_MODE=async y compara las respuestas
+
+Uso:
+    python benchmarks/check_api_modes.py
+    DATABASE_URL=mysql+pymysql://root:@localhost/api_bench python benchmarks/check_api_modes.py
+
+Sin DATABASE_URL cada modo usa un archivo SQLite temporal nuevo (aiosqlite en modo async). Con DATABASE_URL la base
+debe estar vacia o ser desechable: se usa primero en modo sync y luego en async. Cada modo corre en su propio proceso
+(DB_MODE se lee al importar la app). Termina con codigo 1 si algun paso no responde el estado esperado o si los dos
+modos responden distinto.
+"""
+import json  # Resultados del proceso hijo
+import os  # Variables de entorno
+import re  # Normaliza las fechas de las respuestas
+import subprocess  # Un proceso por modo
+import sys  # Ruta del proyecto y codigo de salida
+import tempfile  # Archivo SQLite temporal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Permite importar main.py
+
+_DATES = re.compile(r'"created_at":"[^"]*"')  # created_at depende del reloj: no se compara
+
+
+def run_flow() -> list:  # Se ejecuta en el proceso hijo, con DB_MODE ya definido
+    from fastapi.testclient import TestClient  # Cliente ASGI en proceso
+    import main as api  # Aplicacion FastAPI
+
+    steps = []
+
+    def step(label, response, expected):  # Guarda estado, ETag de tarea y cuerpo normalizado
+        etag = response.headers.get("etag", "")
+        steps.append({
+            "step": label,
+            "status": response.status_code,
+            "expected": expected,
+            "etag": etag if etag.startswith('"v') else "",  # Los ETag de listados son un hash del cuerpo (con fechas)
+            "body": _DATES.sub('"created_at":"-"', response.text),
+        })
+        return response
+
+    with TestClient(api.app) as client:
+        step("register", client.post("/auth/register", json={"username": "modos", "password": "modos123"}), 201)
+        step("register duplicado", client.post("/auth/register", json={"username": "modos", "password": "modos123"}), 400)
+        step("login incorrecto", client.post("/auth/login", data={"username": "modos", "password": "otra"}), 401)
+        token = step("login", client.post("/auth/login", data={"username": "modos", "password": "modos123"}), 200)
+        headers = {"Authorization": f"Bearer {token.json()['access_token']}"}
+        steps[-1]["body"] = ""  # El token lleva la fecha de expiracion
+
+        step("crear", client.post("/tasks", json={"title": "una", "description": "buscar"}, headers=headers), 200)
+        step("crear sin token", client.post("/tasks", json={"title": "x"}), 401)
+        step("bulk crear", client.post("/tasks/bulk", json=[{"title": f"lote {i}"} for i in range(4)], headers=headers), 201)
+        step("listar", client.get("/tasks?page=1&page_size=3&sort=-id"), 200)
+        step("listar cursor", client.get("/tasks?pagination=cursor&page_size=2"), 200)
+        step("listar filtros", client.get("/tasks?q=buscar&status=pending"), 200)
+        step("listar ids", client.get("/tasks?ids=3,1,99"), 200)
+        step("lookup", client.post("/tasks/lookup", json={"ids": [2, 404]}), 200)
+        first = step("obtener", client.get("/tasks/1"), 200)
+        step("obtener 304", client.get("/tasks/1", headers={"If-None-Match": first.headers["etag"]}), 304)
+        step("actualizar", client.put("/tasks/1", json={"status": "done"}, headers={**headers, "If-Match": '"v1"'}), 200)
+        step("actualizar 412", client.put("/tasks/1", json={"title": "y"}, headers={**headers, "If-Match": '"v1"'}), 412)
+        step("bulk actualizar", client.patch("/tasks/bulk", json=[{"id": 2, "status": "in_progress"}, {"id": 77}], headers=headers), 200)
+        step("eliminar", client.delete("/tasks/3", headers=headers), 204)
+        step("obtener eliminada", client.get("/tasks/3"), 404)
+        step("bulk eliminar", client.request("DELETE", "/tasks/bulk", json={"ids": [4, 3]}, headers=headers), 200)
+        step("conteo por estado", client.get("/tasks/stats"), 200)
+        step("exportar", client.get("/tasks/export?format=ndjson"), 200)
+        step("listar final", client.get("/tasks"), 200)
+    return steps
+
+
+def run_mode(mode: str) -> list:  # Lanza el flujo en un proceso nuevo con DB_MODE=mode
+    env = dict(os.environ, DB_MODE=mode)
+    if "DATABASE_URL" not in os.environ:  # Base desechable por modo
+        env["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), f"{mode}.db")
+    env.setdefault("DB_CREATE_ALL", "true")  # Sin Alembic: crea las tablas al arrancar la app
+    env.setdefault("BCRYPT_ROUNDS", "4")  # El login no es lo que se comprueba
+    env.setdefault("RATE_LIMIT_BACKEND", "none")  # Todas las peticiones llegan desde la misma IP y usuario
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child"], env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit(f"El flujo en modo {mode} termino con codigo {result.returncode}")
+    return json.loads(result.stdout.splitlines()[-1])  # La ultima linea es el JSON (antes pueden ir avisos)
+
+
+def main() -> int:
+    results = {mode: run_mode(mode) for mode in ("sync", "async")}
+    failures = 0
+    for sync_step, async_step in zip(results["sync"], results["async"]):
+        problems = [
+            f"{mode} respondio {step['status']} (esperado {step['expected']})"
+            for mode, step in (("sync", sync_step), ("async", async_step)) if step["status"] != step["expected"]
+        ]
+        if {key: sync_step[key] for key in ("status", "etag", "body")} != {key: async_step[key] for key in ("status", "etag", "body")}:
+            problems.append(f"respuestas distintas:\n      sync:  {sync_step['body'][:300]}\n      async: {async_step['body'][:300]}")
+        failures += bool(problems)
+        print(f"{'FAIL' if problems else 'OK  '} {sync_step['step']:<20} {sync_step['status']}")
+        for problem in problems:
+            print(f"     {problem}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        print(json.dumps(run_flow()))
+    else:
+        sys.exit(main())
@@ -0,0 +1,56 @@
+"""Verifica con EXPLAIN que los filtros y ordenamientos de GET /tasks usan los indices esperados
+
+Uso:
+    python benchmarks/check_query_plans.py
+    DATABASE_URL=mysql+pymysql://root:@localhost/api_bench python benchmarks/check_query_plans.py
+
+Sin DATABASE_URL crea las tablas en un archivo SQLite temporal. Termina con codigo 1 si algun plan no usa su indice.
+"""
+import os  # Variables de entorno
+import sys  # Ruta del proyecto y codigo de salida
+import tempfile  # Archivo SQLite temporal
+from datetime import datetime  # Rango de fechas de ejemplo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Permite importar los modulos de la API
+
+
+def main() -> int:
+    if "DATABASE_URL" not in os.environ:  # Base desechable por defecto
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "plans.db")
+
+    from sqlalchemy import select  # Consultas a explicar
+
+    from database import engine  # Motor configurado
+    from model import Base, Task  # Tablas e indices del modelo
+    from schemas import TaskStatus  # Estados validos
+    from task_queries import TaskFilters, task_order_by  # Mismas consultas que el listado
+
+    Base.metadata.create_all(bind=engine)  # Crea tablas e indices si no existen
+    dialect = engine.dialect.name
+    cases = [  # (descripcion, filtros, orden, indice esperado)
+        ("status + orden por fecha", TaskFilters(status=TaskStatus.done), "-created_at", "ix_task_status_created_at"),
+        ("status + rango de fechas", TaskFilters(status=TaskStatus.pending, created_from=datetime(2024, 1, 1)),
+         "id", "ix_task_status_created_at"),
+        ("rango de fechas", TaskFilters(created_from=datetime(2024, 1, 1), created_to=datetime(2025, 1, 1)),
+         "created_at", "ix_task_created_at"),
+    ]
+    if dialect == "mysql":  # El indice FULLTEXT solo existe en MySQL
+        cases.append(("busqueda de texto", TaskFilters(q="comprar"), "id", "ix_task_title_description"))
+
+    failures = 0
+    with engine.connect() as conn:
+        for label, filters, sort, index in cases:
+            stmt = select(Task).where(*filters.clauses(dialect)).order_by(*task_order_by(sort)).limit(20)
+            sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            if dialect == "sqlite":
+                plan = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]  # Columna detail
+            else:
+                plan = [str(row._mapping.get("key")) for row in conn.exec_driver_sql("EXPLAIN " + sql)]  # Columna key
+            ok = any(index in line for line in plan)
+            failures += not ok
+            print(f"{'OK  ' if ok else 'FAIL'} {label:<28} {index:<28} {' | '.join(plan)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Comprueba el enrutamiento a replicas de lectura con dos archivos SQLite (primario y replica atrasada)
+
+Uso:
+    python benchmarks/check_replicas.py
+
+En cada modo (DB_MODE=sync y async, un proceso por modo) guarda un usuario y una tarea directo en el primario, copia
+el archivo del primario como replica (una "replicacion" que despues ya no avanza) y crea por la API otra tarea que solo
+existe en el primario. Segun si GET /tasks?ids=1,2 encuentra la tarea 2 se sabe de donde leyo la peticion. Comprueba:
+read-your-writes del cliente que escribio (y que vence tras REPLICA_STICKY_SECONDS), que otro cliente lee de la replica,
+que POST /tasks/lookup no activa la ventana y que una replica que no conecta sale de rotacion (failover al primario).
+Usa SHARED_STATE_BACKEND=file, el backend bloqueante (el middleware lo consulta en el threadpool). Termina con codigo 1 si algo falla.
+"""
+import json  # Resultados del proceso hijo
+import os  # Variables de entorno
+import shutil  # Copia del primario como replica
+import subprocess  # Un proceso por modo
+import sys  # Ruta del proyecto y codigo de salida
+import tempfile  # Archivos SQLite temporales
+import time  # Espera de la ventana de read-your-writes
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Permite importar main.py
+
+STICKY_SECONDS = 1  # REPLICA_STICKY_SECONDS de la prueba
+
+
+def run_checks(primary: str, replica: str) -> list:  # Se ejecuta en el proceso hijo, con el entorno ya definido
+    from fastapi.testclient import TestClient  # Cliente ASGI en proceso
+    import main as api  # Aplicacion FastAPI
+    from auth import create_access_token  # Token del usuario sembrado
+    from database import SessionLocal  # Sesion contra el primario
+    from model import Task, User  # Filas sembradas antes de la "replicacion"
+
+    checks = []
+
+    def check(label, ok, detail=""):
+        checks.append({"check": label, "ok": bool(ok), "detail": str(detail)})
+
+    def source(client) -> str:  # "primario" si ve la tarea 2 (solo esta en el primario), "replica" si no
+        response = client.get("/tasks?ids=1,2")
+        return "replica" if response.json()["missing"] == [2] else "primario"
+
+    writer = TestClient(api.app, client=("10.0.0.1", 50000))  # Cliente que escribe
+    reader = TestClient(api.app, client=("10.0.0.2", 50000))  # Cliente que solo lee
+    with writer:  # El arranque crea las tablas en el primario (DB_CREATE_ALL)
+        with SessionLocal() as db:  # Directo en el primario: ninguna peticion escribio todavia
+            user = User(username="replicas", hashed_password="-")
+            db.add_all([user, Task(title="replicada")])
+            db.commit()
+            headers = {"Authorization": f"Bearer {create_access_token({'sub': user.username, 'uid': user.id})}"}
+        shutil.copyfile(primary, replica)  # La replica tiene al usuario y a la tarea 1
+
+        sources = [source(reader) for _ in range(4)]  # Round-robin: la replica sana y la que no conecta
+        check("lee de la replica", sources[-2:] == ["replica", "replica"], sources)
+        metrics = writer.get("/metrics").text
+        check("replica caida fuera de rotacion", 'api_db_replica_up{replica="1"} 0' in metrics)
+        failovers = [line for line in metrics.splitlines() if line.startswith('api_db_read_routing_total{target="failover"}')]
+        check("failover al primario", failovers and int(failovers[0].split()[-1]) >= 1, failovers)
+
+        created = writer.post("/tasks", json={"title": "solo en el primario"}, headers=headers)  # Solo queda la replica sana
+        check("escritura en el primario", created.status_code == 200 and created.json()["id"] == 2, created.text)
+        check("read-your-writes tras escribir", source(writer) == "primario")
+        check("otro cliente sigue en la replica", source(reader) == "replica")
+
+        time.sleep(STICKY_SECONDS + 0.2)
+        check("la ventana vence", source(writer) == "replica")
+        lookup = writer.post("/tasks/lookup", json={"ids": [1, 2]})
+        check("POST /tasks/lookup lee de la replica", lookup.json()["missing"] == [2], lookup.text)
+        check("POST /tasks/lookup no activa la ventana", source(writer) == "replica")
+
+        stats = reader.get("/admin/replicas", headers=headers).json()
+        check("/admin/replicas", [replica["healthy"] for replica in stats["replicas"]] == [True, False], stats)
+    return checks
+
+
+def run_mode(mode: str) -> list:  # Lanza las comprobaciones en un proceso nuevo con DB_MODE=mode
+    folder = tempfile.mkdtemp()
+    primary, replica = os.path.join(folder, "primary.db"), os.path.join(folder, "replica.db")
+    env = dict(
+        os.environ,
+        DB_MODE=mode,
+        DATABASE_URL=f"sqlite:///{primary}",
+        DATABASE_REPLICA_URLS=f"sqlite:///{replica},sqlite:///{os.path.join(folder, 'no-existe', 'replica.db')}",
+        REPLICA_STICKY_SECONDS=str(STICKY_SECONDS),
+        SHARED_STATE_BACKEND="file",
+        SHARED_STATE_PATH=os.path.join(folder, "shared.db"),
+        DB_CREATE_ALL="true",  # Sin Alembic: crea las tablas al arrancar la app
+        BCRYPT_ROUNDS="4",  # El login no es lo que se comprueba
+        RATE_LIMIT_BACKEND="none",
+        TASK_CACHE_BACKEND="none",  # Cada lectura llega a la BD
+    )
+    env.pop("ASYNC_DATABASE_URL", None)
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", primary, replica], env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit(f"Las comprobaciones en modo {mode} terminaron con codigo {result.returncode}")
+    return json.loads(result.stdout.splitlines()[-1])  # La ultima linea es el JSON (antes pueden ir avisos)
+
+
+def main() -> int:
+    failures = 0
+    for mode in ("sync", "async"):
+        for result in run_mode(mode):
+            failures += not result["ok"]
+            print(f"{'OK  ' if result['ok'] else 'FAIL'} {mode:<5} {result['check']}")
+            if not result["ok"]:
+                print(f"     {result['detail'][:300]}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        print(json.dumps(run_checks(*sys.argv[sys.argv.index("--child") + 1:])))
+    else:
+        sys.exit(main())
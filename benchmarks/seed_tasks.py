@@ -0,0 +1,68 @@
+"""Inserta tareas sinteticas en bloques para pruebas de carga (pensado para 1M+ filas)
+
+Uso:
+    python benchmarks/seed_tasks.py --rows 1000000
+    DATABASE_URL=mysql+pymysql://root:@localhost/api_bench python benchmarks/seed_tasks.py --rows 2000000 --batch 20000
+
+Sin DATABASE_URL usa DATABASE_URL por defecto de database.py. Crea las tablas si no existen.
+"""
+import argparse  # Argumentos de linea de comandos
+import os  # Variables de entorno
+import random  # Datos sinteticos reproducibles
+import sys  # Ruta del proyecto
+import time  # Medicion del avance
+from datetime import datetime, timedelta  # Fechas de creacion repartidas en el tiempo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Permite importar los modulos de la API
+
+STATUSES = ("pending", "in_progress", "done")  # Estados repartidos de forma uniforme
+WORDS = ("comprar", "revisar", "enviar", "llamar", "preparar", "informe", "reunion", "factura", "cliente", "pedido")
+
+
+def seed_tasks(engine, rows: int, batch_size: int = 10000, seed: int = 42, verbose: bool = True) -> int:
+    """Inserta `rows` tareas con INSERT multi-fila, una transaccion por bloque; retorna las filas insertadas"""
+    from sqlalchemy import insert  # Insercion Core sin objetos ORM
+
+    from model import Base, Task  # Tablas de la API
+
+    Base.metadata.create_all(bind=engine)  # Crea las tablas si no existen
+    rng = random.Random(seed)  # Mismos datos en cada ejecucion
+    now = datetime.now().replace(microsecond=0)
+    start = time.perf_counter()
+    inserted = 0
+    while inserted < rows:
+        size = min(batch_size, rows - inserted)
+        batch = [
+            {
+                "title": " ".join(rng.sample(WORDS, 3)),
+                "description": " ".join(rng.sample(WORDS, 5)) if rng.random() < 0.8 else None,
+                "status": STATUSES[rng.randrange(len(STATUSES))],
+                "created_at": now - timedelta(seconds=rng.randrange(365 * 24 * 3600)),  # Ultimo año
+            }
+            for _ in range(size)
+        ]
+        with engine.begin() as conn:  # executemany: el driver agrupa las filas del bloque
+            conn.execute(insert(Task), batch)
+        inserted += size
+        if verbose:
+            elapsed = time.perf_counter() - start
+            print(f"\r{inserted:>10}/{rows} filas  {inserted / elapsed:10.0f} filas/s", end="", flush=True)
+    if verbose:
+        print()
+    return inserted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Tareas a insertar")
+    parser.add_argument("--batch", type=int, default=10000, help="Filas por transaccion")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de los datos aleatorios")
+    args = parser.parse_args()
+
+    from database import engine  # Motor configurado por DATABASE_URL
+
+    seed_tasks(engine, args.rows, args.batch, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os  # Lectura de variables de entorno
+from typing import Any, Dict, Iterator, List, Sequence  # Tipado
+
+from fastapi import HTTPException  # Errores HTTP
+from sqlalchemy import Row, bindparam, delete, insert, select, text, update  # Sentencias multi-fila
+from sqlalchemy.orm import Session  # Sesion de SQLAlchemy
+
+from changes import record_changes  # Registro de cambios para GET /tasks/changes
+from model import Task, TaskStatus  # Modelo de tareas y estado por defecto
+from task_stats import locked_statuses, record_status_change  # Conteo por estado en la misma transaccion
+from schemas import TaskBulkUpdateItem, TaskCreate  # Esquemas de entrada
+from serialization import TASK_READ_COLUMNS, TaskRow, select_task_rows, task_rows  # Columnas de TaskRead
+
+# Configuración de las operaciones masivas (leer de variables de entorno)
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "1000"))  # Maximo de elementos por peticion
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))  # Filas por sentencia multi-fila
+
+
+def check_bulk_size(count: int) -> None:  # Rechaza peticiones vacias o demasiado grandes
+    """Valida el numero de elementos de una operacion masiva"""
+    if count == 0:
+        raise HTTPException(status_code=422, detail="La lista no puede estar vacia")
+    if count > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Maximo {BULK_MAX_ITEMS} elementos por peticion")
+
+
+def _chunks(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:  # Parte la lista en bloques
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _load_tasks(db: Session, ids: Sequence[int]) -> Dict[int, Task]:  # Carga varias tareas con un solo IN
+    tasks: Dict[int, Task] = {}
+    for chunk in _chunks(list(ids), BULK_CHUNK_SIZE):
+        stmt = select(Task).where(Task.id.in_(chunk)).execution_options(populate_existing=True)
+        tasks.update({task.id: task for task in db.scalars(stmt)})
+    return tasks
+
+
+def _insert_rows(db: Session, rows: Sequence[Dict[str, Any]]) -> List[Row]:  # Un INSERT multi-fila por bloque
+    """Inserta las filas y retorna sus columnas de TaskRead en el mismo orden que rows"""
+    table = Task.__table__
+    if db.get_bind().dialect.insert_executemany_returning:  # SQLite, PostgreSQL, MariaDB: INSERT ... VALUES (...), (...) RETURNING
+        inserted = db.execute(insert(table).returning(*TASK_READ_COLUMNS), rows).all()
+        return sorted(inserted, key=lambda row: row.id)  # Los ids se asignan en el orden de VALUES
+    result = db.execute(insert(table).values(list(rows)))  # MySQL: un solo INSERT multi-fila, sin RETURNING
+    step = db.execute(text("SELECT @@auto_increment_increment")).scalar()  # > 1 con Galera o varios primarios
+    ids = [result.lastrowid + step * offset for offset in range(result.rowcount)]  # LAST_INSERT_ID(): la primera fila
+    inserted = db.execute(select_task_rows().where(Task.id.in_(ids)).order_by(Task.id)).all()
+    expected = [(row["title"], row.get("description"), row.get("status", TaskStatus.pending)) for row in rows]
+    if [(row.title, row.description, row.status) for row in inserted] != expected:  # Ids intercalados con otro INSERT
+        raise RuntimeError(
+            "El INSERT multi-fila no asigno ids consecutivos (innodb_autoinc_lock_mode=2 con inserciones concurrentes): "
+            "usa innodb_autoinc_lock_mode=1"
+        )
+    return inserted
+
+
+def bulk_create_tasks(db: Session, items: List[TaskCreate], atomic: bool = True) -> List[Dict[str, Any]]:
+    """Inserta las tareas con INSERT multi-fila y retorna un resultado por elemento"""
+    rows = [item.dict() for item in items]  # Valores a insertar
+    created: List[TaskRow] = []
+    for chunk in _chunks(rows, BULK_CHUNK_SIZE):
+        tasks = task_rows(_insert_rows(db, chunk))  # Leidas antes del commit: sin refresh ni SELECT por tarea
+        created.extend(tasks)
+        record_status_change(db, added=[task.status for task in tasks])  # Con el bloque: mismo commit
+        record_changes(db, "created", [task.id for task in tasks])
+        if not atomic:  # Un commit por bloque
+            db.commit()
+    if atomic:  # Una sola transaccion para toda la peticion
+        db.commit()
+    return [{"index": index, "id": task.id, "status": "created", "task": task} for index, task in enumerate(created)]
+
+
+def bulk_update_tasks(db: Session, items: List[TaskBulkUpdateItem], atomic: bool = True) -> List[Dict[str, Any]]:
+    """Actualiza las tareas con UPDATE por clave primaria y retorna un resultado por elemento"""
+    changes = [{"b_id": item.id, **item.dict(exclude_unset=True, exclude={"id"})} for item in items]
+    table = Task.__table__
+    stmt = update(table).where(table.c.id == bindparam("b_id")).values(version=table.c.version + 1)  # Incrementa la version
+    existing: set = set()  # Las que existian con la fila ya bloqueada
+    for chunk in _chunks(changes, BULK_CHUNK_SIZE):
+        locked = locked_statuses(db, [change["b_id"] for change in chunk])  # Nadie las borra hasta el commit
+        existing.update(locked)
+        chunk = [change for change in chunk if change["b_id"] in locked]  # Solo se actualizan las que existen
+        groups: Dict[frozenset, List[Dict[str, Any]]] = {}  # executemany necesita las mismas columnas
+        for change in chunk:
+            if len(change) > 1:  # Hay algo que actualizar ademas del id
+                groups.setdefault(frozenset(change), []).append(change)
+        previous = {change["b_id"]: locked[change["b_id"]] for change in chunk if "status" in change}  # Transiciones
+        for params in groups.values():
+            db.execute(stmt, params)  # UPDATE task SET ..., version = version + 1 WHERE id = ? (executemany)
+        if previous:  # Estado final leido de la BD (un id repetido en el lote cuenta una vez)
+            current = locked_statuses(db, list(previous))
+            record_status_change(db, removed=previous.values(), added=current.values())
+        record_changes(db, "updated", [change["b_id"] for params in groups.values() for change in params])
+        if not atomic:
+            db.commit()
+    if atomic:
+        db.commit()
+    loaded = _load_tasks(db, list(existing))  # Estado final (otra peticion pudo borrarlas tras el commit)
+    return [
+        {"index": index, "id": item.id, "status": "updated", "task": loaded[item.id]}
+        if item.id in loaded else
+        {"index": index, "id": item.id, "status": "not_found", "task": None}
+        for index, item in enumerate(items)
+    ]
+
+
+def bulk_delete_tasks(db: Session, ids: List[int], atomic: bool = True) -> List[Dict[str, Any]]:
+    """Elimina las tareas con DELETE ... WHERE id IN (...) y retorna un resultado por elemento"""
+    returning = db.get_bind().dialect.delete_returning
+    deleted: set = set()  # Solo se reportan las filas que borro este DELETE (no las que borro otra peticion)
+    for chunk in _chunks(sorted(set(ids)), BULK_CHUNK_SIZE):
+        stmt = delete(Task).where(Task.id.in_(chunk))
+        if returning:  # SQLite, PostgreSQL, MariaDB 10.5+: ids y estados salen del mismo DELETE
+            removed = dict(db.execute(stmt.returning(Task.id, Task.status)).all())
+        else:  # MySQL: las filas bloqueadas son exactamente las que borra el DELETE
+            removed = locked_statuses(db, chunk)
+            db.execute(stmt)
+        deleted.update(removed)
+        record_status_change(db, removed=removed.values())  # Estados que salen del conteo
+        record_changes(db, "deleted", sorted(removed))
+        if not atomic:
+            db.commit()
+    if atomic:
+        db.commit()
+    return [
+        {"index": index, "id": task_id, "status": "deleted" if task_id in deleted else "not_found", "task": None}
+        for index, task_id in enumerate(ids)
+    ]
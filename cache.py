@@ -0,0 +1,284 @@
+import hashlib  # Hash del cuerpo para el ETag
+import os  # Lectura de variables de entorno
+import threading  # Bloqueo para el cache en memoria
+import time  # Reloj para el TTL
+from collections import OrderedDict  # Orden LRU
+from typing import Awaitable, Callable, Dict, Iterable, NamedTuple, Optional, Tuple, Union  # Tipado
+
+from fastapi import Request, Response  # Peticion y respuesta HTTP
+
+from shared_state import FakeRedis, build_shared_client, get_shared_state, run_shared  # Clientes con la interfaz de redis-py
+
+# Configuración del cache de respuestas (leer de variables de entorno)
+TASK_CACHE_BACKEND = os.getenv("TASK_CACHE_BACKEND", "memory")  # memory | shared | redis | fakeredis | none
+TASK_CACHE_TTL = int(os.getenv("TASK_CACHE_TTL", "30"))  # Segundos de vida de cada respuesta cacheada
+TASK_CACHE_MAX_ENTRIES = int(os.getenv("TASK_CACHE_MAX_ENTRIES", "1024"))  # Entradas del backend en memoria
+
+
+class CacheBackend:  # Interfaz comun de los backends de cache
+    """Almacen clave -> bytes con TTL y contadores sin expiracion"""
+
+    blocking = False  # True si cada operacion hace I/O (desde codigo async se usa en el threadpool)
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    def get_counter(self, key: str) -> int:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    def set_counters(self, keys: Iterable[str], value: int, ttl: int) -> None:  # Varios contadores con expiracion
+        raise NotImplementedError
+
+
+class NullCacheBackend(CacheBackend):  # Cache desactivado
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        pass
+
+    def delete(self, *keys: str) -> None:
+        pass
+
+    def get_counter(self, key: str) -> int:
+        return 0
+
+    def incr(self, key: str) -> int:
+        return 0
+
+    def set_counters(self, keys: Iterable[str], value: int, ttl: int) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):  # LRU con TTL dentro del proceso
+    """Cache LRU en memoria con expiracion por entrada"""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries  # Maximo de entradas antes de descartar las menos usadas
+        self._lock = threading.Lock()  # Protege las estructuras entre hilos
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()  # clave -> (valor, expira)
+        self._counters: Dict[str, Tuple[int, float]] = {}  # Contadores -> (valor, expira): nunca se descartan por LRU
+        self._next_purge = 0.0  # Proxima limpieza de contadores vencidos
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() >= entry[1]:  # Entrada vencida
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def get_counter(self, key: str) -> int:
+        with self._lock:
+            value, expires = self._counters.get(key, (0, 0.0))
+            return value if time.monotonic() < expires else 0
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = self._counters.get(key, (0, 0.0))[0] + 1
+            self._counters[key] = (value, float("inf"))  # Sin expiracion
+            return value
+
+    def set_counters(self, keys: Iterable[str], value: int, ttl: int) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if len(self._counters) > self.max_entries and now >= self._next_purge:  # Como mucho una vez por segundo
+                self._next_purge = now + 1
+                for key in [key for key, (_, expires) in self._counters.items() if expires <= now]:
+                    del self._counters[key]
+            for key in keys:
+                self._counters[key] = (value, now + ttl)
+
+
+class RedisCacheBackend(CacheBackend):  # Backend sobre un cliente con la interfaz de redis-py
+    """Usa get/set(ex=)/delete/incr de un cliente Redis (o FakeRedis)"""
+
+    def __init__(self, client) -> None:
+        self.client = client  # redis.Redis, FileRedis o FakeRedis
+        self.blocking = not isinstance(client, FakeRedis)  # Red (redis) o bloqueo del archivo (FileRedis)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.client.set(key, value, ex=ttl)
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.client.delete(*keys)
+
+    def get_counter(self, key: str) -> int:
+        return int(self.client.get(key) or 0)
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(key))
+
+    def set_counters(self, keys: Iterable[str], value: int, ttl: int) -> None:
+        if hasattr(self.client, "pipeline"):  # redis-py: un solo viaje de red
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.set(key, value, ex=ttl)
+            pipe.execute()
+            return
+        for key in keys:  # FakeRedis y FileRedis
+            self.client.set(key, value, ex=ttl)
+
+
+def build_cache_backend(name: str = TASK_CACHE_BACKEND) -> CacheBackend:  # Crea el backend configurado
+    """Crea el backend de cache indicado por TASK_CACHE_BACKEND"""
+    if name == "none":
+        return NullCacheBackend()
+    if name == "memory":
+        return MemoryCacheBackend(TASK_CACHE_MAX_ENTRIES)
+    if name == "shared":  # El mismo almacen que SHARED_STATE_BACKEND (comun a todos los workers)
+        return RedisCacheBackend(get_shared_state())
+    if name == "fakeredis":
+        return RedisCacheBackend(FakeRedis())
+    if name == "redis":
+        return RedisCacheBackend(build_shared_client("redis"))
+    raise ValueError(f"Backend de cache desconocido: {name}")
+
+
+class CachedResponse(NamedTuple):  # Respuesta JSON ya serializada
+    body: bytes  # Cuerpo JSON
+    etag: str  # ETag fuerte derivado del cuerpo
+
+
+_LIST_GENERATION_KEY = "tasks:list:gen"  # Contador que invalida todas las paginas de una vez
+_ITEM_GENERATION_PREFIX = "tasks:item:gen:"  # Generacion de cada tarea: cambia cuando se actualiza, elimina o archiva
+_ITEM_GENERATION_SLACK = 60  # Segundos extra de vida de la generacion de una tarea (lecturas lentas en curso)
+
+
+class TaskResponseCache:  # Cache de lectura de GET /tasks y GET /tasks/{task_id}
+    """Cache read-through de respuestas serializadas con invalidacion en las escrituras"""
+
+    def __init__(self, backend: CacheBackend, ttl: int) -> None:
+        self.backend = backend  # Almacen de las respuestas
+        self.ttl = ttl  # Vida de cada respuesta
+        self.hits = 0  # Respuestas servidas desde el cache
+        self.misses = 0  # Respuestas que hubo que construir
+
+    def task_key(self, task_id: int, include_archived: bool = False) -> str:  # Clave de una tarea: su generacion + ID
+        """Se calcula antes de leer la BD: una lectura que empezo antes de una escritura guarda en la generacion vieja"""
+        generation = self.backend.get_counter(f"{_ITEM_GENERATION_PREFIX}{task_id}")  # 0 si nunca cambio (o ya vencio)
+        key = f"tasks:item:{generation}:{task_id}"
+        return f"{key}:all" if include_archived else key  # Con archivo: otra respuesta
+
+    def stats_key(self) -> str:  # Clave de GET /tasks/stats: cambia con cada escritura, como los listados
+        return f"tasks:stats:{self.backend.get_counter(_LIST_GENERATION_KEY)}"
+
+    def list_key(self, request: Request) -> str:  # Clave de una pagina: generacion + query normalizada
+        generation = self.backend.get_counter(_LIST_GENERATION_KEY)
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"tasks:list:{generation}:{query}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:  # Lee y separa ETag y cuerpo
+        raw = self.backend.get(key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        etag, _, body = raw.partition(b"\n")
+        return CachedResponse(body=body, etag=etag.decode())
+
+    def entry(self, body: bytes, etag: Optional[str] = None) -> CachedResponse:  # Respuesta con su ETag, sin guardarla
+        if etag is None:  # Sin ETag propio (p. ej. la version de una tarea): hash del cuerpo
+            etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        return CachedResponse(body=body, etag=etag)
+
+    def set(self, key: str, body: bytes, etag: Optional[str] = None) -> CachedResponse:  # Guarda el cuerpo junto a su ETag
+        entry = self.entry(body, etag)
+        self.backend.set(key, entry.etag.encode() + b"\n" + body, self.ttl)
+        return entry
+
+    def invalidate(self, task_ids: Iterable[int] = ()) -> None:  # Llamar tras crear, actualizar o eliminar
+        """Descarta las tareas indicadas (solo esas) y todas las paginas del listado
+
+        Cada tarea toma como generacion el nuevo valor del contador de listados, que nunca se repite: aunque su
+        generacion venza y vuelva a 0, para entonces las respuestas guardadas con 0 ya vencieron (TTL + margen).
+        """
+        generation = self.backend.incr(_LIST_GENERATION_KEY)  # Las claves de la generacion anterior quedan huerfanas (TTL/LRU)
+        keys = {f"{_ITEM_GENERATION_PREFIX}{task_id}" for task_id in task_ids}  # Crear no cambia tareas cacheadas
+        if keys:  # Un borrado por clave no bastaria: una lectura en curso la reescribiria
+            self.backend.set_counters(keys, generation, self.ttl * 2 + _ITEM_GENERATION_SLACK)
+
+    def stats(self) -> Dict[str, object]:  # Aciertos y fallos
+        return {"backend": type(self.backend).__name__, "ttl": self.ttl, "hits": self.hits, "misses": self.misses}
+
+
+task_cache = TaskResponseCache(build_cache_backend(), TASK_CACHE_TTL)  # Cache compartido por el proceso
+
+
+def _etag_matches(request: Request, etag: str) -> bool:  # Compara con If-None-Match
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _to_response(request: Request, entry: CachedResponse) -> Response:  # 304 si el cliente ya tiene la version
+    headers = {"ETag": entry.etag}
+    if _etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)  # Sin cuerpo ni serializacion
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+Built = Union[bytes, Tuple[bytes, str]]  # Cuerpo, o (cuerpo, ETag) si el recurso tiene ETag propio
+
+
+def _store(request: Request, key: str, built: Built) -> CachedResponse:  # Guarda el resultado de build()
+    body, etag = built if isinstance(built, tuple) else (built, None)
+    if not getattr(request.state, "cache_store", True):  # Leido de una replica que puede ir atrasada (replicas.py)
+        return task_cache.entry(body, etag)
+    return task_cache.set(key, body, etag)
+
+
+def cached_json_response(request: Request, key: str, build: Callable[[], Built]) -> Response:
+    """Retorna la respuesta cacheada o la construye con build() y la guarda"""
+    entry = task_cache.get(key)
+    if entry is None:
+        entry = _store(request, key, build())
+    return _to_response(request, entry)
+
+
+def _lookup(key: Callable[[], str]) -> Tuple[str, Optional[CachedResponse]]:  # Clave (lee la generacion) y entrada
+    cache_key = key()
+    return cache_key, task_cache.get(cache_key)
+
+
+async def acached_json_response(
+    request: Request, key: Callable[[], str], build: Callable[[], Awaitable[Built]],
+) -> Response:
+    """Version asincrona de cached_json_response; key() calcula la clave (lee las generaciones del backend)
+
+    Con un backend que bloquea (shared, redis) la clave, la lectura y el guardado corren en el threadpool.
+    """
+    cache_key, entry = await run_shared(_lookup, key, blocking=task_cache.backend.blocking)
+    if entry is None:
+        entry = await run_shared(_store, request, cache_key, await build(), blocking=task_cache.backend.blocking)
+    return _to_response(request, entry)
@@ -0,0 +1,350 @@
+"""Feed de cambios de tareas: GET /tasks/changes (Server-Sent Events)
+
+Cada escritura de tareas agrega filas (seq, task_id, op) a task_change en su misma transaccion. Tras el
+commit se despierta al hub del worker, que lee los cambios nuevos con UNA consulta (junto con el estado
+actual de las tareas) y reparte el mismo frame SSE ya serializado a todos los suscriptores. Un suscriptor
+inactivo es solo una cola asyncio: no hay consultas ni temporizadores por cliente.
+
+Backends (CHANGES_BACKEND):
+    local   Solo se despierta con los commits de este proceso (un worker)
+    shared  Ademas consulta cada CHANGES_POLL_SECONDS un contador en el estado compartido que incrementan
+            los commits de cualquier worker o proceso (varios workers, python archive.py)
+
+Los clientes reanudan con ?since=<seq> o con la cabecera Last-Event-ID: reciben el ultimo cambio de cada
+tarea posterior a ese seq y luego los cambios en vivo. Con el seq fuera de la retencion (o demasiado
+atras) reciben "event: reset" y deben recargar GET /tasks.
+"""
+import asyncio  # Colas de los suscriptores y tarea del hub
+import logging  # Errores del hub
+import os  # Lectura de variables de entorno
+import threading  # Aviso pendiente al estado compartido
+import time  # Plazos de los huecos y latido
+from concurrent.futures import ThreadPoolExecutor  # Hilo que publica los commits en el estado compartido
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple  # Tipado
+
+from fastapi import HTTPException  # Error 503 con demasiados suscriptores
+from fastapi.responses import StreamingResponse  # Respuesta text/event-stream
+from sqlalchemy import Row, delete, event, func, insert, or_, select  # Sentencias del registro de cambios
+from sqlalchemy.orm import Session  # Sesion de SQLAlchemy
+from starlette.concurrency import run_in_threadpool  # Lecturas con el engine sincrono
+
+from database import DB_MODE, AsyncSessionLocal, RoutingSession, SessionLocal  # Sesiones contra el primario
+from metrics import registry  # Estado del feed en /metrics
+from model import Task, TaskChange  # Tareas y registro de cambios
+from serialization import TaskRow, dumps, select_task_rows  # Estado actual de las tareas y JSON rapido
+from shared_state import get_shared_state, run_shared  # Contador de commits comun a todos los workers
+
+# Configuración del feed de cambios (leer de variables de entorno)
+CHANGES_BACKEND = os.getenv("CHANGES_BACKEND", "local").lower()  # local | shared
+CHANGES_POLL_SECONDS = float(os.getenv("CHANGES_POLL_SECONDS", "0.5"))  # Consulta del contador compartido (backend shared)
+CHANGES_HEARTBEAT_SECONDS = float(os.getenv("CHANGES_HEARTBEAT_SECONDS", "15"))  # Comentario SSE si no hubo eventos
+CHANGES_QUEUE_SIZE = int(os.getenv("CHANGES_QUEUE_SIZE", "256"))  # Eventos pendientes por suscriptor (lleno = reset)
+CHANGES_MAX_SUBSCRIBERS = int(os.getenv("CHANGES_MAX_SUBSCRIBERS", "10000"))  # Conexiones abiertas por worker
+CHANGES_CATCHUP_LIMIT = int(os.getenv("CHANGES_CATCHUP_LIMIT", "1000"))  # Cambios maximos al reanudar con since
+CHANGES_RETENTION = int(os.getenv("CHANGES_RETENTION", "100000"))  # Filas de task_change que conserva la poda
+
+_GENERATION_KEY = "changes:generation"  # Contador de commits con cambios (backend shared)
+_BATCH_SIZE = 500  # Cambios por consulta del hub
+_GAP_SECONDS = 5.0  # Espera maxima de un seq saltado (transaccion aun sin confirmar)
+_MAX_GAPS = 1000  # Huecos vigilados a la vez
+_HEARTBEAT = (0, b": keepalive\n\n")  # Mantiene viva la conexion a traves de proxies
+_RESET = (0, b"event: reset\ndata: {}\n\n")  # El cliente debe recargar el listado y reconectar sin since
+_LIVE_OPS = ("created", "updated")  # Cambios que llevan el estado actual de la tarea
+
+Frame = Tuple[int, bytes]  # (seq, evento SSE serializado)
+
+logger = logging.getLogger(__name__)  # Errores del hub
+
+
+def record_changes(db: Session, op: str, task_ids: Iterable[int]) -> None:  # Llamar antes del commit de la escritura
+    """Agrega una fila a task_change por tarea en la transaccion actual (un solo INSERT executemany)"""
+    rows = [{"task_id": task_id, "op": op} for task_id in task_ids]
+    if rows:
+        db.execute(insert(TaskChange), rows)
+        db.info["task_changed"] = True  # after_commit avisa al hub
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _notify_after_commit(session: Session) -> None:  # Tambien para las AsyncSession (usan RoutingSession)
+    if session.info.pop("task_changed", False):
+        change_hub.notify()
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:  # Los cambios no confirmados no se anuncian
+    session.info.pop("task_changed", None)
+
+
+def _max_seq(db: Session) -> int:  # Ultimo seq registrado
+    return db.execute(select(func.max(TaskChange.seq))).scalar() or 0
+
+
+def _load_changes(db: Session, condition: Any, limit: int) -> Tuple[Sequence[Row], Dict[int, TaskRow]]:
+    """Cambios que cumplen condition en orden de seq y el estado actual de sus tareas (dos consultas)"""
+    rows = db.execute(
+        select(TaskChange.seq, TaskChange.task_id, TaskChange.op).where(condition).order_by(TaskChange.seq).limit(limit)
+    ).all()
+    ids = {row.task_id for row in rows if row.op in _LIVE_OPS}
+    tasks = {row.id: TaskRow(*row) for row in db.execute(select_task_rows().where(Task.id.in_(ids)))} if ids else {}
+    return rows, tasks
+
+
+def _changes_after(db: Session, after: int, gaps: List[int]) -> Tuple[Sequence[Row], Dict[int, TaskRow]]:  # Hub
+    condition = TaskChange.seq > after
+    if gaps:  # Seqs saltados que pueden confirmarse tarde
+        condition = or_(condition, TaskChange.seq.in_(gaps))
+    return _load_changes(db, condition, _BATCH_SIZE)
+
+
+def _changes_since(db: Session, since: int) -> Optional[Tuple[Sequence[Row], Dict[int, TaskRow]]]:  # Reanudacion
+    """Cambios posteriores a since, o None si ya no estan todos en task_change (el cliente debe recargar)"""
+    oldest = db.execute(select(func.min(TaskChange.seq))).scalar()
+    if oldest is not None and since < oldest - 1:  # Podados
+        return None
+    rows, tasks = _load_changes(db, TaskChange.seq > since, CHANGES_CATCHUP_LIMIT + 1)
+    if len(rows) > CHANGES_CATCHUP_LIMIT:  # Demasiado atras: es mas barato recargar el listado
+        return None
+    return rows, tasks
+
+
+def prune_changes(db: Session, keep: int = CHANGES_RETENTION) -> int:  # La ejecuta el job de archivado
+    """Borra de task_change todo salvo los ultimos `keep` seqs y retorna las filas borradas"""
+    newest = _max_seq(db)
+    if newest <= keep:
+        return 0
+    deleted = db.execute(delete(TaskChange).where(TaskChange.seq <= newest - keep)).rowcount
+    db.commit()
+    return deleted
+
+
+async def _read(fn: Callable[..., Any], *args: Any) -> Any:  # Ejecuta fn(db, *args) con el engine del modo en uso
+    if DB_MODE == "async":
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(fn, *args)
+
+    def run() -> Any:
+        with SessionLocal() as db:
+            return fn(db, *args)
+
+    return await run_in_threadpool(run)
+
+
+def _shared_generation() -> Optional[bytes]:  # Contador de commits (backend shared)
+    return get_shared_state().get(_GENERATION_KEY)
+
+
+def _frames(rows: Sequence[Row], tasks: Dict[int, TaskRow]) -> List[Frame]:  # Eventos SSE de un lote de cambios
+    """Un evento por tarea (su ultimo cambio del lote) con el estado actual; se serializa una vez para todos"""
+    latest: Dict[int, Row] = {}
+    for row in rows:
+        latest.pop(row.task_id, None)  # Reinsertar mantiene el orden por el ultimo seq
+        latest[row.task_id] = row
+    frames = []
+    for row in latest.values():
+        task = tasks.get(row.task_id) if row.op in _LIVE_OPS else None
+        data = dumps({"seq": row.seq, "op": row.op, "task_id": row.task_id, "task": task})
+        frames.append((row.seq, b"id: %d\nevent: task\ndata: %s\n\n" % (row.seq, data)))
+    return frames
+
+
+class ChangeHub:  # Reparto de los cambios a los suscriptores de este worker
+    """Una tarea asyncio por worker lee task_change y escribe los frames en la cola de cada suscriptor"""
+
+    def __init__(self) -> None:
+        self.subscribers: Set[asyncio.Queue] = set()  # Una cola por conexion abierta
+        self.last_seq = 0  # Ultimo seq leido por el hub
+        self.events = 0  # Eventos repartidos (una vez por suscriptor)
+        self.dropped = 0  # Suscriptores desconectados por no leer a tiempo
+        self._gaps: Dict[int, float] = {}  # seq saltado -> plazo para aparecer
+        self._generation: Optional[bytes] = None  # Ultimo valor visto del contador compartido
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None  # Lo activa notify() tras un commit con cambios
+        self._ready: Optional[asyncio.Event] = None  # last_seq ya inicializado
+        self._task: Optional[asyncio.Task] = None  # Solo corre mientras hay suscriptores
+        self._last_sent = 0.0  # Ultimo frame repartido (latido)
+        self._publisher: Optional[ThreadPoolExecutor] = None  # Incrementa el contador compartido (backend shared)
+        self._publish_lock = threading.Lock()
+        self._publish_pending = False  # Ya hay un incremento en cola: los commits siguientes lo comparten
+        registry.register_collector(self.metrics)
+
+    def notify(self) -> None:  # Desde cualquier hilo, tras un commit que registro cambios
+        """Despierta al hub de este worker y programa el aviso a los demas (no bloquea: en modo async es el event loop)"""
+        if CHANGES_BACKEND == "shared":
+            self._schedule_publish()
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:  # Event loop cerrado (apagado o proceso sin app, p. ej. python archive.py)
+                pass
+
+    def _schedule_publish(self) -> None:
+        with self._publish_lock:
+            if self._publish_pending:
+                return
+            self._publish_pending = True
+            if self._publisher is None:  # Un hilo: los incrementos no compiten entre si por el bloqueo de FileRedis
+                self._publisher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="changes-publish")
+            self._publisher.submit(self._publish)  # El interprete espera la cola al salir (python archive.py)
+
+    def _publish(self) -> None:  # En el hilo del publicador
+        with self._publish_lock:
+            self._publish_pending = False  # Un commit posterior programa otro incremento
+        try:
+            get_shared_state().incr(_GENERATION_KEY)
+        except Exception:  # Los demas workers lo veran con el siguiente commit; el hub local ya desperto
+            logger.exception("El feed de cambios no pudo avisar a los demas workers")
+
+    def subscribe(self) -> asyncio.Queue:  # Desde el event loop
+        if self._task is None or self._task.done():  # Primer suscriptor: arranca el hub
+            self._loop = asyncio.get_running_loop()
+            self._wake, self._ready = asyncio.Event(), asyncio.Event()
+            self._task = self._loop.create_task(self._run())
+        queue: asyncio.Queue = asyncio.Queue(CHANGES_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.subscribers.discard(queue)
+
+    async def ready(self) -> None:  # Espera a que el hub conozca el ultimo seq (antes de reanudar con since)
+        if self._ready is not None:
+            await self._ready.wait()
+
+    def _broadcast(self, frames: List[Frame]) -> None:
+        for queue in list(self.subscribers):
+            try:
+                for frame in frames:
+                    queue.put_nowait(frame)
+            except asyncio.QueueFull:  # Cliente lento: se le pide recargar en vez de acumular memoria
+                self.subscribers.discard(queue)
+                self.dropped += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(_RESET)
+                queue.put_nowait(None)  # Fin del stream
+        self.events += len(frames) * len(self.subscribers)
+        self._last_sent = time.monotonic()
+
+    def _advance(self, rows: Sequence[Row]) -> None:  # Actualiza last_seq y los huecos con un lote leido
+        now = time.monotonic()
+        for row in rows:
+            if self._gaps.pop(row.seq, None) is not None:
+                continue
+            if row.seq > self.last_seq:
+                for missing in range(max(self.last_seq + 1, row.seq - _MAX_GAPS), row.seq):  # Commits aun pendientes
+                    self._gaps[missing] = now + _GAP_SECONDS
+                self.last_seq = row.seq
+        for seq, deadline in list(self._gaps.items()):  # Rollbacks y saltos del autoincremento: no llegaran
+            if deadline <= now or len(self._gaps) > _MAX_GAPS:
+                del self._gaps[seq]
+
+    async def _shared_changed(self) -> bool:  # Otro worker confirmo cambios (backend shared)
+        generation = await run_shared(_shared_generation)  # FileRedis/redis: fuera del event loop
+        changed, self._generation = generation != self._generation, generation
+        return changed
+
+    async def _pump(self) -> None:  # Lee y reparte todo lo nuevo
+        while True:
+            rows, tasks = await _read(_changes_after, self.last_seq, list(self._gaps))
+            self._advance(rows)
+            if rows:
+                self._broadcast(_frames(rows, tasks))
+            if len(rows) < _BATCH_SIZE:
+                return
+
+    async def _run(self) -> None:
+        while True:  # Sin BD se reintenta: los suscriptores esperan en ready()
+            try:
+                self.last_seq = await _read(_max_seq)
+                break
+            except Exception:
+                logger.exception("El feed de cambios no pudo leer task_change")
+                await asyncio.sleep(CHANGES_HEARTBEAT_SECONDS)
+        self._gaps.clear()
+        if CHANGES_BACKEND == "shared":
+            await self._shared_changed()
+        self._last_sent = time.monotonic()
+        self._ready.set()
+        while self.subscribers:  # Sin suscriptores termina (la siguiente suscripcion lo reinicia)
+            timeout = self._last_sent + CHANGES_HEARTBEAT_SECONDS - time.monotonic()
+            if CHANGES_BACKEND == "shared" or self._gaps:
+                timeout = min(timeout, CHANGES_POLL_SECONDS)
+            try:
+                await asyncio.wait_for(self._wake.wait(), max(timeout, 0))
+                woke = True
+            except asyncio.TimeoutError:
+                woke = False
+            self._wake.clear()
+            try:
+                if woke or self._gaps or (CHANGES_BACKEND == "shared" and await self._shared_changed()):
+                    await self._pump()
+            except Exception:  # Un fallo de BD no cierra los streams: se reintenta en la siguiente vuelta
+                logger.exception("El feed de cambios no pudo leer task_change")
+            if time.monotonic() - self._last_sent >= CHANGES_HEARTBEAT_SECONDS:
+                self._broadcast([_HEARTBEAT])
+
+    def metrics(self) -> List[str]:  # Lineas Prometheus para /metrics
+        return [
+            "# HELP api_change_feed_subscribers Conexiones abiertas a GET /tasks/changes en este worker",
+            "# TYPE api_change_feed_subscribers gauge",
+            f"api_change_feed_subscribers {len(self.subscribers)}",
+            "# HELP api_change_feed_events_total Eventos entregados a las colas de los suscriptores",
+            "# TYPE api_change_feed_events_total counter",
+            f"api_change_feed_events_total {self.events}",
+            "# HELP api_change_feed_dropped_total Suscriptores desconectados con reset por no leer a tiempo",
+            "# TYPE api_change_feed_dropped_total counter",
+            f"api_change_feed_dropped_total {self.dropped}",
+        ]
+
+
+change_hub = ChangeHub()  # Hub del proceso
+
+
+async def _stream(since: Optional[int]) -> AsyncIterator[bytes]:  # Cuerpo de la respuesta SSE
+    queue = change_hub.subscribe()  # Antes de leer el historial: no se pierde nada entre ambos
+    try:
+        yield b"retry: 3000\n\n"  # Reconexion del EventSource (reanuda con Last-Event-ID)
+        replayed: Set[int] = set()
+        floor = high = 0  # since y ultimo seq entregado por la reanudacion
+        stale = 0  # Frames que el hub encolo antes de terminar la reanudacion
+        if since is not None:
+            await change_hub.ready()
+            catchup = await _read(_changes_since, since)
+            if catchup is None:
+                yield _RESET[1]
+                return
+            rows, tasks = catchup
+            for _, frame in _frames(rows, tasks):
+                yield frame
+            replayed = {row.seq for row in rows}  # El hub puede repartirlos tambien
+            floor, high = since, max(since, max(replayed, default=since))
+            stale = queue.qsize()
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            seq, frame = item
+            queued_before, stale = stale > 0, max(stale - 1, 0)  # Encolado antes de terminar la reanudacion
+            if not seq:  # Latido o reset
+                yield frame
+            elif queued_before:  # Ya entregado por la reanudacion (o anterior a since): solo lo que sigue a high
+                if seq > high:
+                    yield frame
+            elif seq > floor and seq not in replayed:  # Un seq saltado que se confirma tarde (< high) si se entrega
+                yield frame
+    finally:  # Cliente desconectado o stream terminado
+        change_hub.unsubscribe(queue)
+
+
+def change_stream(since: Optional[int], last_event_id: Optional[str]) -> StreamingResponse:  # Para ambos routers
+    """Respuesta SSE de GET /tasks/changes; since tiene prioridad sobre Last-Event-ID"""
+    if len(change_hub.subscribers) >= CHANGES_MAX_SUBSCRIBERS:
+        raise HTTPException(status_code=503, detail="Demasiadas conexiones al feed de cambios", headers={"Retry-After": "5"})
+    if since is None and last_event_id and last_event_id.isdigit():  # Reconexion automatica del EventSource
+        since = int(last_event_id)
+    return StreamingResponse(
+        _stream(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # Sin buffer en proxies (nginx)
+    )
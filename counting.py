@@ -0,0 +1,133 @@
+import os  # Lectura de variables de entorno
+import threading  # Bloqueo para el cache compartido entre hilos del threadpool
+import time  # Reloj monotono para el TTL
+from typing import Callable, Dict, Hashable, Optional, Tuple  # Tipado
+
+from sqlalchemy import bindparam, func, select, text  # COUNT(*) y SQL crudo para information_schema
+from sqlalchemy.ext.asyncio import AsyncSession  # Sesion asincrona (aprepare_count)
+from sqlalchemy.orm import Session  # Sesion de SQLAlchemy
+
+from model import Task, TaskArchive  # Tareas activas y archivadas
+from shared_state import get_shared_state, run_shared  # Generacion de los conteos comun a todos los workers
+from task_queries import TaskFilters  # Filtros del listado
+
+# Configuracion del conteo (leer de variables de entorno)
+TASK_COUNT_STRATEGY = os.getenv("TASK_COUNT_STRATEGY", "cached")  # exact | cached | estimated
+TASK_COUNT_CACHE_TTL = float(os.getenv("TASK_COUNT_CACHE_TTL", "30"))  # Segundos de vida del conteo cacheado
+TASK_COUNT_CACHE_MAX_KEYS = 1024  # Combinaciones de filtros distintas que se recuerdan
+
+# Una estrategia recibe la sesion y los filtros y retorna (total, nombre de la estrategia que lo produjo)
+CountStrategy = Callable[[Session, TaskFilters], Tuple[int, str]]
+
+_strategies: Dict[str, CountStrategy] = {}  # Registro de estrategias disponibles
+
+
+def register_count_strategy(name: str) -> Callable[[CountStrategy], CountStrategy]:  # Decorador de registro
+    """Registra una estrategia de conteo bajo el nombre indicado"""
+    def decorator(strategy_func: CountStrategy) -> CountStrategy:
+        _strategies[name] = strategy_func  # Guarda la estrategia en el registro
+        return strategy_func
+    return decorator
+
+
+class _TTLCount:  # Conteos cacheados en memoria con expiracion, uno por combinacion de filtros
+    def __init__(self) -> None:
+        self._lock = threading.Lock()  # Protege los conteos y sus expiraciones
+        self._values: Dict[Hashable, Tuple[int, float]] = {}  # filtros -> (conteo, instante en que expira)
+
+    def get(self, key: Hashable) -> Optional[int]:  # Retorna el conteo si sigue vigente
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is not None and time.monotonic() < entry[1]:
+                return entry[0]
+            return None
+
+    def set(self, key: Hashable, value: int, ttl: float) -> None:  # Guarda un conteo nuevo
+        with self._lock:
+            if len(self._values) >= TASK_COUNT_CACHE_MAX_KEYS and key not in self._values:  # Acota la memoria
+                self._values.clear()
+            self._values[key] = (value, time.monotonic() + ttl)
+
+    def clear(self) -> None:  # Invalida todos los conteos cacheados
+        with self._lock:
+            self._values.clear()
+
+
+_task_count_cache = _TTLCount()  # Cache de totales de tareas del proceso
+_COUNT_GENERATION_KEY = "tasks:count:gen"  # Se incrementa en cada escritura: invalida los totales de todos los workers
+
+
+def count_generation() -> int:  # Generacion compartida de los totales
+    return int(get_shared_state().get(_COUNT_GENERATION_KEY) or 0)
+
+
+async def aprepare_count(db: AsyncSession) -> None:  # Modo async: antes de AsyncSession.run_sync
+    """Lee la generacion de los totales fuera del event loop (run_sync corre en el hilo del loop)"""
+    if TASK_COUNT_STRATEGY == "cached":
+        db.sync_session.info["count_generation"] = await run_shared(count_generation)
+
+
+def _count_key(db: Session, filters: TaskFilters) -> Hashable:  # Clave del conteo: generacion compartida + filtros
+    generation = db.info.get("count_generation")  # Ya leida por aprepare_count en modo async
+    if generation is None:
+        generation = count_generation()
+    return generation, filters.key()
+
+
+def invalidate_task_count() -> None:  # Llamar tras crear, actualizar o eliminar tareas
+    """Descarta el total cacheado para que el siguiente listado lo recalcule (en este y en los demas workers)"""
+    _task_count_cache.clear()
+    get_shared_state().incr(_COUNT_GENERATION_KEY)
+
+
+@register_count_strategy("exact")
+def exact_count(db: Session, filters: TaskFilters) -> Tuple[int, str]:  # COUNT(*) en cada peticion
+    """Cuenta las tareas que cumplen los filtros con COUNT(*) (mas las archivadas si include_archived)"""
+    dialect_name = db.get_bind().dialect.name
+    total = 0
+    for source in (Task, TaskArchive) if filters.include_archived else (Task,):
+        stmt = select(func.count()).select_from(source).where(*filters.clauses(dialect_name, source))
+        total += db.execute(stmt).scalar_one()
+    return total, "exact"
+
+
+@register_count_strategy("cached")
+def cached_count(db: Session, filters: TaskFilters) -> Tuple[int, str]:  # COUNT(*) exacto reutilizado durante el TTL
+    """Retorna el total cacheado para esos filtros o lo recalcula si expiro o fue invalidado"""
+    key = _count_key(db, filters)
+    cached = _task_count_cache.get(key)  # Intenta usar el valor vigente
+    if cached is not None:
+        return cached, "cached"
+    total, _ = exact_count(db, filters)  # Recalcula con COUNT(*)
+    if db.info.get("cache_store", True):  # No se guarda un total leido de una replica que puede ir atrasada
+        _task_count_cache.set(key, total, TASK_COUNT_CACHE_TTL)  # Lo guarda para las siguientes peticiones
+    return total, "exact"
+
+
+@register_count_strategy("estimated")
+def estimated_count(db: Session, filters: TaskFilters) -> Tuple[int, str]:  # Estimacion de InnoDB sin recorrer el indice
+    """Lee TABLE_ROWS de information_schema (solo MySQL y sin filtros); en otro caso cuenta exacto"""
+    if db.get_bind().dialect.name != "mysql" or not filters.is_empty:  # La estimacion es de la tabla completa
+        return exact_count(db, filters)
+    estimate = db.execute(
+        text(
+            "SELECT SUM(TABLE_ROWS) FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN :tables"
+        ).bindparams(bindparam("tables", expanding=True)),
+        {"tables": [Task.__tablename__] + ([TaskArchive.__tablename__] if filters.include_archived else [])},
+    ).scalar()  # Numero aproximado de filas segun las estadisticas de InnoDB
+    if estimate is None:  # Sin estadisticas disponibles
+        return exact_count(db, filters)
+    return int(estimate), "estimated"
+
+
+def count_tasks(  # Punto de entrada del conteo
+    db: Session, filters: Optional[TaskFilters] = None, strategy: Optional[str] = None
+) -> Tuple[int, str]:
+    """Cuenta las tareas con la estrategia configurada y retorna (total, estrategia usada)"""
+    name = strategy or TASK_COUNT_STRATEGY  # Usa la estrategia configurada por defecto
+    try:
+        strategy_func = _strategies[name]  # Busca la estrategia registrada
+    except KeyError:
+        raise ValueError(f"Estrategia de conteo desconocida: {name}")
+    return strategy_func(db, filters or TaskFilters())
@@ -1,19 +1,307 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from typing import Generator
+import os
+import threading
+import time
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Optional
 
-# Cadena de conexión a MySQL usando PyMySQL
-SQLALCHEMY_DATABASE_URL = "mysql+pymysql://root:@localhost/api_database"
+from metrics import instrument_engine
+
+# Cadena de conexión a MySQL usando PyMySQL (se puede sobrescribir con DATABASE_URL)
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "mysql+pymysql://root:@localhost/api_database")
+
+# Modo de acceso a la base: "sync" (PyMySQL + threadpool) o "async" (aiomysql/aiosqlite + AsyncSession)
+DB_MODE = os.getenv("DB_MODE", "sync").lower()
+
+# Ajustes del pool de conexiones (leer de variables de entorno)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))  # Conexiones persistentes del pool
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))  # Conexiones extra permitidas en picos
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # Segundos maximos esperando una conexion libre
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Recicla conexiones antes del wait_timeout de MySQL
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")  # Ping antes de reutilizar
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))  # Limite por sentencia (0 = sin limite)
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))  # Segundos para abrir una conexion nueva
+DB_POOL_WARMUP = os.getenv("DB_POOL_WARMUP", "false").lower() in ("1", "true", "yes")  # Abre el pool al arrancar cada worker
+
+_WAIT_HALF_LIFE = 1.0  # Segundos en que la espera reciente del pool pierde la mitad de su peso
+
+# Drivers asincronos equivalentes a cada driver sincrono
+_ASYNC_DRIVERS = {
+	"mysql": "mysql+aiomysql",
+	"mysql+pymysql": "mysql+aiomysql",
+	"sqlite": "sqlite+aiosqlite",
+	"sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:  # Traduce una URL sincrona a su driver asincrono
+	"""Cambia el driver de la URL por su version asincrona (aiomysql o aiosqlite)"""
+	scheme, sep, rest = url.partition("://")
+	return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+# URL del engine asincrono (por defecto derivada de DATABASE_URL)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(SQLALCHEMY_DATABASE_URL))
+
+
+class TimedQueuePool(QueuePool):  # QueuePool que mide cuanto espera cada checkout
+	"""QueuePool que acumula el tiempo de espera para obtener una conexion"""
+
+	def __init__(self, *args: Any, **kwargs: Any) -> None:
+		super().__init__(*args, **kwargs)
+		self._stats_lock = threading.Lock()  # Protege los contadores entre hilos
+		self.checkouts = 0  # Conexiones entregadas
+		self.wait_time_total = 0.0  # Segundos acumulados esperando conexion
+		self.wait_time_max = 0.0  # Mayor espera observada
+		self.timeouts = 0  # Checkouts que agotaron pool_timeout
+		self._reentry = threading.local()  # Evita contar dos veces los reintentos internos
+		self._recent_wait = 0.0  # Media movil de la espera (decae con el tiempo aunque no haya checkouts)
+		self._recent_at = time.monotonic()  # Instante de la ultima actualizacion de la media
+
+	def _do_get(self):  # Envuelve la obtencion de una conexion del pool
+		if getattr(self._reentry, "active", False):  # QueuePool._do_get se llama a si mismo al reintentar
+			return super()._do_get()
+		self._reentry.active = True
+		self._reentry.connecting = 0.0  # Tiempo abriendo conexiones nuevas dentro de este checkout
+		start = time.perf_counter()
+		try:
+			return super()._do_get()
+		except exc.TimeoutError:  # Se agoto pool_timeout esperando una conexion libre
+			with self._stats_lock:
+				self.timeouts += 1
+			raise
+		finally:
+			self._reentry.active = False
+			waited = time.perf_counter() - start - self._reentry.connecting  # Solo la espera en la cola del pool
+			with self._stats_lock:
+				self.checkouts += 1
+				self.wait_time_total += waited
+				self.wait_time_max = max(self.wait_time_max, waited)
+				self._recent_wait = self._decayed() * 0.8 + waited * 0.2
+				self._recent_at = time.monotonic()
+
+	def _create_connection(self):  # Conexion nueva (TCP, autenticacion): no es espera por el pool
+		start = time.perf_counter()
+		try:
+			return super()._create_connection()
+		finally:
+			self._reentry.connecting = getattr(self._reentry, "connecting", 0.0) + time.perf_counter() - start
+
+	def _decayed(self) -> float:  # Media reciente descontada por el tiempo sin checkouts (con _stats_lock)
+		return self._recent_wait * 0.5 ** ((time.monotonic() - self._recent_at) / _WAIT_HALF_LIFE)
+
+	def recent_wait(self) -> float:  # Espera reciente en segundos (control de admision)
+		with self._stats_lock:
+			return self._decayed()
+
+
+def _is_memory_sqlite(url: str) -> bool:  # SQLite en memoria no admite un pool con varias conexiones
+	return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":"))
+
+
+def _engine_options(url: str, is_async: bool) -> Dict[str, Any]:  # Argumentos de create_engine segun el motor
+	options: Dict[str, Any] = {"pool_pre_ping": DB_POOL_PRE_PING}
+	if not _is_memory_sqlite(url):  # Pool configurable salvo en SQLite en memoria
+		options.update(
+			pool_size=DB_POOL_SIZE,
+			max_overflow=DB_MAX_OVERFLOW,
+			pool_timeout=DB_POOL_TIMEOUT,
+			pool_recycle=DB_POOL_RECYCLE,
+		)
+		if not is_async:  # El engine asincrono usa su propio pool adaptado
+			options["poolclass"] = TimedQueuePool
+	if url.startswith("sqlite"):
+		options["connect_args"] = {"check_same_thread": False} if not is_async else {}  # Compartir entre hilos
+	elif url.startswith("mysql"):
+		options["connect_args"] = {"connect_timeout": DB_CONNECT_TIMEOUT}  # Falla rapido si MySQL no responde
+	return options
+
+
+def _install_statement_timeout(engine: Engine) -> None:  # Limita la duracion de cada sentencia en MySQL/MariaDB
+	if DB_STATEMENT_TIMEOUT_MS <= 0 or engine.dialect.name != "mysql":
+		return
+
+	@event.listens_for(engine, "connect")
+	def _set_timeout(dbapi_connection, connection_record):  # Se ejecuta al abrir cada conexion fisica
+		cursor = dbapi_connection.cursor()
+		try:
+			cursor.execute("SET SESSION max_execution_time = %d" % DB_STATEMENT_TIMEOUT_MS)  # MySQL (ms)
+		except Exception:
+			cursor.execute("SET SESSION max_statement_time = %f" % (DB_STATEMENT_TIMEOUT_MS / 1000))  # MariaDB (s)
+		finally:
+			cursor.close()
+
+
+def build_engine(url: str = SQLALCHEMY_DATABASE_URL) -> Engine:  # Fabrica unica de engines sincronos
+	"""Crea un engine con el pool y los timeouts configurados por variables de entorno"""
+	engine = create_engine(url, **_engine_options(url, is_async=False))
+	_install_statement_timeout(engine)
+	instrument_engine(engine)  # Cuenta y cronometra las sentencias de cada peticion
+	return engine
+
+
+def build_async_engine(url: str = ASYNC_DATABASE_URL):  # Fabrica de engines asincronos
+	"""Crea un engine asincrono con los mismos ajustes de pool y timeouts"""
+	async_engine = create_async_engine(url, **_engine_options(url, is_async=True))
+	_install_statement_timeout(async_engine.sync_engine)
+	instrument_engine(async_engine.sync_engine)
+	return async_engine
+
+
+_engine_lock = threading.Lock()  # Evita crear dos engines si varias peticiones llegan a la vez
+_engine: Optional[Engine] = None  # Engine sincrono (se crea en el primer uso, no al importar)
+_async_engine: Optional[AsyncEngine] = None  # Engine asincrono (solo se crea si se usa)
+
+
+def get_engine() -> Engine:  # Engine sincrono compartido por el proceso
+	"""Retorna el engine sincrono, creandolo en la primera llamada"""
+	global _engine
+	if _engine is None:
+		with _engine_lock:
+			if _engine is None:
+				_engine = build_engine()
+	return _engine
+
+
+def get_async_engine() -> AsyncEngine:  # Engine asincrono compartido por el proceso
+	"""Retorna el engine asincrono, creandolo en la primera llamada"""
+	global _async_engine
+	if _async_engine is None:
+		with _engine_lock:
+			if _async_engine is None:
+				_async_engine = build_async_engine()
+	return _async_engine
+
+
+def __getattr__(name: str) -> Any:  # database.engine y database.async_engine se crean al accederlos
+	if name == "engine":
+		return get_engine()
+	if name == "async_engine":
+		return get_async_engine()
+	raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _LazyBind:  # Liga cada sesion al engine en el momento de abrirla, no al importar
+	def __init__(self, get_bind: Callable[[], Any], **kw: Any) -> None:
+		super().__init__(**kw)
+		self._get_bind = get_bind
+
+	def __call__(self, **local_kw: Any) -> Any:
+		local_kw.setdefault("bind", self._get_bind())
+		return super().__call__(**local_kw)
+
+
+class RoutingSession(Session):  # Lecturas a la replica asignada a la sesion, escrituras al primario
+	"""Sesion que envia los SELECT a info["replica"] (si la hay) y todo lo demas al engine principal"""
+
+	def get_bind(self, mapper=None, clause=None, **kw: Any) -> Any:
+		if self._flushing or (clause is not None and clause.is_dml):  # Flush del ORM, INSERT/UPDATE/DELETE
+			self.info["wrote"] = True
+		elif not self.info.get("wrote") and self.info.get("replica") is not None:  # Tras escribir, todo al primario
+			return self.info["replica"]
+		return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+	def _connection_for_bind(self, engine: Any, execution_options: Any = None, **kw: Any) -> Any:
+		if engine is not self.info.get("replica"):
+			return super()._connection_for_bind(engine, execution_options, **kw)
+		try:
+			return super()._connection_for_bind(engine, execution_options, **kw)
+		except exc.DBAPIError:  # Replica caida (connect o pre-ping): se avisa y la sesion sigue en el primario
+			self.info.pop("replica")
+			on_error = self.info.get("on_replica_error")
+			if on_error is not None:
+				on_error(engine)
+			return super()._connection_for_bind(super().get_bind(), execution_options, **kw)
+
+
+class _LazySessionmaker(_LazyBind, sessionmaker):
+	pass
+
+
+class _LazyAsyncSessionmaker(_LazyBind, async_sessionmaker):
+	pass
 
-# Crea el engine que gestionará las conexiones a la base de datos
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
 
 # Genera una sesión por petición con commit/control manual
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _LazySessionmaker(get_engine, class_=RoutingSession, autocommit=False, autoflush=False)
+
+# Sesiones asincronas (el engine y su driver solo se cargan si se usan, es decir en modo async)
+AsyncSessionLocal = _LazyAsyncSessionmaker(
+	get_async_engine, sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False
+)
+
+class Base(DeclarativeBase):  # Clase base unica de los modelos ORM (model.py)
+	"""Registro declarativo compartido: un solo MetaData para la API, create_all y Alembic"""
 
-# Clase base para declarar los modelos ORM
-Base = declarative_base()
+
+def _warmup_size(pool: Any) -> int:  # Conexiones persistentes que admite el pool
+	return pool.size() if hasattr(pool, "size") else 1
+
+
+def warm_pool(engine: Engine) -> int:  # Abre las conexiones persistentes antes de la primera peticion
+	"""Abre pool_size conexiones y las devuelve al pool; retorna cuantas abrio"""
+	connections = [engine.connect() for _ in range(_warmup_size(engine.pool))]
+	for connection in connections:
+		connection.close()  # Vuelve al pool sin cerrarse
+	return len(connections)
+
+
+async def awarm_pool(async_engine: AsyncEngine) -> int:  # Version asincrona de warm_pool
+	"""Abre pool_size conexiones del engine asincrono y las devuelve al pool"""
+	connections = [await async_engine.connect() for _ in range(_warmup_size(async_engine.sync_engine.pool))]
+	for connection in connections:
+		await connection.close()
+	return len(connections)
+
+
+async def dispose_engines() -> None:  # Cierra las conexiones del pool al apagar el proceso
+	"""Libera los engines que se hayan creado"""
+	if _engine is not None:
+		_engine.dispose()
+	if _async_engine is not None:
+		await _async_engine.dispose()
+
+
+def pool_stats() -> Dict[str, Any]:  # Estadisticas en vivo del pool para dimensionarlo bajo carga
+	"""Retorna el estado actual de los pools de conexiones"""
+	pools = {}  # Solo los engines ya creados (consultar las estadisticas no abre conexiones)
+	if _engine is not None:
+		pools["sync"] = _engine.pool
+	if _async_engine is not None:
+		pools["async"] = _async_engine.sync_engine.pool
+	return {name: describe_pool(pool) for name, pool in pools.items()}
+
+
+def describe_pool(pool: Any) -> Dict[str, Any]:  # Estadisticas de un pool (tambien las usan las replicas)
+	entry: Dict[str, Any] = {"pool_class": type(pool).__name__, "status": pool.status()}
+	if isinstance(pool, QueuePool):
+		entry.update(
+			size=pool.size(),
+			checked_out=pool.checkedout(),
+			checked_in=pool.checkedin(),
+			overflow=pool.overflow(),
+			max_overflow=DB_MAX_OVERFLOW,
+		)
+	if isinstance(pool, TimedQueuePool):
+		with pool._stats_lock:
+			entry.update(
+				checkouts=pool.checkouts,
+				timeouts=pool.timeouts,
+				wait_time_total_ms=round(pool.wait_time_total * 1000, 3),
+				wait_time_avg_ms=round(pool.wait_time_total * 1000 / pool.checkouts, 3) if pool.checkouts else 0.0,
+				wait_time_max_ms=round(pool.wait_time_max * 1000, 3),
+				wait_time_recent_ms=round(pool._decayed() * 1000, 3),
+			)
+	return entry
+
+
+def pool_recent_wait() -> float:  # Espera reciente del pool sincrono (0 si no se mide, p. ej. en modo async)
+	"""Segundos que tardan ultimamente los checkouts del pool del engine sincrono"""
+	pool = _engine.pool if _engine is not None and DB_MODE == "sync" else None  # En async el engine sincrono no atiende peticiones
+	return pool.recent_wait() if isinstance(pool, TimedQueuePool) else 0.0
 
 
 def get_db() -> Generator:  # Dependencia de FastAPI para inyectar una sesion por solicitud
@@ -21,4 +309,9 @@ def get_db() -> Generator:  # Dependencia de FastAPI para inyectar una sesion po
 	try:
 		yield db
 	finally:
-		db.close()
\ No newline at end of file
+		db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:  # Dependencia asincrona: una AsyncSession por solicitud
+	async with AsyncSessionLocal() as db:
+		yield db
@@ -0,0 +1,63 @@
+import csv  # Escritura CSV
+import io  # Buffer en memoria para cada bloque CSV
+import os  # Lectura de variables de entorno
+from typing import AsyncIterator, Iterator, Optional  # Tipado
+
+from sqlalchemy import Select, select  # Consultas Core (sin hidratar objetos ORM)
+
+from database import AsyncSessionLocal, SessionLocal  # Sesiones propias del stream
+from model import Task  # Modelo de tareas
+from serialization import dumps  # JSON rapido (orjson o pydantic_core)
+from task_queries import TaskFilters  # Filtros compartidos con el listado
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))  # Filas leidas del cursor del servidor por bloque
+
+EXPORT_COLUMNS = ("id", "title", "description", "status", "created_at")  # Columnas exportadas, en orden
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}  # Content-Type de cada formato
+
+
+def export_statement(filters: TaskFilters, dialect_name: str) -> Select:  # SELECT de solo las columnas exportadas
+    """Construye la consulta de exportacion con los mismos filtros que el listado"""
+    stmt = select(*(getattr(Task, column) for column in EXPORT_COLUMNS)).where(*filters.clauses(dialect_name))
+    return stmt.order_by(Task.id).execution_options(  # Cursor del lado del servidor
+        stream_results=True, yield_per=EXPORT_BATCH_SIZE
+    )
+
+
+def _plain(row) -> tuple:  # Convierte los valores de la fila a texto para el CSV
+    id_, title, description, status, created_at = row
+    return id_, title, description, status.value, created_at.isoformat() if created_at else None
+
+
+def _encode(rows, fmt: str) -> bytes:  # Serializa un bloque de filas
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(_plain(row) for row in rows)
+        return buffer.getvalue().encode()
+    return b"".join(dumps(dict(zip(EXPORT_COLUMNS, row))) + b"\n" for row in rows)  # Enums y fechas los resuelve dumps
+
+
+def _header(fmt: str) -> bytes:  # Cabecera del CSV (NDJSON no lleva)
+    return (",".join(EXPORT_COLUMNS) + "\r\n").encode() if fmt == "csv" else b""
+
+
+def iter_export(fmt: str, filters: Optional[TaskFilters] = None) -> Iterator[bytes]:  # Stream sincrono
+    """Genera el contenido de la exportacion por bloques, con memoria constante"""
+    db = SessionLocal()  # La sesion vive mientras dure el stream (no la del Depends)
+    try:
+        yield _header(fmt)
+        result = db.execute(export_statement(filters or TaskFilters(), db.get_bind().dialect.name))
+        for rows in result.partitions():  # Un bloque de EXPORT_BATCH_SIZE filas cada vez
+            yield _encode(rows, fmt)
+    finally:
+        db.close()
+
+
+async def aiter_export(fmt: str, filters: Optional[TaskFilters] = None) -> AsyncIterator[bytes]:  # Stream asincrono
+    """Version asincrona de iter_export para el modo DB_MODE=async"""
+    async with AsyncSessionLocal() as db:
+        yield _header(fmt)
+        result = await db.stream(export_statement(filters or TaskFilters(), db.get_bind().dialect.name))
+        async for rows in result.partitions():
+            yield _encode(rows, fmt)
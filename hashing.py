@@ -0,0 +1,121 @@
+import asyncio  # Espera asincrona de los futures del pool
+import multiprocessing  # Contexto spawn para los procesos de hashing
+import os  # Lectura de variables de entorno
+import threading  # Semaforo y bloqueo de metricas
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor  # Ejecutores
+from typing import Any, Callable, Dict, Optional, Tuple  # Tipado
+
+from fastapi import HTTPException  # Error 503 cuando el pool esta saturado
+from passlib.context import CryptContext  # Para hashear contraseñas con bcrypt
+
+from metrics import timed  # Tiempo de hashing de la peticion
+
+# Configuración del hashing (leer de variables de entorno)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # Factor de coste de bcrypt
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))  # Procesos (0 = hilos)
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", str(max(1, HASH_WORKERS) * 8)))  # Maximo de hashes en cola
+
+# Contexto de bcrypt para hashear contraseñas (needs_update detecta hashes con otro coste)
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+def _hash(password: str) -> str:  # Se ejecuta dentro del proceso de hashing
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:  # Idem
+    return pwd_context.verify_and_update(password, hashed_password)  # (coincide, hash nuevo si cambio el coste)
+
+
+class HashingExecutor:  # Pool acotado que saca bcrypt del proceso de la API
+    """Ejecuta bcrypt en un pool de procesos con un limite de trabajos pendientes"""
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers  # Procesos del pool (0 = hilos del propio proceso)
+        self.max_pending = max_pending  # Trabajos admitidos entre cola y ejecucion
+        self._slots = threading.BoundedSemaphore(max_pending)  # Plazas libres de la cola
+        self._lock = threading.Lock()  # Protege el pool y las metricas
+        self._executor: Optional[Executor] = None  # Se crea al primer uso
+        self.pending = 0  # Trabajos en cola o en ejecucion
+        self.completed = 0  # Trabajos terminados
+        self.rejected = 0  # Trabajos rechazados con 503
+
+    def _get_executor(self) -> Executor:  # Crea el pool de forma perezosa
+        with self._lock:
+            if self._executor is None:
+                if self.workers > 0:  # spawn evita heredar hilos y conexiones del proceso padre
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hashing")
+            return self._executor
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> Future:  # Encola un trabajo o rechaza con 503
+        if not self._slots.acquire(blocking=False):  # Cola llena: mejor rechazar que bloquear la API
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Servicio de autenticacion saturado, intenta de nuevo",
+                headers={"Retry-After": "1"},
+            )
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self._get_executor().submit(func, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)  # Libera la plaza al terminar
+        return future
+
+    def _release(self, _future: Optional[Future]) -> None:  # Libera una plaza de la cola
+        with self._lock:
+            self.pending -= 1
+            if _future is not None:
+                self.completed += 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, int]:  # Metricas de la cola de hashing
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "queue_depth": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:  # Detiene el pool al apagar la app
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+hashing_executor = HashingExecutor(HASH_WORKERS, HASH_MAX_PENDING)  # Pool compartido por el proceso
+
+
+def hash_password(password: str) -> str:  # Hashea en el pool y espera el resultado (endpoints sync)
+    """Convierte una contraseña en texto plano a un hash seguro"""
+    with timed("hash"):  # Tiempo de bcrypt en Server-Timing
+        return hashing_executor.submit(_hash, password).result()
+
+
+def verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:  # Verifica en el pool
+    """Compara la contraseña con el hash y retorna un hash nuevo si el coste configurado cambio"""
+    with timed("hash"):
+        return hashing_executor.submit(_verify_and_update, password, hashed_password).result()
+
+
+async def hash_password_async(password: str) -> str:  # Version asincrona de hash_password
+    """Hashea en el pool sin bloquear el event loop"""
+    with timed("hash"):
+        return await asyncio.wrap_future(hashing_executor.submit(_hash, password))
+
+
+async def verify_and_update_async(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:  # Idem
+    """Verifica en el pool sin bloquear el event loop"""
+    with timed("hash"):
+        return await asyncio.wrap_future(hashing_executor.submit(_verify_and_update, password, hashed_password))
@@ -0,0 +1,71 @@
+import os  # Lectura de variables de entorno y rutas
+import threading  # Bloqueo del resultado cacheado
+import time  # Reloj para el TTL
+from typing import Any, Dict, FrozenSet, Optional, Tuple  # Tipado
+
+from sqlalchemy import text  # Ping de la base de datos
+from sqlalchemy.engine import Connection, Engine  # Tipos de SQLAlchemy
+
+# Configuración del esquema (leer de variables de entorno)
+DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "false").lower() in ("1", "true", "yes")  # create_all al arrancar (solo desarrollo)
+SCHEMA_CHECK_TTL = float(os.getenv("SCHEMA_CHECK_TTL", "60"))  # Segundos que se reutiliza una comprobacion correcta
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")  # Config de Alembic del proyecto
+
+_lock = threading.Lock()  # Protege los valores cacheados
+_expected_heads: Optional[FrozenSet[str]] = None  # Revisiones head de migrations/versions (no cambian en el proceso)
+_last_ok: Optional[Tuple[Dict[str, Any], float]] = None  # (resultado correcto, instante en que expira)
+
+
+def create_schema(engine: Engine) -> None:  # Crea las tablas de los modelos sin Alembic
+    """Crea las tablas que falten a partir de los modelos (SQLite de desarrollo y benchmarks)"""
+    from model import Base  # Importa los modelos solo si hace falta
+
+    Base.metadata.create_all(bind=engine)
+    from sqlalchemy.orm import Session  # Llena task_status_counts (la migracion lo hace con Alembic)
+    from task_stats import reconcile_status_counts
+
+    with Session(engine) as db:
+        reconcile_status_counts(db)
+
+
+def expected_heads() -> FrozenSet[str]:  # Revisiones que deberia tener la base de datos
+    """Lee las revisiones head de los scripts de Alembic (una vez por proceso)"""
+    global _expected_heads
+    if _expected_heads is None:
+        from alembic.config import Config  # Import diferido: solo lo necesita la comprobacion
+        from alembic.script import ScriptDirectory
+
+        heads = frozenset(ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_heads())
+        with _lock:
+            _expected_heads = heads
+    return _expected_heads
+
+
+def current_heads(conn: Connection) -> FrozenSet[str]:  # Equivalente a "alembic current"
+    """Lee las revisiones aplicadas de la tabla alembic_version"""
+    from alembic.runtime.migration import MigrationContext
+
+    return frozenset(MigrationContext.configure(conn).get_current_heads())
+
+
+def check_schema(conn: Connection) -> Dict[str, Any]:  # Compara alembic current con los heads de los scripts
+    """Indica si la base de datos esta en la ultima migracion; reutiliza un resultado correcto durante el TTL"""
+    global _last_ok
+    if DB_CREATE_ALL:  # El esquema lo crea create_all, no hay alembic_version que comparar
+        return {"ok": True, "mode": "create_all"}
+    with _lock:
+        if _last_ok is not None and time.monotonic() < _last_ok[1]:
+            return _last_ok[0]
+    expected, current = expected_heads(), current_heads(conn)
+    result = {"ok": current == expected, "expected": sorted(expected), "current": sorted(current)}
+    if result["ok"]:  # Un esquema desactualizado se vuelve a comprobar en cada llamada
+        with _lock:
+            _last_ok = (result, time.monotonic() + SCHEMA_CHECK_TTL)
+    return result
+
+
+def readiness(conn: Connection) -> Dict[str, Any]:  # Conexion + esquema (sirve con run_sync en modo async)
+    """Hace un ping a la base de datos y comprueba la version del esquema"""
+    conn.execute(text("SELECT 1"))
+    return {"database": "ok", "schema": check_schema(conn)}
@@ -0,0 +1,212 @@
+"""Lecturas de varias tareas por ID: GET /tasks?ids=..., POST /tasks/lookup y el agrupador de GET /tasks/{id}
+
+El agrupador (estilo DataLoader) junta las lecturas de una sola tarea que llegan casi a la vez al mismo
+worker y las resuelve con un unico SELECT ... WHERE id IN (...). Solo espera LOOKUP_COALESCE_WINDOW_MS
+si hay otras lecturas en curso: una peticion aislada consulta de inmediato, sin latencia extra.
+"""
+import asyncio  # Futuros y temporizador del agrupador asincrono
+import os  # Lectura de variables de entorno
+import threading  # Agrupador del modo sync (threadpool)
+from concurrent.futures import Future  # Resultado compartido entre hilos
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple  # Tipado
+
+from fastapi import HTTPException  # Errores de validacion de ids
+from sqlalchemy import Row  # Filas Core
+from sqlalchemy.ext.asyncio import AsyncSession  # Sesion asincrona
+from sqlalchemy.orm import Session  # Sesion de SQLAlchemy
+
+from bulk import BULK_CHUNK_SIZE, check_bulk_size  # Mismo limite y tamaño de bloque que las operaciones masivas
+from database import AsyncSessionLocal  # Sesion propia de cada lote asincrono
+from metrics import registry  # Tamaño de los lotes en /metrics
+from model import Task, TaskArchive  # Tablas de tareas
+from serialization import select_task_rows, task_rows  # Filas Core con las columnas de TaskRead
+
+# Configuración del agrupador (leer de variables de entorno)
+LOOKUP_COALESCE_WINDOW_MS = float(os.getenv("LOOKUP_COALESCE_WINDOW_MS", "2"))  # Espera maxima para juntar lecturas (0 = sin agrupar)
+LOOKUP_COALESCE_MAX_BATCH = int(os.getenv("LOOKUP_COALESCE_MAX_BATCH", "100"))  # IDs por lote (lleno = se consulta ya)
+
+_BATCH_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)  # Limites del histograma de tamaño de lote
+
+
+class BatchStats:  # Histograma del numero de IDs por consulta IN
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, List[int]] = {}  # origen -> [cubetas..., +Inf, suma]
+
+    def observe(self, source: str, size: int) -> None:
+        with self._lock:
+            histogram = self.histograms.setdefault(source, [0] * (len(_BATCH_BUCKETS) + 2))
+            for index, bound in enumerate(_BATCH_BUCKETS):
+                if size <= bound:
+                    histogram[index] += 1
+            histogram[-2] += 1  # +Inf (numero de lotes)
+            histogram[-1] += size
+
+    def metrics(self) -> List[str]:  # Lineas Prometheus para /metrics
+        lines = ["# HELP api_task_lookup_batch_size IDs por consulta IN (lookup: ?ids= y /tasks/lookup; coalesced: GET /tasks/{id} agrupados)",
+                 "# TYPE api_task_lookup_batch_size histogram"]
+        with self._lock:
+            for source, histogram in sorted(self.histograms.items()):
+                lines += [f'api_task_lookup_batch_size_bucket{{source="{source}",le="{bound}"}} {count}'
+                          for bound, count in zip(_BATCH_BUCKETS, histogram)]
+                lines += [f'api_task_lookup_batch_size_bucket{{source="{source}",le="+Inf"}} {histogram[-2]}',
+                          f'api_task_lookup_batch_size_sum{{source="{source}"}} {histogram[-1]}',
+                          f'api_task_lookup_batch_size_count{{source="{source}"}} {histogram[-2]}']
+        return lines
+
+
+batch_stats = BatchStats()  # Lotes del proceso
+registry.register_collector(batch_stats.metrics)
+
+
+def fetch_task_rows(
+    db: Session, ids: Sequence[int], source: str = "lookup", table: Any = Task,
+) -> Dict[int, Row]:  # Un SELECT ... IN por bloque de BULK_CHUNK_SIZE
+    """Lee las tareas indicadas como filas Core y las retorna por ID (las que no existen no aparecen)"""
+    rows: Dict[int, Row] = {}
+    for start in range(0, len(ids), BULK_CHUNK_SIZE):
+        chunk = ids[start:start + BULK_CHUNK_SIZE]
+        batch_stats.observe(source, len(chunk))
+        rows.update((row.id, row) for row in db.execute(select_task_rows(table).where(table.id.in_(chunk))))
+    return rows
+
+
+def parse_ids(values: Iterable[str]) -> List[int]:  # ?ids=1,2,3 o ?ids=1&ids=2
+    """IDs de la query (separados por comas o repetidos); 422 si alguno no es entero"""
+    try:
+        return [int(part) for value in values for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids debe ser una lista de enteros separados por comas")
+
+
+def lookup_tasks(db: Session, ids: List[int], include_archived: bool = False) -> Dict[str, Any]:  # ?ids= y /tasks/lookup
+    """Tareas en el orden pedido (sin repetir) y los IDs que no existen"""
+    check_bulk_size(len(ids))  # 422 vacia, 413 por encima de BULK_MAX_ITEMS
+    unique = list(dict.fromkeys(ids))
+    found = fetch_task_rows(db, unique)
+    if include_archived and len(found) < len(unique):  # Las que faltan pueden estar en task_archive
+        found.update(fetch_task_rows(db, [task_id for task_id in unique if task_id not in found], table=TaskArchive))
+    return {
+        "items": task_rows([found[task_id] for task_id in unique if task_id in found]),
+        "missing": [task_id for task_id in unique if task_id not in found],
+    }
+
+
+class _Batch:  # IDs pendientes de un lote y el resultado de cada uno
+    def __init__(self, new_future: Any) -> None:
+        self.futures: Dict[int, Any] = {}  # Un futuro por ID (las peticiones repetidas lo comparten)
+        self.dispatched = False  # Ya se lanzo la consulta
+        self._new_future = new_future
+
+    def add(self, task_id: int) -> Any:
+        future = self.futures.get(task_id)
+        if future is None:
+            future = self.futures[task_id] = self._new_future()
+        return future
+
+    def resolve(self, rows: Dict[int, Row]) -> None:
+        for task_id, future in self.futures.items():
+            if not future.done():
+                future.set_result(rows.get(task_id))
+
+    def fail(self, exc: BaseException) -> None:
+        for future in self.futures.values():
+            if not future.done():
+                future.set_exception(exc)
+
+
+class TaskLoader:  # Agrupador del modo sync: las peticiones corren en hilos del threadpool
+    """La primera lectura abre un lote, espera a que se sumen otras (como mucho la ventana) y consulta por todas"""
+
+    def __init__(self, window: float, max_batch: int) -> None:
+        self.window = window  # Segundos
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._open: Dict[Any, Tuple[_Batch, threading.Event]] = {}  # Replica (o None = primario) -> lote abierto
+        self.active = 0  # Lecturas en curso
+
+    def load(self, db: Session, task_id: int) -> Optional[Row]:  # Fila de la tarea o None
+        if not self.window:
+            return fetch_task_rows(db, [task_id], "single").get(task_id)
+        key = db.info.get("replica")  # Solo se agrupan lecturas con el mismo destino (read-your-writes)
+        with self._lock:
+            self.active += 1
+            leader = key not in self._open
+            if leader:
+                self._open[key] = (_Batch(Future), threading.Event())
+            batch, full = self._open[key]
+            alone = self.active == 1
+            future = batch.add(task_id)
+            if len(batch.futures) >= self.max_batch:  # Lleno: las siguientes abren otro lote
+                del self._open[key]
+                full.set()
+        try:
+            if leader:
+                if not alone:  # Hay otras lecturas en curso: vale la pena esperar a que se sumen
+                    full.wait(self.window)
+                with self._lock:
+                    if self._open.get(key, (None,))[0] is batch:
+                        del self._open[key]
+                try:
+                    batch.resolve(fetch_task_rows(db, list(batch.futures), "coalesced"))
+                except BaseException as exc:
+                    batch.fail(exc)
+                    raise
+            return future.result()
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class AsyncTaskLoader:  # Agrupador del modo async: todo ocurre en el event loop
+    """Como TaskLoader; el lote se consulta con su propia sesion en una tarea aparte (sobrevive a la cancelacion)"""
+
+    def __init__(self, window: float, max_batch: int) -> None:
+        self.window = window
+        self.max_batch = max_batch
+        self._open: Dict[Any, _Batch] = {}  # Replica (o None = primario) -> lote abierto
+        self._running: Set[asyncio.Task] = set()  # Referencias a las consultas en curso
+        self.active = 0
+
+    async def load(self, db: AsyncSession, task_id: int) -> Optional[Row]:
+        if not self.window:
+            return (await db.run_sync(fetch_task_rows, [task_id], "single")).get(task_id)
+        info = db.sync_session.info
+        key = info.get("replica")
+        self.active += 1
+        try:
+            batch = self._open.get(key)
+            if batch is None:
+                loop = asyncio.get_running_loop()
+                batch = self._open[key] = _Batch(loop.create_future)
+                delay = self.window if self.active > 1 else 0  # Sola: en la siguiente vuelta del loop
+                loop.call_later(delay, self._dispatch, key, batch, info.get("on_replica_error"))
+            future = batch.add(task_id)
+            if len(batch.futures) >= self.max_batch:
+                self._dispatch(key, batch, info.get("on_replica_error"))
+            return await asyncio.shield(future)  # Cancelar una peticion no cancela el resultado de las demas
+        finally:
+            self.active -= 1
+
+    def _dispatch(self, key: Any, batch: _Batch, on_replica_error: Any) -> None:
+        if batch.dispatched:
+            return
+        batch.dispatched = True
+        if self._open.get(key) is batch:
+            del self._open[key]
+        task = asyncio.ensure_future(self._run(key, batch, on_replica_error))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, key: Any, batch: _Batch, on_replica_error: Any) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                if key is not None:  # Mismo destino que las peticiones del lote
+                    db.sync_session.info.update(replica=key, on_replica_error=on_replica_error)
+                batch.resolve(await db.run_sync(fetch_task_rows, list(batch.futures), "coalesced"))
+        except Exception as exc:
+            batch.fail(exc)
+
+
+task_loader = TaskLoader(LOOKUP_COALESCE_WINDOW_MS / 1000, LOOKUP_COALESCE_MAX_BATCH)  # Modo sync
+async_task_loader = AsyncTaskLoader(LOOKUP_COALESCE_WINDOW_MS / 1000, LOOKUP_COALESCE_MAX_BATCH)  # Modo async
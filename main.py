@@ -1,148 +1,325 @@
-from typing import List  # Tipado para listas en las respuestas  # noqa: F401
+import asyncio  # Tarea de fondo del job de archivado
+from typing import List, Literal, Optional, Tuple, Union  # Tipado para listas, opcionales y uniones en las respuestas
 
-from fastapi import Depends, FastAPI, HTTPException  # Importa FastAPI y utilidades de dependencias/errores
+from fastapi import APIRouter, Depends, FastAPI, Header, Query, Request, Response  # Importa FastAPI, router, peticion y utilidades de dependencias/errores
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse  # Respuestas JSON, en texto y transmitidas por bloques
 from fastapi.security import OAuth2PasswordRequestForm  # Para login via formulario x-www-form-urlencoded
 from sqlalchemy.orm import Session  # Proporciona el tipo de sesion de SQLAlchemy
 
-from database import engine, get_db  # Engine de la base de datos y dependencia para obtener sesiones
-from model import Base, Task, User  # Base ORM y modelos Task y User
+from starlette.concurrency import run_in_threadpool  # Ejecuta codigo bloqueante fuera del event loop
+
+from database import (
+    DB_MODE, DB_POOL_WARMUP, awarm_pool, dispose_engines, get_async_engine, get_db, get_engine, pool_stats, warm_pool,
+)  # Engines perezosos, sesiones y pool
 from schemas import (
-    TaskCreate, TaskRead, TaskUpdate, PaginatedTaskResponse,  # Esquemas de tareas
-    UserCreate, UserRead, Token  # Esquemas de autenticacion
+    TaskCreate, TaskRead, TaskUpdate, PaginatedTaskResponse, CursorPaginatedTaskResponse,  # Esquemas de tareas
+    TaskBulkUpdateItem, TaskBulkDelete, BulkTaskResponse, TaskStats,  # Esquemas de operaciones masivas y conteos
+    TaskLookup, TaskLookupResponse,  # Lectura de varias tareas por ID
+    TaskStatus, UserCreate, UserRead, Token  # Estados y esquemas de autenticacion
 )
-from auth import (
-    hash_password, verify_password, create_access_token, get_current_user,
-    ACCESS_TOKEN_EXPIRE_MINUTES,
-)  # Funciones de autenticacion y dependencia de usuario actual
-from datetime import timedelta  # Para calcular expiracion del token
+from auth import get_current_user  # Dependencia de usuario actual
+from hashing import hash_password, hashing_executor, verify_and_update  # bcrypt ejecutado en el pool de procesos
+from token_cache import Principal, token_cache  # Usuario autenticado y cache de tokens
+from bulk import bulk_create_tasks, bulk_update_tasks, bulk_delete_tasks, check_bulk_size  # Operaciones masivas
+from cache import cached_json_response, task_cache  # Cache de respuestas con ETag
+from export import MEDIA_TYPES, iter_export  # Exportacion en streaming
+from replicas import ReplicaStickinessMiddleware, active_replicas, get_read_db  # Replicas de lectura
+from ratelimit import check_login, check_register, rate_limited_user  # Limites por IP, username y usuario
+from admission import AdmissionControlMiddleware  # Rechazo de carga cuando el worker esta saturado
+from archive import ARCHIVE_INTERVAL_SECONDS, archive_periodically, archive_stats  # Job de archivado de tareas
+from changes import change_stream  # Feed de cambios (SSE)
+from task_stats import STATS_RECONCILE_INTERVAL_SECONDS, reconcile_periodically  # Reconciliacion del conteo por estado
+from lookup import lookup_tasks, task_loader  # Lecturas por lista de IDs y agrupador de GET /tasks/{id}
+from task_queries import TaskFilters  # Filtros de la exportacion
+from serialization import dumps  # JSON rapido
+from versioning import delete_task_row, parse_if_match, task_response, update_task_row  # Concurrencia optimista (If-Match)
+from health import DB_CREATE_ALL, create_schema, readiness  # Esquema y comprobaciones de salud
+from metrics import InstrumentationMiddleware, registry  # Server-Timing y /metrics
+from task_service import (
+    TaskListQuery, create_task_row, create_user, ensure_username_free, find_login_user, login_token,
+    task_json, task_list_json, task_list_query, task_stats_json, tasks_changed,
+)  # Consultas y respuestas comunes a los modos sync y async
+from datetime import datetime  # Filtros por fecha de la exportacion
 
 
 app = FastAPI()  # Instancia principal de la aplicacion FastAPI
+app.add_middleware(ReplicaStickinessMiddleware)  # Read-your-writes: quien escribe lee del primario un tiempo
+app.add_middleware(AdmissionControlMiddleware)  # 503 si hay demasiadas peticiones en curso o el pool tarda
+app.add_middleware(InstrumentationMiddleware)  # Server-Timing y metricas por ruta
+router = APIRouter()  # Rutas sincronas de tareas y autenticacion (modo DB_MODE=sync)
 
 
 @app.on_event("startup")  # Ejecuta la funcion al iniciar la app
-def on_startup():  # Define la funcion de arranque
-    try:  # Intenta crear las tablas
-        Base.metadata.create_all(bind=engine)  # Crea tablas segun los modelos
+def on_startup():  # No toca la BD salvo con DB_CREATE_ALL: el esquema lo gestiona Alembic
+    if not DB_CREATE_ALL:
+        return
+    try:  # Intenta crear las tablas (SQLite de desarrollo y benchmarks)
+        create_schema(get_engine())  # Crea tablas segun los modelos
     except Exception as exc:  # Captura cualquier error
         print(f"Error creando tablas: {exc}")  # Imprime el error para depurar
 
 
+@app.on_event("startup")  # Despues de crear el esquema
+async def warm_pools():  # Cada worker abre su pool antes de recibir trafico (DB_POOL_WARMUP, lo activa serve.py)
+    if not DB_POOL_WARMUP:
+        return
+    try:  # Sin BD el worker arranca igual: /health/ready respondera 503
+        if DB_MODE == "async":
+            await awarm_pool(get_async_engine())
+        else:
+            await run_in_threadpool(warm_pool, get_engine())
+    except Exception as exc:
+        print(f"Error abriendo el pool de conexiones: {exc}")
+
+
+@app.on_event("startup")
+async def start_archive_job():  # Archivado periodico en segundo plano (ARCHIVE_INTERVAL_SECONDS > 0)
+    app.state.archive_task = asyncio.create_task(archive_periodically()) if ARCHIVE_INTERVAL_SECONDS > 0 else None
+
+
+@app.on_event("startup")
+async def start_stats_job():  # Reconciliacion periodica de task_status_counts (STATS_RECONCILE_INTERVAL_SECONDS > 0)
+    app.state.stats_task = (
+        asyncio.create_task(reconcile_periodically()) if STATS_RECONCILE_INTERVAL_SECONDS > 0 else None
+    )
+
+
+@app.on_event("shutdown")  # Ejecuta la funcion al apagar la app
+async def on_shutdown():  # Libera los procesos de hashing y las conexiones
+    if app.state.archive_task is not None:  # Un lote en curso termina en su hilo; no se empieza otro
+        app.state.archive_task.cancel()
+    if app.state.stats_task is not None:
+        app.state.stats_task.cancel()
+    hashing_executor.shutdown()  # Detiene el pool de bcrypt
+    await dispose_engines()  # Cierra los pools de conexiones creados
+    await active_replicas.dispose()  # Y los de las replicas de lectura
+
+
 @app.get("/")  # Ruta GET para la raiz
 def root():  # Funcion que maneja la raiz
     return {"message": "API funcionando"}  # Respuesta simple de estado
 
 
-@app.post("/tasks", response_model=TaskRead)  # Ruta POST para crear tareas
+@app.get("/health/live")  # Liveness: el proceso responde (no consulta la BD)
+def health_live():
+    return {"status": "ok"}
+
+
+def _sync_readiness():  # readiness() con una conexion del engine sincrono
+    with get_engine().connect() as conn:
+        return readiness(conn)
+
+
+@app.get("/health/ready")  # Readiness: BD alcanzable y esquema en la ultima migracion
+async def health_ready():
+    """Retorna 200 si la API puede atender peticiones o 503 con el motivo"""
+    try:
+        if DB_MODE == "async":
+            async with get_async_engine().connect() as conn:
+                report = await conn.run_sync(readiness)
+        else:
+            report = await run_in_threadpool(_sync_readiness)
+    except Exception as exc:  # BD caida, credenciales invalidas, timeout...
+        return JSONResponse(status_code=503, content={"status": "unavailable", "database": type(exc).__name__})
+    ready = report["schema"]["ok"]
+    return JSONResponse(status_code=200 if ready else 503, content={"status": "ok" if ready else "unavailable", **report})
+
+
+@app.get("/metrics", response_class=PlainTextResponse)  # Ruta GET en formato Prometheus
+def metrics():  # Publica para que Prometheus la consulte sin token
+    """Retorna peticiones, latencias, consultas SQL y tiempos por fase de cada ruta"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/admin/pool")  # Ruta GET con las estadisticas del pool de conexiones
+def admin_pool(current_user: Principal = Depends(get_current_user)):  # Requiere usuario autenticado
+    """Retorna conexiones en uso, overflow y tiempos de espera del pool"""
+    return pool_stats()  # Estado en vivo de los pools sync/async
+
+
+@app.get("/admin/replicas")  # Ruta GET con el estado de las replicas de lectura
+def admin_replicas(current_user: Principal = Depends(get_current_user)):  # Requiere usuario autenticado
+    """Retorna la salud de cada replica y cuantas lecturas fueron a replicas o al primario"""
+    return active_replicas.stats()  # Salud, fallos y lecturas por destino
+
+
+@app.get("/admin/archive")  # Ruta GET con el progreso del job de archivado
+def admin_archive(current_user: Principal = Depends(get_current_user)):  # Requiere usuario autenticado
+    """Retorna las tareas archivadas por este proceso y el resumen de la ultima pasada"""
+    return {"interval_seconds": ARCHIVE_INTERVAL_SECONDS, **archive_stats.stats()}
+
+
+@app.get("/admin/hashing")  # Ruta GET con las metricas del pool de hashing
+def admin_hashing(current_user: Principal = Depends(get_current_user)):  # Requiere usuario autenticado
+    """Retorna la profundidad de la cola de bcrypt y los rechazos por saturacion"""
+    return hashing_executor.stats()  # Procesos, cola, completados y rechazados
+
+
+@app.get("/admin/token-cache")  # Ruta GET con las metricas del cache de tokens
+def admin_token_cache(current_user: Principal = Depends(get_current_user)):  # Requiere usuario autenticado
+    """Retorna aciertos, fallos y tamaño del cache de tokens"""
+    return token_cache.stats()  # Contadores del cache
+
+
+@app.get("/admin/response-cache")  # Ruta GET con las metricas del cache de respuestas
+def admin_response_cache(current_user: Principal = Depends(get_current_user)):  # Requiere usuario autenticado
+    """Retorna el backend, el TTL y los aciertos/fallos del cache de GET /tasks"""
+    return task_cache.stats()  # Contadores del cache
+
+
+@router.post("/tasks", response_model=TaskRead)  # Ruta POST para crear tareas
 def create_task(
     task: TaskCreate,  # Datos validados de la tarea
     db: Session = Depends(get_db),  # Sesion de BD
-    current_user: User = Depends(get_current_user)  # Requiere usuario autenticado
+    current_user: Principal = Depends(rate_limited_user)  # Requiere usuario autenticado (con limite de escrituras)
 ):  # Crea una nueva tarea
-    db_task = Task(**task.dict())  # Crea instancia ORM con los datos recibidos
-    db.add(db_task)  # Agrega la tarea a la sesion
-    db.commit()  # Confirma los cambios en la base
-    db.refresh(db_task)  # Refresca la instancia con datos persistidos
+    db_task = create_task_row(db, task)  # INSERT, conteo por estado y evento del feed en una transaccion
+    tasks_changed()  # Los totales y las paginas cacheadas ya no son validos
     return db_task  # Devuelve la tarea creada
 
 
-@app.get("/tasks", response_model=PaginatedTaskResponse)  # Ruta GET para listar tareas con paginacion
-def list_tasks(  # Funcion que lista tareas con soporte para paginacion
-    page: int = 1,  # Numero de pagina (por defecto 1), minimo 1
-    page_size: int = 10,  # Cantidad de items por pagina (por defecto 10), minimo 1
-    db: Session = Depends(get_db)  # Sesion de BD inyectada
+@router.get("/tasks", response_model=Union[PaginatedTaskResponse, CursorPaginatedTaskResponse, TaskLookupResponse])  # Ruta GET para listar tareas con paginacion
+def list_tasks(  # Funcion que lista tareas con soporte para paginacion por offset o por cursor
+    request: Request,  # Peticion (query normalizada para el cache e If-None-Match)
+    query: TaskListQuery = Depends(task_list_query),  # Paginacion, filtros, orden o ?ids= (comunes a los dos modos)
+    db: Session = Depends(get_read_db)  # Sesion de lectura (replica o primario)
 ):  # Retorna respuesta paginada con metadata
-    if page < 1:  # Valida que la pagina sea al menos 1
-        page = 1  # Corrige a pagina 1 si es invalida
-    if page_size < 1:  # Valida que page_size sea al menos 1
-        page_size = 10  # Corrige a 10 si es invalido
-
-    total = db.query(Task).count()  # Cuenta el total de tareas en la BD
-    offset = (page - 1) * page_size  # Calcula el offset basado en pagina y tamaño
-    tasks = db.query(Task).limit(page_size).offset(offset).all()  # Obtiene las tareas de la pagina actual
-    total_pages = (total + page_size - 1) // page_size  # Calcula el total de paginas
-
-    return {  # Retorna la respuesta con items y metadata de paginacion
-        "items": tasks,  # Lista de tareas de la pagina actual
-        "total": total,  # Total de tareas en la BD
-        "page": page,  # Numero de pagina actual
-        "page_size": page_size,  # Tamaño de pagina utilizado
-        "total_pages": total_pages  # Total de paginas disponibles
-    }
-
-
-@app.get("/tasks/{task_id}", response_model=TaskRead)  # Ruta GET para obtener una tarea por ID
-def get_task(task_id: int, db: Session = Depends(get_db)):  # Recibe el ID como parametro de ruta y la sesion
-    task = db.query(Task).filter(Task.id == task_id).first()  # Busca la tarea por ID
-    if not task:  # Si no existe la tarea
-        raise HTTPException(status_code=404, detail="Tarea no encontrada")  # Lanza error 404
-    return task  # Devuelve la tarea encontrada
-
-
-@app.put("/tasks/{task_id}", response_model=TaskRead)  # Ruta PUT para actualizar una tarea
+    return cached_json_response(  # Sirve la pagina desde el cache o la construye (304 si coincide el ETag)
+        request, task_cache.list_key(request), lambda: task_list_json(db, query),
+    )
+
+
+@router.post("/tasks/bulk", response_model=BulkTaskResponse, status_code=201)  # Ruta POST para crear tareas en lote
+def create_tasks_bulk(
+    tasks: List[TaskCreate],  # Lista de tareas a crear
+    atomic: bool = True,  # True: una sola transaccion; False: un commit por bloque
+    db: Session = Depends(get_db),  # Sesion de BD
+    current_user: Principal = Depends(rate_limited_user)  # Requiere usuario autenticado (con limite de escrituras)
+):  # Crea varias tareas con INSERT multi-fila
+    check_bulk_size(len(tasks))  # Valida el tamaño del lote
+    results = bulk_create_tasks(db, tasks, atomic)  # Inserta por bloques
+    tasks_changed()  # Los totales y las paginas cacheadas ya no son validos
+    return {"results": results}  # Un resultado por tarea
+
+
+@router.patch("/tasks/bulk", response_model=BulkTaskResponse)  # Ruta PATCH para actualizar tareas en lote
+def update_tasks_bulk(
+    tasks: List[TaskBulkUpdateItem],  # Lista de cambios (id + campos a modificar)
+    atomic: bool = True,  # True: una sola transaccion; False: un commit por bloque
+    db: Session = Depends(get_db),  # Sesion de BD
+    current_user: Principal = Depends(rate_limited_user)  # Requiere usuario autenticado (con limite de escrituras)
+):  # Actualiza varias tareas con UPDATE por clave primaria
+    check_bulk_size(len(tasks))  # Valida el tamaño del lote
+    results = bulk_update_tasks(db, tasks, atomic)  # Actualiza por bloques
+    tasks_changed(item.id for item in tasks)  # Descarta los totales, las tareas y las paginas cacheadas
+    return {"results": results}  # Un resultado por elemento
+
+
+@router.delete("/tasks/bulk", response_model=BulkTaskResponse)  # Ruta DELETE para eliminar tareas en lote
+def delete_tasks_bulk(
+    body: TaskBulkDelete,  # IDs de las tareas a eliminar
+    atomic: bool = True,  # True: una sola transaccion; False: un commit por bloque
+    db: Session = Depends(get_db),  # Sesion de BD
+    current_user: Principal = Depends(rate_limited_user)  # Requiere usuario autenticado (con limite de escrituras)
+):  # Elimina varias tareas con DELETE ... WHERE id IN (...)
+    check_bulk_size(len(body.ids))  # Valida el tamaño del lote
+    results = bulk_delete_tasks(db, body.ids, atomic)  # Elimina por bloques
+    tasks_changed(body.ids)  # Descarta los totales, las tareas y las paginas cacheadas
+    return {"results": results}  # Un resultado por ID
+
+
+@router.get("/tasks/export")  # Ruta GET para exportar todas las tareas en streaming
+def export_tasks(
+    format: Literal["ndjson", "csv"] = "ndjson",  # Formato de salida
+    status: Optional[TaskStatus] = None,  # Filtro por estado (igual que en el listado)
+    created_from: Optional[datetime] = None,  # Solo tareas con created_at >= created_from
+    created_to: Optional[datetime] = None,  # Solo tareas con created_at < created_to
+    q: Optional[str] = Query(None, min_length=1, max_length=100),  # Busqueda en titulo y descripcion
+):  # Transmite las filas sin cargar la tabla completa en memoria
+    filters = TaskFilters(status, created_from, created_to, q)  # Mismos filtros que GET /tasks
+    return StreamingResponse(  # Cada bloque sale del cursor del servidor y se envia de inmediato
+        iter_export(format, filters),  # Generador con su propia sesion de BD
+        media_type=MEDIA_TYPES[format],  # application/x-ndjson o text/csv
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},  # Descarga como archivo
+    )
+
+
+@router.post("/tasks/lookup", response_model=TaskLookupResponse)  # Ruta POST para leer varias tareas por ID
+def lookup_tasks_by_id(body: TaskLookup, db: Session = Depends(get_read_db)):  # Para listas de IDs que no caben en la URL
+    return Response(dumps(lookup_tasks(db, body.ids, body.include_archived)), media_type="application/json")  # Un IN por bloque
+
+
+@router.get("/tasks/stats", response_model=TaskStats)  # Ruta GET con el numero de tareas por estado
+def task_stats(request: Request, db: Session = Depends(get_read_db)):  # Lee task_status_counts (3 filas), no un GROUP BY
+    return cached_json_response(request, task_cache.stats_key(), lambda: task_stats_json(db))  # Cache + ETag
+
+
+@router.get("/tasks/changes")  # Ruta GET con los cambios de tareas en vivo (Server-Sent Events)
+async def task_changes(  # async def: cada conexion abierta es solo una cola en el event loop
+    since: Optional[int] = Query(None, ge=0),  # Reanuda despues de este seq (id del ultimo evento recibido)
+    last_event_id: Optional[str] = Header(None),  # Lo envia el EventSource al reconectar
+):  # Transmite un evento por cambio en lugar de sondear GET /tasks
+    return change_stream(since, last_event_id)
+
+
+@router.get("/tasks/{task_id}", response_model=TaskRead)  # Ruta GET para obtener una tarea por ID
+def get_task(  # Recibe el ID, la peticion y la sesion de lectura
+    task_id: int, request: Request, include_archived: bool = False, db: Session = Depends(get_read_db),
+):
+    def build() -> Tuple[bytes, str]:  # Se ejecuta solo si la tarea no esta en el cache
+        row = task_loader.load(db, task_id)  # Busca la tarea por ID (un IN compartido con las lecturas concurrentes)
+        return task_json(db, task_id, include_archived, row)  # 404 si no existe; JSON de TaskRead y ETag "v<version>"
+
+    return cached_json_response(request, task_cache.task_key(task_id, include_archived), build)  # Cache + ETag/If-None-Match
+
+
+@router.put("/tasks/{task_id}", response_model=TaskRead)  # Ruta PUT para actualizar una tarea
 def update_task(
     task_id: int,  # ID de la tarea a actualizar
     task_data: TaskUpdate,  # Datos validados con campos opcionales
     db: Session = Depends(get_db),  # Sesion de BD inyectada
-    current_user: User = Depends(get_current_user),  # Requiere usuario autenticado
+    if_match: Optional[str] = Header(None),  # ETag "v<version>" esperado (concurrencia optimista)
+    current_user: Principal = Depends(rate_limited_user),  # Requiere usuario autenticado (con limite de escrituras)
 ):  # Funcion que actualiza parcialmente una tarea
-    task = db.query(Task).filter(Task.id == task_id).first()  # Busca la tarea por ID
-
-    if not task:  # Si no existe la tarea
-        raise HTTPException(status_code=404, detail="Tarea no encontrada")  # Lanza error 404
-
-    for field, value in task_data.dict(exclude_unset=True).items():  # Itera solo campos enviados
-        setattr(task, field, value)  # Actualiza cada campo en la instancia ORM
+    changes = task_data.dict(exclude_unset=True)  # Solo los campos enviados
+    task = update_task_row(db, task_id, changes, parse_if_match(if_match))  # Un UPDATE (con RETURNING si se puede); 404/412
+    tasks_changed([task_id])  # Descarta los totales, la tarea y las paginas cacheadas
+    return task_response(task)  # Devuelve la tarea actualizada con su nuevo ETag
 
-    db.commit()  # Confirma los cambios en la base
-    db.refresh(task)  # Refresca la instancia con datos persistidos
-    return task  # Devuelve la tarea actualizada
 
-
-@app.delete("/tasks/{task_id}", status_code=204)  # Ruta DELETE para eliminar una tarea
+@router.delete("/tasks/{task_id}", status_code=204)  # Ruta DELETE para eliminar una tarea
 def delete_task(
     task_id: int,  # ID de la tarea a eliminar
     db: Session = Depends(get_db),  # Sesion de BD
-    current_user: User = Depends(get_current_user),  # Requiere usuario autenticado
+    if_match: Optional[str] = Header(None),  # ETag "v<version>" esperado (concurrencia optimista)
+    current_user: Principal = Depends(rate_limited_user),  # Requiere usuario autenticado (con limite de escrituras)
 ):  # Elimina una tarea existente
-    task = db.query(Task).filter(Task.id == task_id).first()  # Busca la tarea por ID
-
-    if not task:  # Si no existe la tarea
-        raise HTTPException(status_code=404, detail="Tarea no encontrada")  # Lanza error 404
-
-    db.delete(task)  # Marca la tarea para eliminar
-    db.commit()  # Confirma la eliminacion en la base
+    delete_task_row(db, task_id, parse_if_match(if_match))  # Un solo DELETE; 404/412 si no borro nada
+    tasks_changed([task_id])  # Descarta los totales, la tarea y las paginas cacheadas
 
 
 # Endpoints de autenticación
-@app.post("/auth/register", response_model=UserRead, status_code=201)  # Ruta POST para registrar nuevo usuario
-def register_user(user: UserCreate, db: Session = Depends(get_db)):  # Recibe datos de usuario y sesion
+@router.post("/auth/register", response_model=UserRead, status_code=201)  # Ruta POST para registrar nuevo usuario
+def register_user(user: UserCreate, request: Request, db: Session = Depends(get_db)):  # Recibe datos de usuario, peticion y sesion
     """Crea un nuevo usuario con contraseña hasheada"""
-    existing_user = db.query(User).filter(User.username == user.username).first()  # Verifica si el usuario ya existe
-    if existing_user:  # Si ya existe un usuario con ese username
-        raise HTTPException(status_code=400, detail="El usuario ya existe")  # Lanza error 400
-    
-    hashed_pwd = hash_password(user.password)  # Hashea la contraseña
-    db_user = User(username=user.username, hashed_password=hashed_pwd)  # Crea instancia del usuario
-    db.add(db_user)  # Agrega el usuario a la sesion
-    db.commit()  # Confirma los cambios
-    db.refresh(db_user)  # Refresca con datos de la BD
-    return db_user  # Retorna el usuario creado (sin contraseña)
-
-
-@app.post("/auth/login", response_model=Token)  # Ruta POST para autenticar usuario
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):  # Recibe credenciales via form-url-encoded
+    check_register(request)  # 429 si la IP supero el limite de registros
+    ensure_username_free(db, user.username)  # 400 si ya existe un usuario con ese username
+    return create_user(db, user.username, hash_password(user.password))  # Retorna el usuario creado (sin contraseña)
+
+
+@router.post("/auth/login", response_model=Token)  # Ruta POST para autenticar usuario
+def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):  # Recibe credenciales via form-url-encoded
     """Autentica un usuario y retorna un token JWT"""
-    db_user = db.query(User).filter(User.username == form_data.username).first()  # Busca el usuario
-    if not db_user:  # Si no existe el usuario
-        raise HTTPException(status_code=401, detail="Credenciales incorrectas")  # Error 401
+    check_login(request, form_data.username)  # 429 antes de consultar la BD y de ejecutar bcrypt
+    db_user = find_login_user(db, form_data.username)  # 401 si no existe
+    valid, new_hash = verify_and_update(form_data.password, db_user.hashed_password)  # Verifica en el pool de hashing
+    return login_token(db, db_user, valid, new_hash)  # 401 si no coincide; guarda el rehash y crea el token
 
-    if not verify_password(form_data.password, db_user.hashed_password):  # Verifica la contraseña
-        raise HTTPException(status_code=401, detail="Credenciales incorrectas")  # Error 401
 
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)  # Define tiempo de expiracion
-    access_token = create_access_token(  # Crea el token JWT
-        data={"sub": db_user.username},  # Payload con el username
-        expires_delta=access_token_expires  # Tiempo de expiracion
-    )
-    return {"access_token": access_token, "token_type": "bearer"}  # Retorna el token
+# Registra las rutas segun el modo de base de datos configurado
+if DB_MODE == "async":  # AsyncSession con aiomysql/aiosqlite
+    from async_api import router as async_router  # Rutas asincronas equivalentes
+
+    app.include_router(async_router)  # Endpoints async def sin ocupar el threadpool
+else:  # Modo sincrono con PyMySQL (por defecto)
+    app.include_router(router)  # Endpoints def ejecutados en el threadpool
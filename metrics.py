@@ -0,0 +1,185 @@
+import logging  # Aviso de posibles N+1
+import os  # Lectura de variables de entorno
+import threading  # Bloqueo para los contadores compartidos
+import time  # Reloj de alta resolucion
+from contextlib import contextmanager  # Medicion de fases con "with"
+from contextvars import ContextVar  # Metricas de la peticion en curso (hilos y corrutinas)
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple  # Tipado
+
+from sqlalchemy import event  # Hooks del engine
+from sqlalchemy.engine import Engine  # Tipo del engine instrumentado
+from starlette.datastructures import MutableHeaders  # Cabeceras de la respuesta ASGI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send  # Tipos ASGI
+
+# Configuración de la instrumentacion (leer de variables de entorno)
+QUERY_WARN_THRESHOLD = int(os.getenv("QUERY_WARN_THRESHOLD", "20"))  # Consultas por peticion antes de avisar (0 = sin aviso)
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # Limites del histograma (s)
+
+logger = logging.getLogger(__name__)  # Avisos de N+1
+
+
+class RequestMetrics:  # Acumulados de una sola peticion
+    __slots__ = ("queries", "db_time", "timings")
+
+    def __init__(self) -> None:
+        self.queries = 0  # Sentencias SQL ejecutadas
+        self.db_time = 0.0  # Segundos dentro del driver
+        self.timings: Dict[str, float] = {}  # Otras fases medidas con timed() (serialize, hash)
+
+    def server_timing(self, total: float) -> str:  # Valor de la cabecera Server-Timing
+        parts = [f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"']
+        parts.extend(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.timings.items())
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)  # Peticion en curso
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:  # Suma la duracion del bloque a la fase indicada
+    """Mide un bloque de codigo y lo reporta como fase de la peticion actual"""
+    metrics = _current.get()
+    if metrics is None:  # Fuera de una peticion (scripts, jobs)
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.timings[phase] = metrics.timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+def instrument_engine(engine: Engine) -> None:  # Cuenta y cronometra cada sentencia del engine
+    """Instala los hooks before/after_cursor_execute que alimentan las metricas de la peticion"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.queries += 1
+            metrics.db_time += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):  # La sentencia fallida no llega a after_cursor_execute
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            _after(conn, None, None, None, None, False)
+
+
+def _escape(value: str) -> str:  # Escapa un valor de etiqueta Prometheus
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:  # {a="x",b="y"}
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+class MetricsRegistry:  # Metricas agregadas del proceso en formato Prometheus
+    """Acumula las metricas de todas las peticiones y las expone en texto Prometheus"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str, int], int] = {}  # (metodo, ruta, status) -> peticiones
+        self.durations: Dict[Tuple[str, str], List[float]] = {}  # (metodo, ruta) -> buckets + [suma, cuenta]
+        self.queries: Dict[Tuple[str, str], int] = {}  # (metodo, ruta) -> sentencias SQL
+        self.phases: Dict[Tuple[str, str, str], float] = {}  # (metodo, ruta, fase) -> segundos
+        self.n_plus_one: Dict[Tuple[str, str], int] = {}  # (metodo, ruta) -> avisos de N+1
+        self._collectors: List[Callable[[], Iterable[str]]] = []  # Metricas adicionales de otros modulos
+
+    def register_collector(self, collector: Callable[[], Iterable[str]]) -> None:  # Extension del /metrics
+        """Agrega una funcion que retorna lineas Prometheus adicionales"""
+        self._collectors.append(collector)
+
+    def observe(self, method: str, route: str, status: int, total: float, metrics: RequestMetrics) -> None:
+        """Registra una peticion terminada"""
+        key = (method, route)
+        with self._lock:
+            self.requests[(method, route, status)] = self.requests.get((method, route, status), 0) + 1
+            histogram = self.durations.setdefault(key, [0.0] * (len(METRICS_BUCKETS) + 2))
+            for index, bound in enumerate(METRICS_BUCKETS):
+                if total <= bound:
+                    histogram[index] += 1
+            histogram[-2] += total
+            histogram[-1] += 1
+            self.queries[key] = self.queries.get(key, 0) + metrics.queries
+            phases = {"db": metrics.db_time, **metrics.timings}
+            for phase, seconds in phases.items():
+                self.phases[(method, route, phase)] = self.phases.get((method, route, phase), 0.0) + seconds
+            if QUERY_WARN_THRESHOLD and metrics.queries > QUERY_WARN_THRESHOLD:
+                self.n_plus_one[key] = self.n_plus_one.get(key, 0) + 1
+
+    def render(self) -> str:  # Formato de exposicion de texto 0.0.4
+        """Retorna todas las metricas en formato Prometheus"""
+        lines: List[str] = []
+        with self._lock:
+            lines += ["# HELP api_requests_total Peticiones HTTP atendidas", "# TYPE api_requests_total counter"]
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f"api_requests_total{_labels(method=method, route=route, status=status)} {count}")
+            lines += ["# HELP api_request_duration_seconds Duracion de las peticiones HTTP",
+                      "# TYPE api_request_duration_seconds histogram"]
+            for (method, route), histogram in sorted(self.durations.items()):
+                for bound, count in zip(METRICS_BUCKETS, histogram):
+                    labels = _labels(method=method, route=route, le=repr(bound))
+                    lines.append(f"api_request_duration_seconds_bucket{labels} {int(count)}")
+                labels = _labels(method=method, route=route, le="+Inf")
+                lines.append(f"api_request_duration_seconds_bucket{labels} {int(histogram[-1])}")
+                lines.append(f"api_request_duration_seconds_sum{_labels(method=method, route=route)} {histogram[-2]:.6f}")
+                lines.append(f"api_request_duration_seconds_count{_labels(method=method, route=route)} {int(histogram[-1])}")
+            lines += ["# HELP api_db_queries_total Sentencias SQL ejecutadas", "# TYPE api_db_queries_total counter"]
+            for (method, route), count in sorted(self.queries.items()):
+                lines.append(f"api_db_queries_total{_labels(method=method, route=route)} {count}")
+            lines += ["# HELP api_phase_seconds_total Tiempo por fase de la peticion (db, serialize, hash)",
+                      "# TYPE api_phase_seconds_total counter"]
+            for (method, route, phase), seconds in sorted(self.phases.items()):
+                lines.append(f"api_phase_seconds_total{_labels(method=method, route=route, phase=phase)} {seconds:.6f}")
+            lines += ["# HELP api_n_plus_one_total Peticiones que superaron QUERY_WARN_THRESHOLD consultas",
+                      "# TYPE api_n_plus_one_total counter"]
+            for (method, route), count in sorted(self.n_plus_one.items()):
+                lines.append(f"api_n_plus_one_total{_labels(method=method, route=route)} {count}")
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()  # Registro compartido por el proceso
+
+
+class InstrumentationMiddleware:  # Middleware ASGI: mide cada peticion HTTP
+    """Agrega Server-Timing a la respuesta y registra la peticion en /metrics"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        metrics = RequestMetrics()
+        token = _current.set(metrics)  # Visible en el threadpool y en run_sync (copian el contexto)
+        start = time.perf_counter()
+        status = 500  # Si la app falla antes de responder
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", metrics.server_timing(time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")  # Plantilla (/tasks/{task_id}), no la URL
+            registry.observe(scope["method"], route, status, time.perf_counter() - start, metrics)
+            if QUERY_WARN_THRESHOLD and metrics.queries > QUERY_WARN_THRESHOLD:
+                logger.warning(
+                    "Posible N+1: %s %s ejecuto %d consultas (QUERY_WARN_THRESHOLD=%d)",
+                    scope["method"], route, metrics.queries, QUERY_WARN_THRESHOLD,
+                )
@@ -6,8 +6,8 @@ from sqlalchemy import pool
 
 from alembic import context
 
-from database import engine  # Importa el engine de database.py
-from model import Base  # Importa la base de modelos para autogenerate
+from database import get_engine  # Engine de database.py (se crea solo al migrar en modo online)
+from model import Base  # Base declarativa unica; importar model registra todas las tablas en Base.metadata
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -20,7 +20,7 @@ if config.config_file_name is not None:
 
 # add your model's MetaData object here
 # for 'autogenerate' support
-target_metadata = Base.metadata  # Usa los modelos de database.py
+target_metadata = Base.metadata  # Un solo MetaData con todas las tablas de model.py
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -59,7 +59,7 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = engine  # Usa el engine de database.py
+    connectable = get_engine()  # Usa el engine de database.py
 
     with connectable.connect() as connection:
         context.configure(
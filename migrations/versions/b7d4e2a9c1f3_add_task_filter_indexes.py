@@ -0,0 +1,37 @@
+"""add task filter, sort and fulltext indexes
+
+Revision ID: b7d4e2a9c1f3
+Revises: f1a2b3c4d5e6
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op  # Operaciones de migracion de Alembic
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d4e2a9c1f3"  # ID unico de esta migracion
+down_revision: Union[str, Sequence[str], None] = "f1a2b3c4d5e6"  # Migracion anterior requerida
+branch_labels: Union[str, Sequence[str], None] = None  # Etiquetas de rama (no usadas)
+depends_on: Union[str, Sequence[str], None] = None  # Dependencias adicionales (ninguna)
+
+
+def upgrade() -> None:
+    """Crea los indices usados por los filtros, el ordenamiento y la busqueda de GET /tasks"""
+    # Filtro por estado combinado con rango u orden por fecha
+    op.create_index("ix_task_status_created_at", "task", ["status", "created_at"], unique=False)
+    # Rango u orden por fecha sin filtro de estado
+    op.create_index("ix_task_created_at", "task", ["created_at"], unique=False)
+    # Busqueda de texto en titulo y descripcion (FULLTEXT solo existe en MySQL/MariaDB)
+    if op.get_bind().dialect.name == "mysql":
+        op.create_index(
+            "ix_task_title_description", "task", ["title", "description"], unique=False, mysql_prefix="FULLTEXT"
+        )
+
+
+def downgrade() -> None:
+    """Elimina los indices de filtros, ordenamiento y busqueda"""
+    if op.get_bind().dialect.name == "mysql":
+        op.drop_index("ix_task_title_description", table_name="task")
+    op.drop_index("ix_task_created_at", table_name="task")
+    op.drop_index("ix_task_status_created_at", table_name="task")
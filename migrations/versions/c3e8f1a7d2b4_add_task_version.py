@@ -0,0 +1,27 @@
+"""add task version column for optimistic concurrency
+
+Revision ID: c3e8f1a7d2b4
+Revises: b7d4e2a9c1f3
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op  # Operaciones de migracion de Alembic
+import sqlalchemy as sa  # Tipos de columnas
+
+# revision identifiers, used by Alembic.
+revision: str = "c3e8f1a7d2b4"  # ID unico de esta migracion
+down_revision: Union[str, Sequence[str], None] = "b7d4e2a9c1f3"  # Migracion anterior requerida
+branch_labels: Union[str, Sequence[str], None] = None  # Etiquetas de rama (no usadas)
+depends_on: Union[str, Sequence[str], None] = None  # Dependencias adicionales (ninguna)
+
+
+def upgrade() -> None:
+    """Agrega task.version; las filas existentes empiezan en la version 1"""
+    op.add_column("task", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    """Elimina task.version"""
+    op.drop_column("task", "version")
@@ -0,0 +1,48 @@
+"""add task_archive table for archived done tasks
+
+Revision ID: d5a9e3c7b1f2
+Revises: c3e8f1a7d2b4
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op  # Operaciones de migracion de Alembic
+import sqlalchemy as sa  # Tipos de columnas
+
+# revision identifiers, used by Alembic.
+revision: str = "d5a9e3c7b1f2"  # ID unico de esta migracion
+down_revision: Union[str, Sequence[str], None] = "c3e8f1a7d2b4"  # Migracion anterior requerida
+branch_labels: Union[str, Sequence[str], None] = None  # Etiquetas de rama (no usadas)
+depends_on: Union[str, Sequence[str], None] = None  # Dependencias adicionales (ninguna)
+
+
+def upgrade() -> None:
+    """Crea task_archive con las mismas columnas que task mas archived_at"""
+    op.create_table(
+        "task_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),  # Conserva el ID original
+        sa.Column("title", sa.String(length=100), nullable=False),
+        sa.Column("description", sa.String(length=255), nullable=True),
+        sa.Column("status", sa.Enum("pending", "in_progress", "done", name="taskstatus"), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.TIMESTAMP(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # Rango u orden por fecha en los listados con include_archived
+    op.create_index("ix_task_archive_created_at", "task_archive", ["created_at"], unique=False)
+    # Busqueda de texto en titulo y descripcion (FULLTEXT solo existe en MySQL/MariaDB)
+    if op.get_bind().dialect.name == "mysql":
+        op.create_index(
+            "ix_task_archive_title_description", "task_archive", ["title", "description"], unique=False,
+            mysql_prefix="FULLTEXT",
+        )
+
+
+def downgrade() -> None:
+    """Elimina task_archive (las tareas archivadas se pierden: restaurarlas antes si hacen falta)"""
+    if op.get_bind().dialect.name == "mysql":
+        op.drop_index("ix_task_archive_title_description", table_name="task_archive")
+    op.drop_index("ix_task_archive_created_at", table_name="task_archive")
+    op.drop_table("task_archive")
@@ -0,0 +1,34 @@
+"""add task_change log for the task change feed
+
+Revision ID: e7b2c4d6f8a1
+Revises: d5a9e3c7b1f2
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op  # Operaciones de migracion de Alembic
+import sqlalchemy as sa  # Tipos de columnas
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b2c4d6f8a1"  # ID unico de esta migracion
+down_revision: Union[str, Sequence[str], None] = "d5a9e3c7b1f2"  # Migracion anterior requerida
+branch_labels: Union[str, Sequence[str], None] = None  # Etiquetas de rama (no usadas)
+depends_on: Union[str, Sequence[str], None] = None  # Dependencias adicionales (ninguna)
+
+
+def upgrade() -> None:
+    """Crea task_change: una fila (seq, task_id, op) por cada escritura de tareas"""
+    op.create_table(
+        "task_change",
+        sa.Column("seq", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), autoincrement=True, nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("op", sa.String(length=10), nullable=False),
+        sa.Column("changed_at", sa.TIMESTAMP(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        sa.PrimaryKeyConstraint("seq"),
+    )
+
+
+def downgrade() -> None:
+    """Elimina task_change (los clientes del feed tendran que recargar el listado completo)"""
+    op.drop_table("task_change")
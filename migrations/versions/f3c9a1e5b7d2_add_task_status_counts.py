@@ -0,0 +1,39 @@
+"""add task_status_counts with per-status task counters
+
+Revision ID: f3c9a1e5b7d2
+Revises: e7b2c4d6f8a1
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op  # Operaciones de migracion de Alembic
+import sqlalchemy as sa  # Tipos de columnas
+
+# revision identifiers, used by Alembic.
+revision: str = "f3c9a1e5b7d2"  # ID unico de esta migracion
+down_revision: Union[str, Sequence[str], None] = "e7b2c4d6f8a1"  # Migracion anterior requerida
+branch_labels: Union[str, Sequence[str], None] = None  # Etiquetas de rama (no usadas)
+depends_on: Union[str, Sequence[str], None] = None  # Dependencias adicionales (ninguna)
+
+_STATUSES = ("pending", "in_progress", "done")  # Valores de TaskStatus
+
+
+def upgrade() -> None:
+    """Crea task_status_counts y la llena con el conteo actual de task (una fila por estado)"""
+    op.create_table(
+        "task_status_counts",
+        sa.Column("status", sa.Enum(*_STATUSES, name="taskstatus"), nullable=False),
+        sa.Column("count", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("status"),
+    )
+    statuses = " UNION ALL ".join(f"SELECT '{status}' AS status" for status in _STATUSES)  # Tambien los estados sin tareas
+    op.execute(  # Una sola sentencia en la BD: funciona igual con alembic upgrade --sql (modo offline)
+        "INSERT INTO task_status_counts (status, count) "
+        f"SELECT s.status, COUNT(task.id) FROM ({statuses}) AS s LEFT JOIN task ON task.status = s.status GROUP BY s.status"
+    )
+
+
+def downgrade() -> None:
+    """Elimina task_status_counts (GET /tasks/stats deja de funcionar)"""
+    op.drop_table("task_status_counts")
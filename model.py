@@ -1,30 +1,74 @@
+import enum  # Proporciona soporte para enumeraciones en Python
+from datetime import datetime  # Tipo de created_at
+from typing import Optional  # Columnas que admiten NULL
 
-from sqlalchemy.sql import  func  # Importa funciones SQL como current_timestamp
+from sqlalchemy import BigInteger, Enum, Index, Integer, String, TIMESTAMP  # Importa tipos/indices de SQLAlchemy
+from sqlalchemy.orm import Mapped, mapped_column  # Modelos tipados de SQLAlchemy 2.0
+from sqlalchemy.sql import func  # Importa funciones SQL como current_timestamp
 
-from sqlalchemy import Column, Integer, String, Enum, TIMESTAMP  # Importa tipos/columnas de SQLAlchemy
-from sqlalchemy.ext.declarative import declarative_base  # Permite declarar clases ORM
-import enum  # Proporciona soporte para enumeraciones en Python
+from database import Base  # Base declarativa unica (un solo MetaData para la API y Alembic)
 
-Base = declarative_base()  # Clase base que usarán todos los modelos ORM
 
-class TaskStatus(enum.Enum):  # Enumeración para los posibles estados de una tarea
+class TaskStatus(str, enum.Enum):  # Estados de una tarea, compartidos por el ORM y los esquemas Pydantic
     pending = "pending"  # Tarea creada pero sin iniciar
     in_progress = "in_progress"  # Tarea en curso
     done = "done"  # Tarea finalizada
 
+
 class Task(Base):  # Modelo ORM que representa la tabla "task"
     __tablename__ = "task"  # Nombre de la tabla en la base de datos
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)  # Clave primaria autoincremental
-    title = Column(String(100), nullable=False)  # Título obligatorio de la tarea
-    description = Column(String(255))  # Descripción opcional
-    status = Column(Enum(TaskStatus), nullable=False, default=TaskStatus.pending, index=True)  # Estado con índice para filtrado
-    created_at = Column(TIMESTAMP, nullable=False, server_default=func.current_timestamp(), onupdate=func.current_timestamp())  # Marca temporal de creación/actualización
+    id: Mapped[int] = mapped_column(primary_key=True, index=True, autoincrement=True)  # Clave primaria autoincremental
+    title: Mapped[str] = mapped_column(String(100))  # Título obligatorio de la tarea
+    description: Mapped[Optional[str]] = mapped_column(String(255))  # Descripción opcional
+    status: Mapped[TaskStatus] = mapped_column(Enum(TaskStatus), default=TaskStatus.pending, index=True)  # Estado con índice para filtrado
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.current_timestamp(), onupdate=func.current_timestamp())  # Marca temporal de creación/actualización
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")  # Version para concurrencia optimista (ETag/If-Match)
+
+    __table_args__ = (  # Indices para filtros, ordenamiento y busqueda de GET /tasks
+        Index("ix_task_status_created_at", "status", "created_at"),  # Filtro por estado + rango/orden por fecha
+        Index("ix_task_created_at", "created_at"),  # Rango/orden por fecha sin filtro de estado
+        Index("ix_task_title_description", "title", "description", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),  # Busqueda de texto (solo MySQL)
+    )
+    __mapper_args__ = {"version_id_col": version}  # El ORM agrega "AND version = ?" y la incrementa en cada UPDATE
+
+
+class TaskArchive(Base):  # Tareas "done" antiguas movidas fuera de "task" por el job de archivado (archive.py)
+    __tablename__ = "task_archive"  # Nombre de la tabla en la base de datos
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)  # Mismo ID que tenia en "task"
+    title: Mapped[str] = mapped_column(String(100))  # Mismas columnas que Task (se copian con INSERT ... SELECT)
+    description: Mapped[Optional[str]] = mapped_column(String(255))
+    status: Mapped[TaskStatus] = mapped_column(Enum(TaskStatus))
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP)  # Sin onupdate: las tareas archivadas no cambian
+    version: Mapped[int] = mapped_column(Integer)
+    archived_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.current_timestamp())  # Cuando se archivo
+
+    __table_args__ = (  # Indices para GET /tasks?include_archived=true (todas las filas son "done")
+        Index("ix_task_archive_created_at", "created_at"),  # Rango/orden por fecha
+        Index("ix_task_archive_title_description", "title", "description", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),  # Busqueda de texto (solo MySQL)
+    )
+
+
+class TaskStatusCount(Base):  # Conteo materializado de tareas por estado para GET /tasks/stats (task_stats.py)
+    __tablename__ = "task_status_counts"  # Nombre de la tabla en la base de datos
+
+    status: Mapped[TaskStatus] = mapped_column(Enum(TaskStatus), primary_key=True)  # Una fila por estado
+    count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")  # Tareas en "task" con ese estado
+
+
+class TaskChange(Base):  # Registro compacto de cambios de tareas para GET /tasks/changes (changes.py)
+    __tablename__ = "task_change"  # Nombre de la tabla en la base de datos
+
+    seq: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)  # Numero de secuencia (id del evento SSE)
+    task_id: Mapped[int] = mapped_column(Integer)  # Sin clave foranea: la tarea puede estar borrada o archivada
+    op: Mapped[str] = mapped_column(String(10))  # created | updated | deleted | archived
+    changed_at: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.current_timestamp())  # Cuando se confirmo
 
 
 class User(Base):  # Modelo ORM que representa la tabla "users"
     __tablename__ = "users"  # Nombre de la tabla en la base de datos
 
-    id = Column(Integer, primary_key=True, index=True)  # Clave primaria autoincremental
-    username = Column(String(50), unique=True, index=True, nullable=False)  # Nombre de usuario unico e indexado
-    hashed_password = Column(String(255), nullable=False)  # Contraseña hasheada (nunca en texto plano)
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)  # Clave primaria autoincremental
+    username: Mapped[str] = mapped_column(String(50), unique=True, index=True)  # Nombre de usuario unico e indexado
+    hashed_password: Mapped[str] = mapped_column(String(255))  # Contraseña hasheada (nunca en texto plano)
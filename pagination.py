@@ -0,0 +1,27 @@
+import base64  # Codificacion base64 url-safe para el cursor opaco
+import binascii  # Errores de decodificacion base64
+import json  # Serializacion del contenido del cursor
+from typing import Optional  # Tipado opcional
+
+from fastapi import HTTPException  # Errores HTTP
+
+
+def encode_cursor(last_id: int) -> str:  # Genera un cursor opaco a partir del ultimo id devuelto
+    """Codifica la posicion de la ultima tarea entregada en un cursor opaco"""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()  # Payload compacto
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")  # Sin padding para usarlo en la URL
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:  # Recupera el ultimo id a partir del cursor
+    """Decodifica un cursor opaco y retorna el id a partir del cual continuar"""
+    if not cursor:  # Sin cursor se empieza desde el principio
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)  # Restaura el padding eliminado
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))  # Decodifica el JSON
+        last_id = payload["id"]  # Ultimo id entregado en la pagina anterior
+        if not isinstance(last_id, int):  # El id debe ser entero
+            raise ValueError("id invalido")
+    except (binascii.Error, ValueError, KeyError, TypeError):  # Cursor manipulado o corrupto
+        raise HTTPException(status_code=400, detail="Cursor invalido")
+    return last_id
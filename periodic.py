@@ -0,0 +1,31 @@
+import asyncio  # Espera entre turnos
+import logging  # Errores de los jobs
+import time  # Reloj de pared: mismo turno en todos los workers
+from typing import Any, Callable  # Tipado
+
+from starlette.concurrency import run_in_threadpool  # Los jobs usan el engine sincrono
+
+from shared_state import get_shared_state, run_shared  # Un solo worker ejecuta cada turno
+
+logger = logging.getLogger(__name__)  # Errores de los jobs
+
+
+def _claim(slot: str, ttl: int) -> bool:  # Toma el turno en el estado compartido
+    state = get_shared_state()
+    if state.incr(slot) != 1:  # Otro worker ya tomo este turno
+        return False
+    state.set(slot, 1, ex=ttl)  # INCR no pone TTL: la clave del turno caduca sola
+    return True
+
+
+async def run_periodically(name: str, interval: float, job: Callable[[], Any]) -> None:  # Tarea de fondo de la app
+    """Ejecuta job() en el threadpool cada `interval` segundos; con varios workers solo uno ejecuta cada turno"""
+    while True:
+        await asyncio.sleep(interval - time.time() % interval + 0.01)  # Todos los workers despiertan en el mismo turno
+        slot = f"{name}:slot:{int(time.time() // interval)}"
+        try:
+            if not await run_shared(_claim, slot, int(interval * 2) + 1):  # FileRedis/redis: fuera del event loop
+                continue
+            await run_in_threadpool(job)
+        except Exception:  # El job (o el estado compartido) no debe tumbar la app: se reintenta en el siguiente turno
+            logger.exception("Fallo el job %s", name)
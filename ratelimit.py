@@ -0,0 +1,189 @@
+import os  # Lectura de variables de entorno
+import threading  # Bloqueo del almacen en memoria y de los contadores
+import time  # Reloj de recarga de los buckets
+from collections import OrderedDict  # Orden LRU del almacen en memoria
+from typing import Any, Dict, List, Optional, Tuple  # Tipado
+
+from fastapi import Depends, HTTPException, Request  # Dependencias, errores HTTP y peticion
+
+from auth import get_current_user, get_current_user_async  # Usuario autenticado de las rutas de escritura
+from metrics import registry  # Estado del limitador en /metrics
+from shared_state import get_shared_state, run_shared  # Buckets comunes a todos los workers
+from token_cache import Principal  # Usuario autenticado
+
+# Configuración del limitador (leer de variables de entorno); limites con formato "peticiones/segundos"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()  # memory | shared | none
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))  # Buckets maximos en memoria (LRU)
+RATE_LIMIT_LOGIN_IP = os.getenv("RATE_LIMIT_LOGIN_IP", "20/60")  # Intentos de login por IP
+RATE_LIMIT_LOGIN_USER = os.getenv("RATE_LIMIT_LOGIN_USER", "10/60")  # Intentos de login por username
+RATE_LIMIT_REGISTER_IP = os.getenv("RATE_LIMIT_REGISTER_IP", "5/60")  # Registros por IP
+RATE_LIMIT_WRITE = os.getenv("RATE_LIMIT_WRITE", "120/60")  # Escrituras de tareas por usuario
+
+# Toma un token en Redis de forma atomica (mismo calculo que _take); el estado se guarda como "tokens:instante"
+_TAKE_SCRIPT = """
+local capacity, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tokens, last = capacity, now
+local raw = redis.call('GET', KEYS[1])
+if raw then
+    local sep = string.find(raw, ':', 1, true)
+    tokens, last = tonumber(string.sub(raw, 1, sep - 1)), tonumber(string.sub(raw, sep + 1))
+end
+tokens = math.min(capacity, tokens + math.max(0, now - last) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens, allowed = tokens - 1, 1
+end
+redis.call('SET', KEYS[1], string.format('%.6f:%.6f', tokens, now), 'EX', ARGV[4])
+return {allowed, string.format('%.6f', tokens)}
+"""
+
+
+class RateLimit:  # Bucket de capacidad fija que se recarga a ritmo constante
+    """Limite "peticiones/segundos": admite rafagas de hasta `capacity` y recarga capacity/period tokens por segundo"""
+
+    def __init__(self, name: str, spec: str) -> None:
+        capacity, _, period = spec.partition("/")
+        self.name = name  # Etiqueta en /metrics y prefijo de las claves
+        self.capacity = int(capacity)  # Tamaño de la rafaga (0 = sin limite)
+        self.period = float(period or 1)  # Segundos para recargar el bucket completo
+        self.rate = self.capacity / self.period if self.capacity else 0.0  # Tokens por segundo
+
+
+LOGIN_IP = RateLimit("login_ip", RATE_LIMIT_LOGIN_IP)
+LOGIN_USER = RateLimit("login_user", RATE_LIMIT_LOGIN_USER)
+REGISTER_IP = RateLimit("register_ip", RATE_LIMIT_REGISTER_IP)
+WRITE_USER = RateLimit("write_user", RATE_LIMIT_WRITE)
+
+
+def _take(raw: Optional[bytes], limit: RateLimit, now: float) -> Tuple[bytes, Tuple[bool, float]]:  # Un token del bucket
+    """Recarga el bucket segun el tiempo transcurrido y consume un token si hay; retorna (estado nuevo, (admitida, tokens))"""
+    tokens, last = float(limit.capacity), now
+    if raw is not None:
+        stored_tokens, _, stored_at = raw.decode().partition(":")
+        tokens, last = float(stored_tokens), float(stored_at)
+    tokens = min(float(limit.capacity), tokens + max(0.0, now - last) * limit.rate)
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+    return f"{tokens:.6f}:{now:.6f}".encode(), (allowed, tokens)
+
+
+class MemoryBuckets:  # Buckets del proceso (cada worker limita por separado)
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, bytes]" = OrderedDict()  # clave -> estado "tokens:instante"
+
+    def take(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        with self._lock:
+            state, result = _take(self._buckets.get(key), limit, time.monotonic())
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:  # Descarta los buckets sin uso reciente (estaban llenos o casi)
+                self._buckets.popitem(last=False)
+            return result
+
+
+class SharedBuckets:  # Buckets en el estado compartido (un solo limite para todos los workers)
+    def __init__(self) -> None:
+        self._script: Any = None  # Script Lua registrado (solo con Redis real)
+
+    def take(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        client = get_shared_state()
+        ttl = int(limit.period) + 1  # Pasado un periodo el bucket esta lleno: basta con olvidarlo
+        now = time.time()  # Reloj de pared: comun a todos los procesos
+        if hasattr(client, "update"):  # FakeRedis y FileRedis
+            return client.update(key, lambda raw: _take(raw, limit, now), ex=ttl)
+        if self._script is None:
+            self._script = client.register_script(_TAKE_SCRIPT)
+        allowed, tokens = self._script(keys=[key], args=[limit.capacity, limit.rate, now, ttl])
+        return bool(allowed), float(tokens)
+
+
+class RateLimiter:  # Punto de entrada de las rutas
+    """Aplica los limites con el almacen de RATE_LIMIT_BACKEND y cuenta las peticiones admitidas y rechazadas"""
+
+    def __init__(self, backend: str) -> None:
+        self.backend = backend
+        self.buckets: Any = {"memory": MemoryBuckets(RATE_LIMIT_MAX_KEYS), "shared": SharedBuckets()}.get(backend)
+        if self.buckets is None and backend != "none":
+            raise ValueError(f"RATE_LIMIT_BACKEND desconocido: {backend}")
+        self._lock = threading.Lock()
+        self.counts: Dict[Tuple[str, str], int] = {}  # (limite, resultado) -> peticiones
+
+    def _count(self, limit: RateLimit, result: str) -> None:
+        with self._lock:
+            self.counts[(limit.name, result)] = self.counts.get((limit.name, result), 0) + 1
+
+    def hit(self, limit: RateLimit, key: str) -> None:  # Consume un token o lanza 429
+        """Consume un token del bucket `key` del limite; sin tokens responde 429 con Retry-After"""
+        if self.buckets is None or not limit.capacity:
+            return
+        allowed, tokens = self.buckets.take(f"ratelimit:{limit.name}:{key}", limit)
+        if allowed:
+            self._count(limit, "allowed")
+            return
+        self._count(limit, "rejected")
+        retry_after = max(1, int((1 - tokens) / limit.rate + 0.999))  # Segundos hasta el siguiente token
+        raise HTTPException(
+            status_code=429,
+            detail="Demasiadas peticiones, intenta mas tarde",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    async def ahit(self, limit: RateLimit, key: str) -> None:  # Version para codigo async (modo async)
+        """hit fuera del event loop cuando los buckets estan en el estado compartido (file o redis bloquean)"""
+        if self.backend == "shared":
+            await run_shared(self.hit, limit, key)
+        else:  # En memoria o sin limite: no hay I/O
+            self.hit(limit, key)
+
+    def metrics(self) -> List[str]:  # Lineas Prometheus para /metrics
+        lines = ["# HELP api_rate_limit_requests_total Peticiones evaluadas por cada limite segun el resultado",
+                 "# TYPE api_rate_limit_requests_total counter"]
+        with self._lock:
+            lines += [f'api_rate_limit_requests_total{{limit="{name}",result="{result}"}} {count}'
+                      for (name, result), count in sorted(self.counts.items())]
+        if isinstance(self.buckets, MemoryBuckets):
+            lines += ["# HELP api_rate_limit_buckets Buckets activos en memoria", "# TYPE api_rate_limit_buckets gauge",
+                      f"api_rate_limit_buckets {len(self.buckets._buckets)}"]
+        return lines
+
+
+rate_limiter = RateLimiter(RATE_LIMIT_BACKEND)  # Limitador del proceso
+registry.register_collector(rate_limiter.metrics)
+
+
+def client_ip(request: Request) -> str:  # IP del cliente (la del proxy si uvicorn no recibe X-Forwarded-For)
+    return request.client.host if request.client else "unknown"
+
+
+def check_login(request: Request, username: str) -> None:  # Antes de consultar la BD y de ejecutar bcrypt
+    """Aplica los limites de login por IP y por username"""
+    rate_limiter.hit(LOGIN_IP, client_ip(request))
+    rate_limiter.hit(LOGIN_USER, username.lower())
+
+
+def check_register(request: Request) -> None:  # Antes de hashear la contraseña
+    rate_limiter.hit(REGISTER_IP, client_ip(request))
+
+
+async def acheck_login(request: Request, username: str) -> None:  # check_login desde las rutas async
+    await rate_limiter.ahit(LOGIN_IP, client_ip(request))
+    await rate_limiter.ahit(LOGIN_USER, username.lower())
+
+
+async def acheck_register(request: Request) -> None:  # check_register desde las rutas async
+    await rate_limiter.ahit(REGISTER_IP, client_ip(request))
+
+
+def rate_limited_user(current_user: Principal = Depends(get_current_user)) -> Principal:  # Rutas de escritura (sync)
+    """get_current_user con el limite de escrituras por usuario (def: FastAPI la ejecuta en el threadpool)"""
+    rate_limiter.hit(WRITE_USER, str(current_user.id))
+    return current_user
+
+
+async def rate_limited_user_async(current_user: Principal = Depends(get_current_user_async)) -> Principal:  # Modo async
+    """Version asincrona de rate_limited_user"""
+    await rate_limiter.ahit(WRITE_USER, str(current_user.id))
+    return current_user
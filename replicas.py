@@ -0,0 +1,192 @@
+import itertools  # Contador round-robin
+import os  # Lectura de variables de entorno
+import threading  # Bloqueo para engines y contadores
+import time  # Reloj de las replicas caidas
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Iterable, List, Optional  # Tipado
+
+from fastapi import Request  # Peticion (cliente y estado)
+from sqlalchemy.engine import make_url  # Oculta la contraseña de las URL
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession  # Engines y sesiones asincronas
+from sqlalchemy.orm import Session  # Sesion de SQLAlchemy
+from starlette.types import ASGIApp, Message, Receive, Scope, Send  # Tipos ASGI
+
+from database import (
+    DB_MODE, AsyncSessionLocal, SessionLocal, build_async_engine, build_engine, describe_pool, to_async_url,
+)  # Fabricas de engines y sesiones con RoutingSession
+from metrics import registry  # Metricas de enrutamiento en /metrics
+from shared_state import get_shared_state, run_shared  # Ventana de read-your-writes comun a todos los workers
+
+# Configuración de las replicas de lectura (leer de variables de entorno)
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]  # Vacio = sin replicas
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))  # Segundos que un cliente lee del primario tras escribir
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))  # Segundos fuera de rotacion tras un fallo de conexion
+
+_RECENT_WRITE_KEY = "replica:recent_write"  # Existe mientras dure la ventana de la ultima escritura de cualquier cliente
+_UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})  # Metodos que pueden escribir
+_READ_ONLY_PATHS = frozenset({"/tasks/lookup"})  # POST de solo lectura: no abren la ventana de read-your-writes
+
+
+def _client_key(host: str) -> str:  # Clave de read-your-writes de un cliente (por IP)
+    return f"replica:sticky:{host}"
+
+
+def mark_write(host: str) -> None:  # Llamar cuando un cliente escribe
+    """Abre la ventana de read-your-writes del cliente y la ventana global de escrituras recientes"""
+    state = get_shared_state()
+    state.set(_RECENT_WRITE_KEY, 1, ex=REPLICA_STICKY_SECONDS)
+    state.set(_client_key(host), 1, ex=REPLICA_STICKY_SECONDS)
+
+
+class Replica:  # Una replica con su engine perezoso y su estado de salud
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.engine: Any = None  # Engine o AsyncEngine (se crea en el primer uso)
+        self.down_until = 0.0  # Fuera de rotacion hasta este instante (monotonic)
+        self.failures = 0  # Fallos de conexion observados
+
+    @property
+    def bind(self) -> Any:  # Engine sincrono que usa RoutingSession
+        return getattr(self.engine, "sync_engine", self.engine)
+
+
+class ReplicaPool:  # Replicas de lectura con round-robin y salud pasiva
+    """Elige replica por round-robin, saltando las caidas; una replica vuelve a rotacion pasado REPLICA_RETRY_SECONDS"""
+
+    def __init__(self, urls: Iterable[str], factory: Callable[[str], Any]) -> None:
+        self.replicas: List[Replica] = [Replica(url) for url in urls]
+        self._factory = factory  # build_engine o build_async_engine
+        self._lock = threading.Lock()
+        self._counter = itertools.count()  # Turno del round-robin
+        self.routed: Dict[str, int] = {"replica": 0, "primary_sticky": 0, "primary_unavailable": 0}  # Lecturas por destino
+        self.failovers = 0  # Sesiones que pasaron al primario porque la replica fallo
+
+    def _count(self, target: str) -> None:
+        with self._lock:
+            self.routed[target] += 1
+
+    def choose(self) -> Optional[Replica]:  # Siguiente replica en rotacion (None si todas estan caidas)
+        now = time.monotonic()
+        start = next(self._counter)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.down_until <= now:  # Pasado el plazo vuelve a probarse (pre-ping al conectar)
+                if replica.engine is None:
+                    with self._lock:
+                        if replica.engine is None:
+                            replica.engine = self._factory(replica.url)
+                return replica
+        return None
+
+    def mark_down(self, bind: Any) -> None:  # RoutingSession no pudo conectar con la replica
+        with self._lock:
+            self.failovers += 1
+            for replica in self.replicas:
+                if replica.engine is not None and replica.bind is bind:
+                    replica.failures += 1
+                    replica.down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+
+    def route(self, db: Session, request: Request) -> None:  # Decide de donde lee la sesion
+        """Asigna una replica a la sesion salvo que el cliente haya escrito dentro de REPLICA_STICKY_SECONDS"""
+        if not self.replicas:
+            return
+        state = get_shared_state()
+        recent_write = state.get(_RECENT_WRITE_KEY) is not None  # Una sola lectura si nadie escribio hace poco
+        if recent_write and request.client and state.get(_client_key(request.client.host)) is not None:
+            self._count("primary_sticky")  # Read-your-writes: este cliente escribio hace poco
+            return
+        replica = self.choose()
+        if replica is None:
+            self._count("primary_unavailable")
+            return
+        self._count("replica")
+        db.info["replica"] = replica.bind
+        db.info["on_replica_error"] = self.mark_down
+        if recent_write:  # La replica puede no tener aun la ultima escritura: no se guarda en los caches
+            db.info["cache_store"] = False
+            request.state.cache_store = False
+
+    def stats(self) -> Dict[str, Any]:  # Estado de cada replica y lecturas enrutadas
+        now = time.monotonic()
+        with self._lock:
+            routed, failovers = dict(self.routed), self.failovers
+        return {
+            "sticky_seconds": REPLICA_STICKY_SECONDS,
+            "routed": routed,
+            "failovers": failovers,
+            "replicas": [
+                {
+                    "url": make_url(replica.url).render_as_string(hide_password=True),
+                    "healthy": replica.down_until <= now,
+                    "failures": replica.failures,
+                    "pool": describe_pool(replica.bind.pool) if replica.engine is not None else None,
+                }
+                for replica in self.replicas
+            ],
+        }
+
+    def metrics(self) -> List[str]:  # Lineas Prometheus para /metrics
+        now = time.monotonic()
+        lines = ["# HELP api_db_replica_up Replica en rotacion (1) o fuera por fallos de conexion (0)",
+                 "# TYPE api_db_replica_up gauge"]
+        lines += [f'api_db_replica_up{{replica="{index}"}} {int(replica.down_until <= now)}'
+                  for index, replica in enumerate(self.replicas)]
+        lines += ["# HELP api_db_read_routing_total Lecturas segun su destino (replica o primario)",
+                  "# TYPE api_db_read_routing_total counter"]
+        with self._lock:
+            lines += [f'api_db_read_routing_total{{target="{target}"}} {count}' for target, count in self.routed.items()]
+            lines.append(f'api_db_read_routing_total{{target="failover"}} {self.failovers}')
+        return lines
+
+    async def dispose(self) -> None:  # Cierra los pools de las replicas creadas
+        for replica in self.replicas:
+            if isinstance(replica.engine, AsyncEngine):
+                await replica.engine.dispose()
+            elif replica.engine is not None:
+                replica.engine.dispose()
+
+
+read_replicas = ReplicaPool(DATABASE_REPLICA_URLS, build_engine)  # Modo sync
+async_read_replicas = ReplicaPool((to_async_url(url) for url in DATABASE_REPLICA_URLS), build_async_engine)  # Modo async
+active_replicas = async_read_replicas if DB_MODE == "async" else read_replicas  # El del modo en uso (metricas y /admin)
+if DATABASE_REPLICA_URLS:
+    registry.register_collector(active_replicas.metrics)
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:  # Dependencia de las rutas de solo lectura
+    """Sesion que lee de una replica (o del primario si el cliente acaba de escribir)"""
+    db = SessionLocal()
+    try:
+        read_replicas.route(db, request)
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:  # Version asincrona
+    """Version asincrona de get_read_db"""
+    async with AsyncSessionLocal() as db:
+        if async_read_replicas.replicas:  # route() lee el estado compartido: fuera del event loop si bloquea
+            await run_shared(async_read_replicas.route, db.sync_session, request)
+        yield db
+
+
+class ReplicaStickinessMiddleware:  # Middleware ASGI: marca a los clientes que escriben
+    """Tras una respuesta correcta a POST/PUT/PATCH/DELETE, el cliente lee del primario durante REPLICA_STICKY_SECONDS"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            not DATABASE_REPLICA_URLS or scope["type"] != "http" or scope["method"] not in _UNSAFE_METHODS
+            or scope["path"] in _READ_ONLY_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_marking(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400 and scope.get("client"):
+                await run_shared(mark_write, scope["client"][0])  # Antes de que el cliente reciba la respuesta
+            await send(message)
+
+        await self.app(scope, receive, send_marking)
@@ -1,14 +1,9 @@
 from datetime import datetime  # Marca de tiempo de creacion/actualizacion
-from enum import Enum  # Enum base de Python
-from typing import List, Optional  # Tipado opcional para campos no requeridos y listas
+from typing import List, Literal, Optional  # Tipado opcional para campos no requeridos, listas y literales
 
 from pydantic import BaseModel, ConfigDict, constr  # Base, configuracion y restricciones de campos
 
-
-class TaskStatus(str, Enum):  # Estados posibles de una tarea
-    pending = "pending"  # Tarea creada pero no iniciada
-    in_progress = "in_progress"  # Tarea en curso
-    done = "done"  # Tarea finalizada
+from model import TaskStatus  # Enum unico de estados (el mismo que usa la columna del ORM)
 
 
 class TaskBase(BaseModel):  # Campos compartidos entre creacion y lectura
@@ -24,6 +19,7 @@ class TaskCreate(TaskBase):  # Esquema para crear tareas
 class TaskRead(TaskBase):  # Esquema para leer tareas
     id: int  # Identificador de la tarea
     created_at: datetime  # Fecha/hora asignada por la BD
+    version: int  # Version actual (el ETag de GET /tasks/{id} es "v<version>")
 
     model_config = ConfigDict(from_attributes=True)  # Permite leer desde objetos ORM en Pydantic v2
 
@@ -34,12 +30,55 @@ class TaskUpdate(BaseModel):  # Esquema para actualizar tareas parcialmente
     status: Optional[TaskStatus] = None  # Estado opcional para actualizar
 
 
+class TaskBulkUpdateItem(TaskUpdate):  # Elemento de una actualizacion masiva
+    id: int  # ID de la tarea a actualizar
+
+
+class TaskBulkDelete(BaseModel):  # Cuerpo de una eliminacion masiva
+    ids: List[int]  # IDs de las tareas a eliminar
+
+
+class BulkTaskResult(BaseModel):  # Resultado de un elemento de una operacion masiva
+    index: int  # Posicion del elemento en la peticion
+    id: Optional[int] = None  # ID de la tarea afectada
+    status: Literal["created", "updated", "deleted", "not_found"]  # Resultado de la operacion
+    task: Optional[TaskRead] = None  # Tarea resultante (None en eliminaciones y no encontradas)
+
+
+class BulkTaskResponse(BaseModel):  # Respuesta de una operacion masiva
+    results: List[BulkTaskResult]  # Un resultado por elemento, en el mismo orden de la peticion
+
+
 class PaginatedTaskResponse(BaseModel):  # Esquema de respuesta paginada
     items: List[TaskRead]  # Lista de tareas en la pagina actual
-    total: int  # Total de tareas en la BD
+    total: Optional[int]  # Total de tareas en la BD (None si se pidio include_total=false)
     page: int  # Numero de pagina actual
     page_size: int  # Cantidad de items por pagina
-    total_pages: int  # Total de paginas disponibles
+    total_pages: Optional[int]  # Total de paginas disponibles (None si no se calculo el total)
+    total_strategy: str = "exact"  # Estrategia que produjo el total: exact | cached | estimated | none
+
+
+class CursorPaginatedTaskResponse(BaseModel):  # Esquema de respuesta paginada por cursor (keyset)
+    items: List[TaskRead]  # Lista de tareas de la pagina actual
+    page_size: int  # Cantidad maxima de items por pagina
+    next_cursor: Optional[str] = None  # Cursor opaco para pedir la siguiente pagina (None si no hay mas)
+
+
+class TaskLookup(BaseModel):  # Cuerpo de POST /tasks/lookup
+    ids: List[int]  # IDs a leer (limite BULK_MAX_ITEMS)
+    include_archived: bool = False  # Busca tambien en task_archive las que no esten en task
+
+
+class TaskLookupResponse(BaseModel):  # Respuesta de GET /tasks?ids= y POST /tasks/lookup
+    items: List[TaskRead]  # Tareas encontradas en el orden pedido (sin repetir)
+    missing: List[int]  # IDs que no existen
+
+
+class TaskStats(BaseModel):  # Esquema de GET /tasks/stats (conteo materializado por estado)
+    pending: int  # Tareas pendientes
+    in_progress: int  # Tareas en curso
+    done: int  # Tareas finalizadas (sin contar las archivadas)
+    total: int  # Suma de los tres estados
 
 
 # Schemas de autenticación
@@ -0,0 +1,48 @@
+from dataclasses import dataclass  # DTO ligero de lectura
+from datetime import datetime  # Tipo de created_at
+from typing import Any, List, Optional, Sequence  # Tipado
+
+from pydantic_core import to_json  # Serializador de pydantic (siempre disponible)
+from sqlalchemy import Row, Select, select  # Filas Core sin identity map
+
+from model import Task, TaskStatus  # Modelo de tareas y estados
+
+try:  # Dependencia opcional: pip install orjson
+    import orjson
+except ImportError:  # Sin orjson se usa pydantic_core.to_json
+    orjson = None
+
+# Columnas de TaskRead en el mismo orden que su JSON (campos heredados de TaskBase primero)
+TASK_READ_FIELDS = ("title", "description", "status", "id", "created_at", "version")
+TASK_READ_COLUMNS = tuple(getattr(Task, field) for field in TASK_READ_FIELDS)
+
+
+def select_task_rows(source: Any = Task) -> Select:  # SELECT de solo las columnas de TaskRead
+    """Consulta de tareas como filas Core, sin hidratar objetos ORM (source: Task, TaskArchive o columnas de un subquery)"""
+    if source is Task:
+        return select(*TASK_READ_COLUMNS)
+    return select(*(getattr(source, field) for field in TASK_READ_FIELDS))
+
+
+@dataclass(slots=True)
+class TaskRow:  # DTO de lectura: sin __dict__ ni estado del ORM (menos memoria por tarea en listados grandes)
+    title: str  # Mismo orden de campos que TaskRead: orjson/pydantic_core los serializan en este orden
+    description: Optional[str]
+    status: TaskStatus
+    id: int
+    created_at: datetime
+    version: int
+
+
+def task_rows(rows: Sequence[Row]) -> List[TaskRow]:  # Filas Core -> DTOs con la forma de TaskRead
+    return [TaskRow(*row) for row in rows]
+
+
+def dumps(data: Any) -> bytes:  # JSON en bytes (enums por valor, fechas ISO 8601)
+    """Serializa con orjson si esta instalado o con pydantic_core en otro caso"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return to_json(data)
+
+
+JSON_BACKEND = "orjson" if orjson is not None else "pydantic_core"  # Serializador activo
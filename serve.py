@@ -0,0 +1,179 @@
+"""Arranque de produccion: varios workers de uvicorn con la app precargada antes del fork
+
+Uso:
+    python serve.py                       # WEB_CONCURRENCY workers (por defecto, uno por nucleo)
+    python serve.py --workers 4 --host 0.0.0.0 --port 8000
+
+El proceso principal importa la app una sola vez, abre el socket y hace fork de cada worker;
+los workers comparten el socket y abren su propio pool de conexiones al arrancar.
+Señales del proceso principal: TERM/INT apagan con gracia, TTIN agrega un worker y TTOU retira uno.
+"""
+import argparse  # Argumentos de linea de comandos
+import os  # fork, señales y variables de entorno
+import signal  # Control de los workers
+import socket  # Socket compartido por los workers
+import sys  # Codigo de salida
+import time  # Espera del bucle de supervision
+from typing import Dict, List, Set  # Tipado
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0")) or (os.cpu_count() or 1)  # Workers por defecto: uno por nucleo
+WORKER_BOOT_FAILURE = 3  # Codigo de salida de un worker que no pudo arrancar (corta el bucle de reinicios)
+
+
+def configure_environment(workers: int) -> None:  # Antes de importar la app: los modulos leen el entorno al importarse
+    """Ajusta los valores por defecto para varios workers sin pisar lo que ya este definido"""
+    os.environ.setdefault("DB_POOL_WARMUP", "true")  # Cada worker abre su pool antes de recibir trafico
+    if workers > 1:  # El estado en memoria de un worker no lo ven los demas
+        os.environ.setdefault("SHARED_STATE_BACKEND", "file")  # Generaciones de cache y conteo comunes
+        os.environ.setdefault("TASK_CACHE_BACKEND", "shared")  # Una escritura invalida el cache de todos los workers
+        os.environ.setdefault("RATE_LIMIT_BACKEND", "shared")  # Un limite comun, no uno por worker
+        os.environ.setdefault("CHANGES_BACKEND", "shared")  # El feed de cada worker ve los cambios de los demas
+        os.environ.setdefault("HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // (2 * workers))))  # Reparte bcrypt
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:  # Socket que heredan todos los workers
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Supervisor:  # Proceso principal: crea, vigila y reemplaza workers
+    """Mantiene el numero de workers pedido, con reinicio de los que mueren y escalado por señales"""
+
+    def __init__(self, app, sock: socket.socket, workers: int, args: argparse.Namespace) -> None:
+        self.app = app  # App ya importada: los workers la heredan sin volver a importarla
+        self.sock = sock
+        self.target = workers  # Workers que deben estar vivos
+        self.args = args
+        self.children: Dict[int, float] = {}  # pid -> instante de arranque
+        self.retiring: Set[int] = set()  # Workers a los que ya se pidio terminar al reducir
+        self.stopping = False
+        self.exit_code = 0
+        self._signals: List[int] = []  # Señales pendientes de atender en el bucle
+
+    def spawn(self) -> None:  # Crea un worker con fork
+        pid = os.fork()
+        if pid == 0:
+            for sig in (signal.SIGTTIN, signal.SIGTTOU):
+                signal.signal(sig, signal.SIG_DFL)
+            for sig in (signal.SIGTERM, signal.SIGINT):  # uvicorn los atiende mientras sirve y luego los relanza:
+                signal.signal(sig, signal.SIG_IGN)  # ignorarlos al final deja salir al worker normalmente
+            self.run_worker()
+        self.children[pid] = time.monotonic()
+
+    def run_worker(self) -> None:  # Cuerpo del worker (termina el proceso)
+        import uvicorn  # Solo hace falta en los workers
+
+        config = uvicorn.Config(
+            self.app,
+            log_level=self.args.log_level,
+            backlog=self.args.backlog,
+            timeout_keep_alive=self.args.keep_alive,
+            timeout_graceful_shutdown=self.args.graceful_timeout,
+            proxy_headers=True,
+        )
+        server = uvicorn.Server(config)
+        server.run(sockets=[self.sock])
+        sys.exit(0 if server.started else WORKER_BOOT_FAILURE)  # Salida normal: libera los recursos del pool de hashing
+
+    def _on_signal(self, sig: int, frame) -> None:  # Solo encola: el trabajo se hace en el bucle
+        self._signals.append(sig)
+
+    def _handle_signals(self) -> None:
+        while self._signals:
+            sig = self._signals.pop(0)
+            if sig in (signal.SIGTERM, signal.SIGINT):
+                self.stopping = True
+            elif sig == signal.SIGTTIN:
+                self.target += 1
+                print(f"[serve] Escalando a {self.target} workers", flush=True)
+            elif sig == signal.SIGTTOU and self.target > 1:
+                self.target -= 1
+                active = [pid for pid in self.children if pid not in self.retiring]
+                oldest = min(active, key=self.children.get)  # Retira el mas antiguo con apagado gradual
+                self.retiring.add(oldest)
+                os.kill(oldest, signal.SIGTERM)
+                print(f"[serve] Reduciendo a {self.target} workers", flush=True)
+
+    def _reap(self) -> None:  # Recoge los workers terminados
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.children.pop(pid, None)
+            if pid in self.retiring:  # Terminacion pedida por TTOU
+                self.retiring.discard(pid)
+                continue
+            if os.waitstatus_to_exitcode(status) == WORKER_BOOT_FAILURE and not self.stopping:
+                print(f"[serve] El worker {pid} no pudo arrancar; deteniendo", flush=True)
+                self.exit_code = WORKER_BOOT_FAILURE
+                self.stopping = True
+            elif not self.stopping:
+                print(f"[serve] Worker {pid} terminado ({os.waitstatus_to_exitcode(status)})", flush=True)
+
+    def run(self) -> int:  # Bucle de supervision
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGTTIN, signal.SIGTTOU):
+            signal.signal(sig, self._on_signal)
+        while not self.stopping:
+            self._handle_signals()
+            self._reap()
+            while not self.stopping and len(self.children) - len(self.retiring) < self.target:
+                self.spawn()
+            time.sleep(0.2)
+        self.shutdown()
+        return self.exit_code
+
+    def shutdown(self) -> None:  # Apagado gradual: TERM, espera y KILL a los que no terminen
+        for pid in self.children:
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self.children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in self.children:
+            os.kill(pid, signal.SIGKILL)
+        self.sock.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Servidor de produccion con varios workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY, help="Workers (defecto WEB_CONCURRENCY o nucleos)")
+    parser.add_argument("--backlog", type=int, default=2048, help="Conexiones pendientes del socket compartido")
+    parser.add_argument("--keep-alive", type=int, default=5, help="Segundos de keep-alive HTTP")
+    parser.add_argument("--graceful-timeout", type=int, default=30, help="Segundos para terminar las peticiones en curso")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    configure_environment(args.workers)
+    from main import app  # Precarga: se importa una vez, antes del fork
+    from database import DB_MAX_OVERFLOW, DB_POOL_SIZE, get_engine
+    from health import DB_CREATE_ALL, create_schema
+
+    if DB_CREATE_ALL:  # Una sola vez aqui: los workers ya encuentran las tablas
+        create_schema(get_engine())
+        get_engine().dispose()  # Ninguna conexion abierta debe cruzar el fork
+
+    if args.workers <= 1 or not hasattr(os, "fork"):  # Un solo proceso (o Windows, sin fork)
+        import uvicorn
+
+        uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level, backlog=args.backlog,
+                    timeout_keep_alive=args.keep_alive, timeout_graceful_shutdown=args.graceful_timeout)
+        return 0
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+    print(f"[serve] {args.workers} workers en http://{args.host}:{args.port} (pid {os.getpid()}); "
+          f"hasta {args.workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)} conexiones a la BD", flush=True)
+    return Supervisor(app, sock, args.workers, args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
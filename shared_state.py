@@ -0,0 +1,197 @@
+import os  # Lectura de variables de entorno
+import sqlite3  # Almacen en archivo compartido por los workers
+import tempfile  # Ruta por defecto del archivo compartido
+import threading  # Bloqueos y conexiones por hilo
+import time  # Reloj para los TTL
+from typing import Any, Callable, Dict, Optional, Tuple  # Tipado
+
+from starlette.concurrency import run_in_threadpool  # Llamadas bloqueantes fuera del event loop
+
+# Configuración del estado compartido entre workers (leer de variables de entorno)
+SHARED_STATE_BACKEND = os.getenv("SHARED_STATE_BACKEND", "local")  # local | file | redis
+SHARED_STATE_PATH = os.getenv(
+    "SHARED_STATE_PATH", os.path.join(tempfile.gettempdir(), "api_shared_state.db")
+)  # Archivo del backend file (debe ser el mismo para todos los workers)
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")  # Servidor Redis para el backend redis
+
+_PURGE_EVERY = 1000  # Escrituras entre limpiezas de claves vencidas en el backend file
+
+# Lectura-modificacion-escritura atomica: recibe el valor actual (o None) y retorna (valor nuevo, resultado)
+Updater = Callable[[Optional[bytes]], Tuple[bytes, Any]]
+
+
+def _to_bytes(value: Any) -> bytes:  # Redis guarda bytes
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class FakeRedis:  # Sustituto local de redis.Redis con el subconjunto de comandos usado
+    """Cliente Redis falso en memoria para desarrollo y pruebas sin servidor (no se comparte entre procesos)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}  # clave -> (valor, expira)
+
+    def _alive(self, key: str) -> Optional[bytes]:  # Valor si no expiro (llamar con el bloqueo tomado)
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._alive(key)
+
+    def set(self, key: str, value, ex: Optional[int] = None) -> bool:
+        with self._lock:
+            self._data[key] = (_to_bytes(value), time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            value = int(self._alive(key) or 0) + amount
+            expires_at = self._data.get(key, (None, None))[1]  # INCR conserva el TTL existente
+            self._data[key] = (str(value).encode(), expires_at)
+            return value
+
+    def update(self, key: str, updater: Updater, ex: Optional[int] = None) -> Any:  # Sin equivalente en redis-py (alli: Lua)
+        """Aplica updater al valor actual de forma atomica y guarda el resultado con el TTL indicado"""
+        with self._lock:
+            value, result = updater(self._alive(key))
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+            return result
+
+
+class FileRedis:  # Mismo subconjunto de redis.Redis sobre un archivo SQLite
+    """Cliente con la interfaz de redis-py guardado en un archivo, compartido por los workers de una maquina"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path  # Archivo SQLite (modo WAL: lectores concurrentes, un escritor a la vez)
+        self._local = threading.local()  # Una conexion por hilo
+        self._writes = 0  # Escrituras desde la ultima limpieza
+
+    def _conn(self) -> sqlite3.Connection:  # Conexion del hilo actual (se reabre tras un fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)  # Autocommit salvo BEGIN explicito
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # Estado reconstruible: no hace falta fsync por escritura
+            conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _written(self, conn: sqlite3.Connection) -> None:  # Borra de vez en cuando las claves vencidas
+        self._writes += 1
+        if self._writes >= _PURGE_EVERY:
+            self._writes = 0
+            conn.execute("DELETE FROM kv WHERE expires_at <= ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value, ex: Optional[int] = None) -> bool:
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, _to_bytes(value), time.time() + ex if ex else None),  # Reloj de pared: comun a todos los procesos
+        )
+        self._written(conn)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        if not keys:
+            return 0
+        placeholders = ",".join("?" * len(keys))
+        return self._conn().execute(f"DELETE FROM kv WHERE key IN ({placeholders})", keys).rowcount
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")  # Toma el bloqueo de escritura antes de leer: incremento atomico
+        try:
+            row = conn.execute("SELECT value, expires_at FROM kv WHERE key = ?", (key,)).fetchone()
+            current, expires_at = (0, None) if row is None else (int(row[0]), row[1])
+            if expires_at is not None and expires_at <= time.time():  # Vencida: empieza de cero sin TTL
+                current, expires_at = 0, None
+            value = current + amount
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, str(value).encode(), expires_at),  # INCR conserva el TTL existente
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._written(conn)
+        return value
+
+    def update(self, key: str, updater: Updater, ex: Optional[int] = None) -> Any:  # Como FakeRedis.update
+        """Aplica updater al valor actual dentro de una transaccion de escritura"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute(
+                "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, now)
+            ).fetchone()
+            value, result = updater(row[0] if row else None)
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ex if ex else None),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._written(conn)
+        return result
+
+
+def build_shared_client(name: str = SHARED_STATE_BACKEND) -> Any:  # Crea el cliente configurado
+    """Crea el cliente de estado compartido indicado por SHARED_STATE_BACKEND"""
+    if name == "local":
+        return FakeRedis()
+    if name == "file":
+        return FileRedis(SHARED_STATE_PATH)
+    if name == "redis":
+        try:
+            import redis  # Dependencia opcional: pip install redis
+        except ImportError:
+            raise RuntimeError("SHARED_STATE_BACKEND=redis requiere el paquete 'redis' (pip install redis)")
+        return redis.Redis.from_url(REDIS_URL)
+    raise ValueError(f"Backend de estado compartido desconocido: {name}")
+
+
+_client_lock = threading.Lock()
+_client: Optional[Any] = None  # Cliente compartido (se crea en el primer uso, no al importar)
+
+
+def get_shared_state() -> Any:  # Cliente de estado compartido del proceso
+    """Retorna el cliente de estado compartido (get/set/delete/incr de redis-py), creandolo en la primera llamada"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = build_shared_client()
+    return _client
+
+
+async def run_shared(func: Callable[..., Any], *args: Any, blocking: Optional[bool] = None) -> Any:  # Desde codigo async
+    """Ejecuta func (que usa el estado compartido) en el threadpool si el backend bloquea (file, redis)
+
+    blocking indica si func hace I/O cuando usa otro almacen (p. ej. el backend del cache); None = SHARED_STATE_BACKEND.
+    """
+    if blocking is None:
+        blocking = SHARED_STATE_BACKEND != "local"  # FakeRedis en memoria: no hay I/O
+    if not blocking:  # No vale la pena saltar de hilo
+        return func(*args)
+    return await run_in_threadpool(func, *args)  # FileRedis espera el bloqueo hasta 5 s; redis-py, la red
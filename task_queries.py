@@ -0,0 +1,103 @@
+from dataclasses import dataclass  # Contenedor inmutable de filtros
+from datetime import datetime  # Rango de fechas
+from typing import Any, List, Literal, Optional, Tuple  # Tipado
+
+from fastapi import HTTPException  # Errores HTTP
+from sqlalchemy import ColumnElement, Select, or_, select, union_all  # Expresiones y consultas SQL
+from sqlalchemy.dialects.mysql import match  # MATCH ... AGAINST de MySQL
+
+from model import Task, TaskArchive  # Tareas activas y archivadas
+from schemas import TaskStatus  # Estados validos
+from serialization import select_task_rows  # Columnas de TaskRead
+
+# Ordenamientos permitidos en GET /tasks ("-" indica descendente)
+TaskSort = Literal["id", "-id", "created_at", "-created_at", "title", "-title", "status", "-status"]
+
+_SORT_COLUMNS = ("id", "created_at", "title", "status")  # Columnas ordenables (lista blanca)
+
+
+def _like_pattern(text: str) -> str:  # Escapa comodines de LIKE
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+@dataclass(frozen=True)
+class TaskFilters:  # Filtros comunes a listado, conteo y exportacion
+    status: Optional[TaskStatus] = None  # Estado exacto (indice ix_task_status_created_at)
+    created_from: Optional[datetime] = None  # created_at >= created_from
+    created_to: Optional[datetime] = None  # created_at < created_to
+    q: Optional[str] = None  # Texto a buscar en titulo y descripcion
+    include_archived: bool = False  # Incluye tambien las tareas de task_archive
+
+    @property
+    def is_empty(self) -> bool:  # Sin ningun filtro activo
+        return self.status is None and self.created_from is None and self.created_to is None and not self.q
+
+    def key(self) -> Tuple:  # Clave hashable para caches de conteo
+        return (self.status, self.created_from, self.created_to, self.q, self.include_archived)
+
+    def clauses(self, dialect_name: str, source: Any = Task) -> List[ColumnElement]:  # Condiciones WHERE segun el motor
+        """Traduce los filtros a condiciones SQL para el dialecto indicado (sobre Task o TaskArchive)"""
+        clauses: List[ColumnElement] = []
+        if self.status is not None:
+            clauses.append(source.status == self.status)
+        if self.created_from is not None:
+            clauses.append(source.created_at >= self.created_from)
+        if self.created_to is not None:
+            clauses.append(source.created_at < self.created_to)
+        if self.q:
+            if dialect_name == "mysql":  # Usa el indice FULLTEXT de titulo y descripcion
+                clauses.append(match(source.title, source.description, against=self.q).in_natural_language_mode())
+            else:  # SQLite y otros: LIKE sin indice
+                pattern = _like_pattern(self.q)
+                clauses.append(or_(source.title.ilike(pattern, escape="\\"), source.description.ilike(pattern, escape="\\")))
+        return clauses
+
+
+def task_order_by(sort: str, source: Any = Task) -> List[ColumnElement]:  # ORDER BY con desempate por id
+    """Traduce un valor de la lista blanca de ordenamientos a columnas ORDER BY"""
+    descending = sort.startswith("-")
+    name = sort.lstrip("-")
+    if name not in _SORT_COLUMNS:
+        raise KeyError(sort)
+    column = getattr(source, name)
+    if name == "id":
+        return [column.desc() if descending else column.asc()]
+    return [column.desc() if descending else column.asc(), source.id.desc() if descending else source.id.asc()]
+
+
+def keyset_clause(sort: str, last_id: Optional[int], source: Any = Task) -> Optional[ColumnElement]:  # WHERE del cursor
+    """Condicion para continuar despues del ultimo id entregado (solo orden por id)"""
+    if sort not in ("id", "-id"):
+        raise HTTPException(status_code=400, detail="La paginacion por cursor solo admite sort=id o sort=-id")
+    if last_id is None:
+        return None
+    return source.id < last_id if sort == "-id" else source.id > last_id
+
+
+def task_page_select(  # SELECT de una pagina del listado
+    filters: TaskFilters, dialect_name: str, sort: str, limit: int, offset: int = 0,
+    keyset: bool = False, last_id: Optional[int] = None,
+) -> Select:
+    """Pagina filtrada y ordenada; con include_archived une task y task_archive (UNION ALL)
+
+    Cada tabla aporta como mucho offset + limit filas ya ordenadas y el resultado se mezcla fuera,
+    asi el motor no materializa el archivo completo para servir una pagina.
+    """
+    def page(source: Any, window: int) -> Select:  # Misma pagina sobre una sola tabla
+        stmt = select_task_rows(source).where(*filters.clauses(dialect_name, source))
+        if keyset:
+            after = keyset_clause(sort, last_id, source)  # id > ultimo (o < si sort=-id)
+            if after is not None:
+                stmt = stmt.where(after)  # Busqueda por rango sobre el indice primario
+        return stmt.order_by(*task_order_by(sort, source)).limit(window)
+
+    if not filters.include_archived:
+        stmt = page(Task, limit)
+        return stmt if keyset else stmt.offset(offset)
+    window = limit if keyset else offset + limit  # Filas que puede necesitar la pagina de cada tabla
+    rows = union_all(  # Cada rama como subquery: SQLite no admite ORDER BY/LIMIT dentro de un UNION
+        select(page(Task, window).subquery()), select(page(TaskArchive, window).subquery())
+    ).subquery("tasks")
+    stmt = select_task_rows(rows.c).order_by(*task_order_by(sort, rows.c)).limit(limit)
+    return stmt if keyset else stmt.offset(offset)
@@ -0,0 +1,186 @@
+"""Consultas y respuestas de las rutas de tareas y autenticacion, comunes a los dos modos de BD
+
+main.py (DB_MODE=sync) llama a estas funciones con una Session y async_api.py (DB_MODE=async) las ejecuta con
+AsyncSession.run_sync: cada consulta y cada JSON se construye en un solo sitio y los routers solo declaran las rutas.
+"""
+from dataclasses import dataclass  # Parametros de GET /tasks ya validados
+from datetime import datetime, timedelta  # Filtros por fecha y expiracion del token
+from typing import Dict, Iterable, List, Literal, Optional, Tuple  # Tipado
+
+from fastapi import HTTPException, Query  # Errores HTTP y parametros de la query
+from sqlalchemy import Row, select  # Filas Core y consultas estilo SQLAlchemy 2.0
+from sqlalchemy.orm import Session  # Sesion de SQLAlchemy (la de AsyncSession.run_sync en modo async)
+
+from auth import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token  # Token JWT del login
+from cache import task_cache  # Cache de respuestas con ETag
+from changes import record_changes  # Evento del feed en la misma transaccion
+from counting import count_tasks, invalidate_task_count  # Conteo de tareas con estrategia configurable
+from lookup import lookup_tasks, parse_ids  # Lecturas por lista de IDs
+from metrics import timed  # Medicion de fases de la peticion
+from model import Task, TaskArchive, TaskStatus, User  # Modelos de tareas y usuarios
+from pagination import decode_cursor, encode_cursor  # Cursor opaco para paginacion keyset
+from schemas import TaskCreate  # Datos de una tarea nueva
+from serialization import dumps, select_task_rows, task_rows  # Filas Core y JSON rapido
+from shared_state import SHARED_STATE_BACKEND, run_shared  # Invalidacion fuera del event loop (modo async)
+from task_queries import TaskFilters, TaskSort, task_page_select  # Filtros, ordenamiento y paginas (con o sin archivo)
+from task_stats import read_status_counts, record_status_change  # Conteo por estado materializado
+from token_cache import token_cache  # Tokens cacheados de un usuario
+from versioning import task_etag  # ETag "v<version>" de una tarea
+
+
+@dataclass
+class TaskListQuery:  # Parametros de GET /tasks ya normalizados
+    page: int
+    page_size: int
+    pagination: str
+    cursor: Optional[str]
+    include_total: bool
+    filters: TaskFilters
+    sort: str
+    ids: Optional[List[int]]  # ?ids=: lectura por IDs en lugar de una pagina
+
+    @property
+    def keyset(self) -> bool:  # Pagina por cursor
+        return self.pagination == "cursor" or self.cursor is not None
+
+    @property
+    def counts(self) -> bool:  # La respuesta lleva el total (pagina por offset con include_total)
+        return self.ids is None and not self.keyset and self.include_total
+
+
+def task_list_query(  # Dependencia de GET /tasks en los dos routers
+    page: int = 1,  # Numero de pagina (por defecto 1), minimo 1
+    page_size: int = 10,  # Cantidad de items por pagina (por defecto 10), minimo 1
+    pagination: Literal["offset", "cursor"] = "offset",  # Modo de paginacion (offset por compatibilidad)
+    cursor: Optional[str] = None,  # Cursor opaco devuelto como next_cursor (activa el modo cursor)
+    include_total: bool = True,  # Permite omitir el conteo total en modo offset
+    status: Optional[TaskStatus] = None,  # Filtro por estado
+    created_from: Optional[datetime] = None,  # Solo tareas con created_at >= created_from
+    created_to: Optional[datetime] = None,  # Solo tareas con created_at < created_to
+    q: Optional[str] = Query(None, min_length=1, max_length=100),  # Busqueda en titulo y descripcion
+    sort: TaskSort = "id",  # Ordenamiento permitido ("-" = descendente)
+    include_archived: bool = False,  # Incluye las tareas archivadas (task_archive)
+    ids: Optional[List[str]] = Query(None),  # ?ids=1,2,3: lee esas tareas con IN en lugar de paginar
+) -> TaskListQuery:
+    return TaskListQuery(
+        page=max(page, 1),  # Pagina invalida: la primera
+        page_size=page_size if page_size >= 1 else 10,  # Tamaño invalido: el de por defecto
+        pagination=pagination,
+        cursor=cursor,
+        include_total=include_total,
+        filters=TaskFilters(status, created_from, created_to, q, include_archived),
+        sort=sort,
+        ids=parse_ids(ids) if ids is not None else None,  # 422 antes de consultar el cache
+    )
+
+
+def tasks_changed(task_ids: Iterable[int] = ()) -> None:  # Llamar tras el commit de cualquier escritura de tareas
+    """Invalida los totales cacheados, las tareas indicadas y todas las paginas del listado"""
+    invalidate_task_count()
+    task_cache.invalidate(task_ids)
+
+
+async def atasks_changed(task_ids: Iterable[int] = ()) -> None:  # tasks_changed desde las rutas async
+    """tasks_changed en el threadpool si el estado compartido o el backend del cache bloquean (file, redis)"""
+    blocking = SHARED_STATE_BACKEND != "local" or task_cache.backend.blocking
+    await run_shared(tasks_changed, list(task_ids), blocking=blocking)
+
+
+def create_task_row(db: Session, data: TaskCreate) -> Task:  # POST /tasks
+    """Inserta la tarea con su conteo por estado y su evento del feed en una transaccion"""
+    db_task = Task(**data.dict())
+    db.add(db_task)
+    db.flush()  # INSERT para conocer el ID
+    record_status_change(db, added=[db_task.status])
+    record_changes(db, "created", [db_task.id])
+    db.commit()
+    db.refresh(db_task)  # Valores asignados por la BD (created_at, version)
+    return db_task
+
+
+def task_list_json(db: Session, query: TaskListQuery) -> bytes:  # Cuerpo de GET /tasks (se cachea en la ruta)
+    """Serializa la pagina pedida (offset o cursor) o, con ?ids=, las tareas indicadas"""
+    if query.ids is not None:  # Varias tareas por ID (se cachea e invalida igual que las paginas)
+        return dumps(lookup_tasks(db, query.ids, query.filters.include_archived))
+    dialect_name = db.get_bind().dialect.name  # Los filtros de texto dependen del motor
+    if query.keyset:  # Modo keyset: busca por id sin recorrer filas previas
+        stmt = task_page_select(  # Una fila extra indica si hay mas paginas
+            query.filters, dialect_name, query.sort, query.page_size + 1,
+            keyset=True, last_id=decode_cursor(query.cursor),
+        )
+        rows = db.execute(stmt).all()  # Filas Core de la pagina (mas la extra), sin identity map
+        has_more = len(rows) > query.page_size
+        rows = rows[:query.page_size]
+        with timed("serialize"):  # Mide la serializacion (Server-Timing y /metrics)
+            return dumps({  # Mismo JSON que CursorPaginatedTaskResponse, sin validar de nuevo
+                "items": task_rows(rows),
+                "page_size": query.page_size,
+                "next_cursor": encode_cursor(rows[-1].id) if has_more else None,
+            })
+
+    total, total_pages, total_strategy = None, None, "none"  # Sin conteo si el cliente no lo necesita
+    if query.counts:  # Cuenta con la estrategia configurada (exact, cached o estimated)
+        total, total_strategy = count_tasks(db, query.filters)
+        total_pages = (total + query.page_size - 1) // query.page_size
+    offset = (query.page - 1) * query.page_size
+    stmt = task_page_select(query.filters, dialect_name, query.sort, query.page_size, offset)
+    rows = db.execute(stmt).all()  # Filas Core de la pagina actual
+    with timed("serialize"):
+        return dumps({  # Mismo JSON que PaginatedTaskResponse, sin validar de nuevo
+            "items": task_rows(rows),
+            "total": total,
+            "page": query.page,
+            "page_size": query.page_size,
+            "total_pages": total_pages,
+            "total_strategy": total_strategy,
+        })
+
+
+def task_json(db: Session, task_id: int, include_archived: bool, row: Optional[Row]) -> Tuple[bytes, str]:
+    """Cuerpo y ETag de GET /tasks/{id} a partir de la fila leida por el agrupador (None si no esta en task)"""
+    if row is None and include_archived:  # Ya no esta en task: puede haberla movido el job de archivado
+        row = db.execute(select_task_rows(TaskArchive).where(TaskArchive.id == task_id)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Tarea no encontrada")
+    with timed("serialize"):
+        return dumps(task_rows([row])[0]), task_etag(row.version)  # Mismo JSON que TaskRead y ETag "v<version>"
+
+
+def task_stats_json(db: Session) -> bytes:  # Cuerpo de GET /tasks/stats
+    return dumps(read_status_counts(db))
+
+
+def ensure_username_free(db: Session, username: str) -> None:  # Antes de hashear la contraseña
+    if db.scalars(select(User.id).where(User.username == username)).first() is not None:
+        raise HTTPException(status_code=400, detail="El usuario ya existe")
+
+
+def create_user(db: Session, username: str, hashed_password: str) -> User:  # POST /auth/register
+    token_cache.invalidate_user(username)  # Descarta tokens cacheados de un usuario anterior con ese nombre
+    db_user = User(username=username, hashed_password=hashed_password)
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
+
+def find_login_user(db: Session, username: str) -> User:  # Usuario del login o 401
+    db_user = db.scalars(select(User).where(User.username == username)).first()
+    if db_user is None:
+        raise HTTPException(status_code=401, detail="Credenciales incorrectas")
+    return db_user
+
+
+def login_token(db: Session, db_user: User, valid: bool, new_hash: Optional[str]) -> Dict[str, str]:  # Tras bcrypt
+    """Retorna el token JWT si la contraseña coincidio; guarda el hash nuevo si cambio el coste de bcrypt"""
+    if not valid:
+        raise HTTPException(status_code=401, detail="Credenciales incorrectas")
+    if new_hash:  # El hash usa otro coste de bcrypt: se actualiza de forma transparente
+        db_user.hashed_password = new_hash
+        token_cache.invalidate_user(db_user.username)  # El usuario cambio: descarta sus tokens cacheados
+        db.commit()
+    access_token = create_access_token(
+        data={"sub": db_user.username, "uid": db_user.id},  # Payload con el username y el id (modo stateless)
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
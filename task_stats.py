@@ -0,0 +1,133 @@
+"""Conteo de tareas por estado materializado en task_status_counts (GET /tasks/stats)
+
+Las escrituras de tareas ajustan task_status_counts en su misma transaccion, asi que leer los totales
+son 3 filas por clave primaria en vez de un GROUP BY sobre toda la tabla. El job de reconciliacion
+recalcula el GROUP BY y corrige la deriva (escrituras hechas fuera de la API, filas que faltan).
+
+Uso:
+    python task_stats.py                   # Una reconciliacion
+"""
+import logging  # Deriva corregida por el job periodico
+import os  # Lectura de variables de entorno
+import threading  # Bloqueo de los contadores
+from collections import Counter  # Deltas por estado
+from typing import Dict, Iterable, List, Mapping, Sequence  # Tipado
+
+from sqlalchemy import bindparam, func, insert, select, update  # Sentencias de los contadores
+from sqlalchemy.orm import Session  # Sesion de SQLAlchemy
+
+from cache import task_cache  # /tasks/stats se cachea con la generacion de los listados
+from database import SessionLocal  # Sesiones contra el primario
+from metrics import registry  # Reconciliaciones en /metrics
+from model import Task, TaskStatus, TaskStatusCount  # Tareas y contadores
+from periodic import run_periodically  # Un solo worker reconcilia en cada turno
+
+# Configuración de los contadores (leer de variables de entorno)
+STATS_RECONCILE_INTERVAL_SECONDS = float(os.getenv("STATS_RECONCILE_INTERVAL_SECONDS", "3600"))  # 0 = sin job periodico
+
+logger = logging.getLogger(__name__)  # Deriva corregida por el job periodico
+
+_counts = TaskStatusCount.__table__
+_adjust = (  # UPDATE ... SET count = count + ? WHERE status = ? (executemany)
+    update(_counts).where(_counts.c.status == bindparam("b_status")).values(count=_counts.c.count + bindparam("b_delta"))
+)
+
+
+def record_status_change(
+    db: Session, removed: Iterable[TaskStatus] = (), added: Iterable[TaskStatus] = (),
+) -> None:  # Llamar antes del commit de la escritura
+    """Resta una tarea por cada estado de removed y suma una por cada estado de added, en la transaccion actual"""
+    deltas = Counter(added)
+    deltas.subtract(removed)
+    params = [  # Siempre en el mismo orden: dos transacciones no se bloquean en orden cruzado
+        {"b_status": status, "b_delta": delta} for status, delta in sorted(deltas.items(), key=lambda item: item[0].value)
+        if delta
+    ]
+    if params:
+        db.execute(_adjust, params)
+
+
+def locked_statuses(db: Session, ids: Sequence[int]) -> Dict[int, TaskStatus]:  # Estado previo a un UPDATE/DELETE
+    """Estado actual de las tareas, bloqueando sus filas hasta el commit (nadie cambia el estado entre medias)"""
+    if not ids:
+        return {}
+    return dict(db.execute(select(Task.id, Task.status).where(Task.id.in_(ids)).with_for_update()).all())
+
+
+def read_status_counts(db: Session) -> Dict[str, int]:  # Lectura de GET /tasks/stats
+    """Tareas por estado y total, leidos de task_status_counts"""
+    stored = dict(db.execute(select(TaskStatusCount.status, TaskStatusCount.count)).all())
+    counts = {status.value: stored.get(status, 0) for status in TaskStatus}
+    return {**counts, "total": sum(counts.values())}
+
+
+class ReconcileStats:  # Reconciliaciones de este proceso
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.runs = 0  # Reconciliaciones completas
+        self.drift = 0  # Tareas de diferencia corregidas (suma de valores absolutos)
+
+    def finished(self, drift: Mapping[str, int]) -> None:
+        with self._lock:
+            self.runs += 1
+            self.drift += sum(abs(delta) for delta in drift.values())
+
+    def metrics(self) -> List[str]:  # Lineas Prometheus para /metrics
+        with self._lock:
+            return [
+                "# HELP api_task_stats_reconcile_runs_total Reconciliaciones de task_status_counts",
+                "# TYPE api_task_stats_reconcile_runs_total counter",
+                f"api_task_stats_reconcile_runs_total {self.runs}",
+                "# HELP api_task_stats_drift_total Tareas de diferencia corregidas entre task_status_counts y task",
+                "# TYPE api_task_stats_drift_total counter",
+                f"api_task_stats_drift_total {self.drift}",
+            ]
+
+
+reconcile_stats = ReconcileStats()  # Reconciliaciones del proceso
+registry.register_collector(reconcile_stats.metrics)
+
+
+def reconcile_status_counts(db: Session) -> Dict[str, int]:  # Una reconciliacion en una transaccion
+    """Iguala task_status_counts al GROUP BY de task y retorna la deriva corregida por estado (real - guardado)"""
+    stored = dict(  # Bloquea los contadores: las escrituras en curso terminan antes y las nuevas esperan al commit
+        db.execute(select(TaskStatusCount.status, TaskStatusCount.count).with_for_update()).all()
+    )
+    actual = dict(db.execute(select(Task.status, func.count()).group_by(Task.status)).all())  # Recorre ix_task_status_created_at
+    drift: Dict[str, int] = {}
+    for status in TaskStatus:
+        real = actual.get(status, 0)
+        if status not in stored:  # Tabla creada sin la migracion: se agrega la fila
+            db.execute(insert(_counts).values(status=status, count=real))
+            drift[status.value] = real
+        elif stored[status] != real:
+            db.execute(update(_counts).where(_counts.c.status == status).values(count=real))
+            drift[status.value] = real - stored[status]
+    db.commit()
+    reconcile_stats.finished(drift)
+    if drift:
+        task_cache.invalidate()  # /tasks/stats cacheado mostraba los valores viejos
+    return drift
+
+
+def _reconcile_job() -> None:  # Una reconciliacion periodica (en el threadpool)
+    with SessionLocal() as db:
+        drift = reconcile_status_counts(db)
+    if any(drift.values()):
+        logger.warning("task_status_counts tenia deriva, corregida: %s", drift)
+
+
+async def reconcile_periodically(interval: float = STATS_RECONCILE_INTERVAL_SECONDS) -> None:  # Tarea de fondo de la app
+    """Reconcilia task_status_counts cada `interval` segundos; con varios workers solo uno en cada turno"""
+    await run_periodically("stats", interval, _reconcile_job)
+
+
+def main() -> None:
+    with SessionLocal() as db:
+        drift = reconcile_status_counts(db)
+        counts = read_status_counts(db)
+    print(f"Deriva corregida: {drift or 'ninguna'}; conteos: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
-from sqlalchemy import create_engine, text  # Utilidades de SQLAlchemy para conexiones y SQL crudo
+from sqlalchemy import text  # Utilidades de SQLAlchemy para SQL crudo
 
-DATABASE_URL = "mysql+pymysql://root:@localhost/api_database"  # Cadena de conexion a MySQL
+from database import get_engine  # Reutiliza el engine configurado en database.py (DATABASE_URL y pool)
 
-engine = create_engine(DATABASE_URL)  # Crea el engine de SQLAlchemy
 
-try:  # Intenta conectarse a la BD
-    with engine.connect() as connection:  # Abre una conexion
-        connection.execute(text("SELECT 1"))  # Ejecuta un ping simple
+def check_connection() -> bool:  # Ping a la BD (solo al ejecutar el script, no al importarlo)
+    try:  # Intenta conectarse a la BD
+        with get_engine().connect() as connection:  # Abre una conexion
+            connection.execute(text("SELECT 1"))  # Ejecuta un ping simple
         print("Conexión exitosa a la base de datos")  # Mensaje de exito
-except Exception as e:  # Si ocurre un error
-    print("Error al conectar a la base de datos:", e)  # Muestra el error
+        return True
+    except Exception as e:  # Si ocurre un error
+        print("Error al conectar a la base de datos:", e)  # Muestra el error
+        return False
+
+
+if __name__ == "__main__":
+    check_connection()
@@ -0,0 +1,81 @@
+import os  # Lectura de variables de entorno
+import threading  # Bloqueo para el cache compartido entre hilos
+import time  # Reloj para TTL y expiracion del token
+from collections import OrderedDict  # Orden LRU
+from typing import Any, Dict, NamedTuple, Optional, Tuple  # Tipado
+
+# Configuración del cache de tokens (leer de variables de entorno)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))  # Maximo de tokens cacheados (0 = desactivado)
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", "60"))  # Segundos maximos que se reutiliza un token resuelto
+AUTH_STATELESS = os.getenv("AUTH_STATELESS", "false").lower() in ("1", "true", "yes")  # Confia en el uid del token
+
+
+class Principal(NamedTuple):  # Usuario autenticado resuelto a partir del token
+    id: int  # ID del usuario
+    username: str  # Nombre de usuario
+
+
+class TokenCache:  # Cache LRU con TTL de tokens ya validados
+    """Cache LRU de tokens decodificados acotado por tamaño, TTL y expiracion del token"""
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size  # Maximo de entradas
+        self.ttl = ttl  # Vida maxima de cada entrada
+        self._lock = threading.Lock()  # Protege el diccionario y los contadores
+        self._entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()  # token -> (usuario, expira)
+        self.hits = 0  # Tokens resueltos desde el cache
+        self.misses = 0  # Tokens que requirieron decodificar y consultar
+        self.evictions = 0  # Entradas descartadas por tamaño
+
+    def get(self, token: str) -> Optional[Principal]:  # Retorna el usuario si el token sigue vigente
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, expires_at = entry
+            if time.time() >= expires_at:  # Vencio el TTL o el propio token
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)  # Marca como usado recientemente
+            self.hits += 1
+            return principal
+
+    def put(self, token: str, principal: Principal, token_exp: Optional[float]) -> None:  # Guarda un token validado
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl  # Nunca mas alla del TTL
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)  # Ni mas alla del exp del JWT
+        with self._lock:
+            self._entries[token] = (principal, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:  # Descarta los menos usados
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_user(self, username: str) -> None:  # Llamar cuando un usuario cambia
+        """Elimina todas las entradas del usuario indicado"""
+        with self._lock:
+            stale = [token for token, (principal, _) in self._entries.items() if principal.username == username]
+            for token in stale:
+                del self._entries[token]
+
+    def clear(self) -> None:  # Vacia el cache
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:  # Contadores de aciertos y fallos
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "stateless": AUTH_STATELESS,
+            }
+
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)  # Cache compartido por el proceso
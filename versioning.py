@@ -0,0 +1,101 @@
+import re  # Extrae la version de cada ETag
+from typing import Any, Dict, List, Optional  # Tipado
+
+from fastapi import HTTPException, Response  # Errores HTTP y respuesta con ETag
+from sqlalchemy import delete, select, update  # Sentencias de una sola fila
+from sqlalchemy.orm import Session  # Sesion de SQLAlchemy
+
+from changes import record_changes  # Registro de cambios para GET /tasks/changes
+from model import Task  # Modelo de tareas
+from serialization import TASK_READ_COLUMNS, TaskRow, dumps, select_task_rows  # Columnas, DTO de lectura y JSON
+from task_stats import locked_statuses, record_status_change  # Conteo por estado en la misma transaccion
+
+_ETAG_VERSION = re.compile(r'^"v(\d+)"$')  # ETag fuerte de una tarea: "v<version>"
+
+
+def task_etag(version: int) -> str:  # ETag de una tarea segun su version
+    return f'"v{version}"'
+
+
+def task_response(row: TaskRow) -> Response:  # JSON de TaskRead con su ETag
+    return Response(dumps(row), media_type="application/json", headers={"ETag": task_etag(row.version)})
+
+
+def parse_if_match(header: Optional[str]) -> Optional[List[int]]:  # Versiones aceptadas por If-Match
+    """Retorna None si no hay condicion (sin cabecera o "*") o la lista de versiones aceptadas"""
+    if header is None:
+        return None
+    versions: List[int] = []
+    for value in header.split(","):
+        value = value.strip()
+        if value == "*":  # Cualquier version, basta con que exista
+            return None
+        match = _ETAG_VERSION.match(value)  # Los ETag debiles (W/) no valen para If-Match
+        if match:
+            versions.append(int(match.group(1)))
+    return versions  # Lista vacia: ningun ETag valido, la condicion nunca se cumple
+
+
+def _precondition_failed(db: Session, task_id: int) -> HTTPException:  # 404 o 412 cuando no se afecto ninguna fila
+    current = db.execute(select(Task.version).where(Task.id == task_id)).scalar()  # Solo en el camino de error
+    if current is None:
+        return HTTPException(status_code=404, detail="Tarea no encontrada")
+    return HTTPException(
+        status_code=412,
+        detail="La tarea fue modificada por otra peticion",
+        headers={"ETag": task_etag(current)},  # Version actual para que el cliente reintente
+    )
+
+
+def update_task_row(
+    db: Session, task_id: int, changes: Dict[str, Any], versions: Optional[List[int]] = None
+) -> TaskRow:
+    """UPDATE ... WHERE id = ? [AND version IN (...)] que incrementa la version; con RETURNING si el motor lo admite"""
+    if not changes:  # Nada que escribir: solo se valida la condicion
+        stmt = select_task_rows().where(Task.id == task_id)
+        if versions is not None:
+            stmt = stmt.where(Task.version.in_(versions))
+        row = db.execute(stmt).first()
+        if row is None:
+            raise _precondition_failed(db, task_id)
+        return TaskRow(*row)
+
+    previous = locked_statuses(db, [task_id]).get(task_id) if "status" in changes else None  # Solo si puede cambiar
+    stmt = update(Task.__table__).where(Task.id == task_id).values(**changes, version=Task.version + 1)
+    if versions is not None:
+        stmt = stmt.where(Task.version.in_(versions))
+    if db.get_bind().dialect.update_returning:  # SQLite, PostgreSQL, MariaDB 10.5+: una sola sentencia
+        row = db.execute(stmt.returning(*TASK_READ_COLUMNS)).first()
+        if row is None:
+            db.rollback()
+            raise _precondition_failed(db, task_id)
+    else:
+        if db.execute(stmt).rowcount != 1:  # MySQL: sin RETURNING, se relee la fila tras el UPDATE
+            db.rollback()
+            raise _precondition_failed(db, task_id)
+        row = db.execute(select_task_rows().where(Task.id == task_id)).one()
+    task = TaskRow(*row)
+    if previous is not None and previous != task.status:  # Transicion de estado
+        record_status_change(db, removed=[previous], added=[task.status])
+    record_changes(db, "updated", [task_id])  # En la misma transaccion que el UPDATE
+    db.commit()
+    return task
+
+
+def delete_task_row(db: Session, task_id: int, versions: Optional[List[int]] = None) -> None:
+    """DELETE ... WHERE id = ? [AND version IN (...)] en una sola sentencia (que retorna el estado si el motor lo admite)"""
+    stmt = delete(Task.__table__).where(Task.id == task_id)
+    if versions is not None:
+        stmt = stmt.where(Task.version.in_(versions))
+    if db.get_bind().dialect.delete_returning:  # El estado borrado sale del mismo DELETE
+        status = db.execute(stmt.returning(Task.status)).scalar()
+    else:  # MySQL: se lee (y bloquea) el estado antes de borrar
+        status = locked_statuses(db, [task_id]).get(task_id)
+        if status is not None and db.execute(stmt).rowcount != 1:
+            status = None
+    if status is None:
+        db.rollback()
+        raise _precondition_failed(db, task_id)
+    record_status_change(db, removed=[status])
+    record_changes(db, "deleted", [task_id])
+    db.commit()